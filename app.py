@@ -5,12 +5,21 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from utils.data_loader import load_and_preprocess_data, get_summary_stats, filter_data
+from utils.dataset_store import (
+    load_datasets, load_insights, reload_datasets, load_charts, show_chart
+)
 from utils.insights import (
     generate_sleep_quality_insight,
     generate_disorder_insight,
     generate_lifestyle_insight
 )
+from utils.profiling_panel import show_profiling, start_profiling
+
+# 本页图表 (sleep_health_analysis.CHARTS 中的ID)
+CHART_IDS = [
+    '01_correlation_heatmap',
+    '05_feature_importance',
+]
 
 # 页面配置
 st.set_page_config(
@@ -20,6 +29,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 性能剖析 (SAH_PROFILE 环境变量或 ?profile=1 启用)
+start_profiling(__file__)
+
 # 自定义CSS样式
 st.markdown("""
 <style>
@@ -44,12 +56,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 加载数据
-@st.cache_data
-def load_data():
-    return load_and_preprocess_data('sleep_health_lifestyle_dataset.csv')
-
-df, df_encoded = load_data()
+# 加载数据 (进程共享, 只读)
+df, df_encoded = load_datasets()
 
 # 标题
 st.markdown('<p class="main-title">😴 睡眠健康数据分析仪表板</p>', unsafe_allow_html=True)
@@ -66,6 +74,11 @@ st.sidebar.info(f"""
 - **数据来源**: 睡眠健康与生活方式数据集
 """)
 
+# 数据文件更新后重新加载 (所有会话共享同一份数据)
+if st.sidebar.button("🔄 重新加载数据"):
+    reload_datasets()
+    st.rerun()
+
 st.sidebar.markdown("---")
 
 # 全局筛选器
@@ -88,22 +101,17 @@ age_range = st.sidebar.slider(
     (int(df['Age'].min()), int(df['Age'].max()))
 )
 
-# 应用筛选
-df_filtered = filter_data(
-    df,
-    gender=gender_filter if gender_filter != '全部' else None,
-    occupation=occupation_filter if occupation_filter != '全部' else None,
-    age_range=age_range
-)
+# 应用筛选: 首页只展示汇总指标与洞察, 所需统计量在人群聚合立方上一次算出, 按筛选条件缓存
+insights = load_insights(gender=gender_filter, occupation=occupation_filter, age_range=age_range)
 
 st.sidebar.markdown("---")
-st.sidebar.markdown(f"**筛选后样本数**: {len(df_filtered)} 条")
+st.sidebar.markdown(f"**筛选后样本数**: {insights.total} 条")
 
 # ========== 主内容区域 ==========
 
 # 关键指标卡片
 st.markdown("## 📈 关键指标")
-stats = get_summary_stats(df_filtered)
+stats = insights.stats
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -146,31 +154,32 @@ col_insight1, col_insight2 = st.columns(2)
 
 with col_insight1:
     st.markdown("### 睡眠质量评估")
-    st.info(generate_sleep_quality_insight(df_filtered))
+    st.info(generate_sleep_quality_insight(insights))
     
     st.markdown("### 睡眠障碍分布")
-    st.warning(generate_disorder_insight(df_filtered))
+    st.warning(generate_disorder_insight(insights))
 
 with col_insight2:
     st.markdown("### 生活方式分析")
-    st.success(generate_lifestyle_insight(df_filtered))
+    st.success(generate_lifestyle_insight(insights))
 
 st.markdown("---")
 
-# 核心图表展示
+# 核心图表展示 (按侧边栏筛选条件绘制, 渲染结果进程内缓存)
 st.markdown("## 📊 核心分析图表")
+charts = load_charts(CHART_IDS, gender=gender_filter, occupation=occupation_filter, age_range=age_range)
 
 col_chart1, col_chart2 = st.columns(2)
 
 with col_chart1:
     st.markdown("### 🗺️ 特征相关性热力图")
-    st.image('outputs/01_correlation_heatmap.png', use_container_width=True)
+    show_chart(charts, '01_correlation_heatmap')
     st.caption("展示各健康指标之间的相关性关系，颜色越深表示相关性越强")
 
 with col_chart2:
     st.markdown("### 🎯 特征重要性分析")
-    st.image('outputs/05_feature_importance.png', use_container_width=True)
-    st.caption("基于随机森林模型分析各因素对睡眠质量的影响权重")
+    show_chart(charts, '05_feature_importance')
+    st.caption("基于随机森林模型分析各因素对睡眠质量的影响权重 (全部数据, 不随筛选条件变化)")
 
 st.markdown("---")
 
@@ -199,3 +208,5 @@ st.markdown("""
     <p>使用左侧导航栏探索更多专题分析 👈</p>
 </div>
 """, unsafe_allow_html=True)
+
+show_profiling()
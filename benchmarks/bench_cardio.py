@@ -0,0 +1,68 @@
+"""
+心血管健康分数计算性能基准
+对比逐行循环 (process_dataset_rowwise) 与列式引擎 (process_dataset)
+
+用法 (在项目根目录运行):
+    python -m benchmarks.bench_cardio
+    python -m benchmarks.bench_cardio --rows 1000 10000 100000 --rowwise-limit 10000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from cardio_score_calculator import CardioScoreCalculator
+
+
+def make_dataset(base, n_rows):
+    """将基础数据集平铺扩充到 n_rows 行, Person ID 重新编号"""
+    repeats = -(-n_rows // len(base))
+    df = pd.concat([base] * repeats, ignore_index=True).head(n_rows).copy()
+    df['Person ID'] = range(1, len(df) + 1)
+    return df
+
+
+def time_call(func, df, repeat=3):
+    """返回多次运行中的最短耗时 (秒) 与最后一次的结果"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='心血管健康分数计算性能基准')
+    parser.add_argument('--input', default='sleep_health_lifestyle_dataset_cleaned.csv',
+                        help='用于扩充的基础数据集')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='测试的数据规模')
+    parser.add_argument('--rowwise-limit', type=int, default=100000,
+                        help='逐行循环只在不超过该规模时运行 (太慢)')
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.input)
+    calculator = CardioScoreCalculator()
+
+    print(f"{'行数':>10} {'逐行(s)':>10} {'列式(s)':>10} {'列式 行/秒':>14} {'加速比':>8}")
+    for n_rows in args.rows:
+        df = make_dataset(base, n_rows)
+        t_columnar, columnar = time_call(calculator.process_dataset, df)
+
+        if n_rows <= args.rowwise_limit:
+            t_rowwise, rowwise = time_call(calculator.process_dataset_rowwise, df, repeat=1)
+            # 两条路径的结果必须逐值一致
+            pd.testing.assert_frame_equal(rowwise, columnar, check_exact=True, check_dtype=False)
+            rowwise_text = f"{t_rowwise:>10.3f}"
+            speedup_text = f"{t_rowwise / t_columnar:>7.0f}x"
+        else:
+            rowwise_text = f"{'-':>10}"
+            speedup_text = f"{'-':>8}"
+
+        print(f"{n_rows:>10} {rowwise_text} {t_columnar:>10.3f} {n_rows / t_columnar:>14,.0f} {speedup_text}")
+
+
+if __name__ == '__main__':
+    main()
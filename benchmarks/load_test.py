@@ -0,0 +1,266 @@
+"""
+仪表板并发会话压测
+在同一进程中用 N 个线程各自模拟一个浏览器会话 (streamlit AppTest): 随机打开首页与页面1-5,
+修改筛选控件 (侧边栏与页面中的下拉框、多选框、滑块) 并点击深度探索页的导出按钮;
+各会话共用进程内的 st.cache_resource 数据集与缓存, 与服务进程中多个会话的情形相同.
+记录每次重新运行的耗时 (按操作类型与页面统计 p50/p95/p99) 与进程常驻内存 (RSS),
+结果可保存为JSON并与之前的运行对比
+
+说明: AppTest 不经过 websocket 与浏览器渲染, 测得的是服务端脚本运行耗时;
+线程共享 GIL, 与单个 streamlit 服务进程处理并发会话的方式一致
+
+用法 (在项目根目录运行):
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --sessions 16 --actions 50 --output load.json
+    python -m benchmarks.load_test --baseline load.json --p95-budget 2.0   # p95 超出预算时以非零状态退出
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from benchmarks.rerun_memory import rss_mb
+from benchmarks.run_benchmarks import environment
+from benchmarks.startup import PAGES
+
+PERCENTILES = [50, 95, 99]
+EXPORT_BUTTONS = ['export_csv', 'export_xlsx', 'export_summary']
+
+
+class RssSampler(threading.Thread):
+    """后台定时采样进程 RSS (MB), 记录起始、峰值与结束值"""
+
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_mb = self.peak_mb = self.end_mb = rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, rss_mb())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.end_mb = rss_mb()
+        self.peak_mb = max(self.peak_mb, self.end_mb)
+
+
+def _change_filter(at, rng):
+    """随机修改页面上的一个筛选控件; 页面上没有可改的控件时返回 False"""
+    widgets = ([('selectbox', w) for w in at.selectbox if len(w.options) > 1]
+               + [('multiselect', w) for w in at.multiselect if w.options]
+               + [('slider', w) for w in at.slider])
+    if not widgets:
+        return False
+    kind, widget = rng.choice(widgets)
+    if kind == 'selectbox':
+        widget.select_index(rng.randrange(len(widget.options)))
+    elif kind == 'multiselect':
+        widget.set_value(rng.sample(list(widget.options), rng.randint(1, len(widget.options))))
+    elif isinstance(widget.value, (tuple, list)):
+        low, high = sorted(rng.randint(int(widget.min), int(widget.max)) for _ in range(2))
+        widget.set_value((low, high))
+    else:
+        widget.set_value(rng.randint(int(widget.min), int(widget.max)))
+    return True
+
+
+def _click_export(at, rng):
+    """点击一个导出按钮 (生成或准备下载); 没有时返回 False"""
+    buttons = [b for b in at.button if b.key in EXPORT_BUTTONS]
+    if not buttons:
+        return False
+    rng.choice(buttons).click()
+    return True
+
+
+class Session:
+    """
+    一个模拟会话: 每个页面一个 AppTest (页面各自保留控件状态, 与浏览器中切换页面相同)
+
+    Args:
+        seed: 随机种子
+        timeout: 单次运行的超时秒数
+    """
+
+    def __init__(self, seed, timeout=600):
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.apps = {}
+        self.records = []
+        self.failure = None
+
+    def _run(self, page, action, at=None):
+        """运行一次并记录耗时; at 为空时新建页面的 AppTest (首屏, 建立失败也记为出错)"""
+        from streamlit.testing.v1 import AppTest
+
+        start = time.perf_counter()
+        try:
+            if at is None:
+                # AppTest 按调用方文件所在目录解析相对路径, 需要传绝对路径
+                at = self.apps[page] = AppTest.from_file(os.path.abspath(page), default_timeout=self.timeout)
+            at.run()
+            error = at.exception[0].message if at.exception else None
+        except Exception as e:  # 超时等, 记为出错后继续
+            error = f"{type(e).__name__}: {e}"
+        self.records.append((page, action, time.perf_counter() - start, error))
+
+    def step(self):
+        """浏览一次: 随机选一个页面; 第一次打开时首屏运行, 之后改筛选、点导出或原样重新运行"""
+        page = self.rng.choice(PAGES)
+        at = self.apps.get(page)
+        if at is None:
+            self._run(page, 'first_view')
+            return
+
+        roll = self.rng.random()
+        if roll < 0.3 and _click_export(at, self.rng):
+            action = 'export'
+        elif roll < 0.8 and _change_filter(at, self.rng):
+            action = 'filter'
+        else:
+            action = 'rerun'
+        self._run(page, action, at)
+
+
+def run_load(sessions, actions, seed=0, timeout=600):
+    """
+    并发运行 sessions 个会话, 每个会话执行 actions 次操作
+
+    Returns:
+        tuple: (记录 [(页面, 操作, 耗时秒数, 错误信息或 None), ...], 总耗时秒数, RssSampler,
+                中途异常退出的会话的错误信息列表)
+    """
+    workers = [Session(seed * 1000 + i, timeout) for i in range(sessions)]
+    sampler = RssSampler()
+    sampler.start()
+
+    def browse(session):
+        # 线程中未捕获的异常不会传到主线程: 记下来, 由 main 判为失败
+        try:
+            for _ in range(actions):
+                session.step()
+        except Exception as e:
+            session.failure = f"{type(e).__name__}: {e}"
+
+    threads = [threading.Thread(target=browse, args=(w,)) for w in workers]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+    failures = [w.failure for w in workers if w.failure]
+    return [r for w in workers for r in w.records], elapsed, sampler, failures
+
+
+def latency_stats(seconds, errors):
+    """一组耗时的分位数统计 (秒)"""
+    p50, p95, p99 = np.percentile(seconds, PERCENTILES)
+    return {'count': len(seconds), 'errors': errors, 'mean': float(np.mean(seconds)),
+            'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+
+def summarize(records):
+    """按全部、操作类型与页面分组统计耗时"""
+    groups = defaultdict(list)
+    for page, action, seconds, error in records:
+        for group in ('all', f'action:{action}', f'page:{page}'):
+            groups[group].append((seconds, error))
+    return {group: latency_stats([s for s, _ in items], sum(e is not None for _, e in items))
+            for group, items in groups.items()}
+
+
+def print_report(latency):
+    print(f"{'分组':<36} {'次数':>6} {'出错':>5} {'p50(s)':>9} {'p95(s)':>9} {'p99(s)':>9}")
+    for group, stats in latency.items():
+        print(f"{group:<36} {stats['count']:>6} {stats['errors']:>5} "
+              f"{stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f}")
+
+
+def compare(report, baseline_file):
+    """打印与基线运行的对比 (比值为 基线耗时/当前耗时, >1 表示变快)"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print(f"\n=== 与基线对比: {baseline_file} ===")
+    old_config, config = baseline['config'], report['config']
+    if (old_config['sessions'], old_config['actions']) != (config['sessions'], config['actions']):
+        print(f"注意: 会话数/操作数不同 (基线 {old_config['sessions']}x{old_config['actions']}, "
+              f"当前 {config['sessions']}x{config['actions']})")
+    print(f"{'分组':<36} {'p50比':>8} {'p95比':>8} {'p99比':>8}")
+    for group, stats in report['latency'].items():
+        old = baseline['latency'].get(group)
+        if old is None:
+            continue
+        ratios = [old[p] / stats[p] if stats[p] else float('nan') for p in ('p50', 'p95', 'p99')]
+        flag = '  <-- 变慢' if ratios[1] < 0.9 else ''
+        print(f"{group:<36} " + ' '.join(f"{r:>7.2f}x" for r in ratios) + flag)
+    old_rss, rss = baseline['rss_mb'], report['rss_mb']
+    print(f"RSS 峰值: 基线 {old_rss['peak']:.1f} MB, 当前 {rss['peak']:.1f} MB "
+          f"({rss['peak'] - old_rss['peak']:+.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='仪表板并发会话压测: 重新运行耗时分位数与进程内存')
+    parser.add_argument('--sessions', type=int, default=8, help='并发会话数')
+    parser.add_argument('--actions', type=int, default=30, help='每个会话的操作次数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子 (相同种子的操作序列相同)')
+    parser.add_argument('--timeout', type=float, default=600, help='单次运行的超时秒数')
+    parser.add_argument('--output', default=None, help='JSON结果文件')
+    parser.add_argument('--baseline', default=None, help='与之前保存的JSON结果对比')
+    parser.add_argument('--p95-budget', type=float, default=None, help='全部操作 p95 耗时预算 (秒)')
+    args = parser.parse_args()
+
+    print(f"{args.sessions} 个并发会话, 每个会话 {args.actions} 次操作...")
+    records, elapsed, sampler, failures = run_load(args.sessions, args.actions, args.seed, args.timeout)
+    if not records:
+        print("✗ 没有记录到任何运行")
+        for failure in failures[:10]:
+            print(f"✗ 会话异常退出: {failure}")
+        sys.exit(1)
+    latency = summarize(records)
+    report = {
+        'environment': environment(),
+        'config': {'sessions': args.sessions, 'actions': args.actions, 'seed': args.seed},
+        'elapsed': elapsed,
+        'reruns_per_sec': len(records) / elapsed,
+        'latency': latency,
+        'rss_mb': {'start': sampler.start_mb, 'peak': sampler.peak_mb, 'end': sampler.end_mb},
+        'errors': sorted({f"{page}: {error}" for page, _, _, error in records if error}),
+        'session_failures': failures,
+    }
+
+    print_report(latency)
+    rss = report['rss_mb']
+    print(f"\n共 {len(records)} 次运行, 耗时 {elapsed:.1f}s ({report['reruns_per_sec']:.1f} 次/秒); "
+          f"RSS 起始 {rss['start']:.1f} MB, 峰值 {rss['peak']:.1f} MB, 结束 {rss['end']:.1f} MB")
+    for error in report['errors'][:10]:
+        print(f"✗ {error}")
+    for failure in failures[:10]:
+        print(f"✗ 会话异常退出: {failure}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 结果已保存: {args.output}")
+
+    if args.baseline:
+        compare(report, args.baseline)
+
+    if report['errors'] or failures or (args.p95_budget is not None and latency['all']['p95'] > args.p95_budget):
+        print("\n✗ 存在运行错误、会话异常退出或 p95 耗时超出预算")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+仪表板重复运行的内存回归检查
+在同一进程中用 streamlit AppTest 反复运行页面脚本 (相当于用户在页面上不断操作触发的重新运行),
+记录常驻内存 (RSS) 与 pyplot 中未关闭的图形数; 预热后 RSS 持续增长或留下未关闭的图形即视为泄漏
+
+用法 (在项目根目录运行):
+    python -m benchmarks.rerun_memory
+    python -m benchmarks.rerun_memory --page app.py --reruns 5000 --max-growth-mb 20
+"""
+import argparse
+import os
+import resource
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+
+def rss_mb():
+    """当前进程的常驻内存 (MB); 没有 /proc 时退化为峰值RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(page, reruns, warmup, every):
+    """
+    反复运行页面脚本
+
+    Returns:
+        list: [(已运行次数, RSS MB, 未关闭的图形数), ...] 预热之后每 every 次采样一次
+    """
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest 按调用方文件所在目录解析相对路径, 需要传绝对路径
+    at = AppTest.from_file(os.path.abspath(page), default_timeout=600)
+    for _ in range(warmup):
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{page} 运行出错: {at.exception[0].message}")
+
+    samples = [(0, rss_mb(), len(plt.get_fignums()))]
+    for i in range(1, reruns + 1):
+        at.run()
+        if i % every == 0 or i == reruns:
+            samples.append((i, rss_mb(), len(plt.get_fignums())))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='仪表板页面重复运行的内存回归检查')
+    parser.add_argument('--page', default='pages/5_综合睡眠指标.py', help='页面脚本')
+    parser.add_argument('--reruns', type=int, default=2000, help='预热后的运行次数')
+    parser.add_argument('--warmup', type=int, default=20, help='预热运行次数 (不计入增长)')
+    parser.add_argument('--every', type=int, default=200, help='采样间隔')
+    parser.add_argument('--max-growth-mb', type=float, default=20.0, help='允许的RSS增长 (MB)')
+    args = parser.parse_args()
+
+    samples = measure(args.page, args.reruns, args.warmup, args.every)
+
+    print(f"{'运行次数':>8} {'RSS(MB)':>10} {'未关闭图形':>10}")
+    for runs, rss, figures in samples:
+        print(f"{runs:>8} {rss:>10.1f} {figures:>10}")
+
+    growth = samples[-1][1] - samples[0][1]
+    leaked = samples[-1][2]
+    print(f"\n{args.reruns} 次运行后 RSS 增长 {growth:+.1f} MB, 未关闭图形 {leaked} 个")
+    if growth > args.max_growth_mb or leaked:
+        print(f"✗ 内存回归: 增长超过 {args.max_growth_mb} MB 或存在未关闭的图形")
+        sys.exit(1)
+    print("✓ 内存保持平稳")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+评分、筛查与数据加载性能基准
+在合成人群数据 (benchmarks.synthetic) 上按多个规模计时, 输出每秒处理行数与峰值内存,
+并把结果写成JSON, 便于在不同提交之间比较
+
+用法 (在项目根目录运行):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --rows 400 100000 10000000 --only health cardio
+    python -m benchmarks.run_benchmarks --output new.json --baseline old.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_population
+from health_score_calculator import HealthScoreCalculator
+from cardio_score_calculator import CardioScoreCalculator
+from comprehensive_sleep_index import SleepIndexCalculator
+from sleep_disorder_screener import batch_screen
+from utils.cohort_cube import CohortCube
+from utils.data_loader import load_and_preprocess_data, filter_data
+from utils.filter_index import FilterIndex
+
+
+class Workload:
+    """
+    一个规模下各基准共享的输入数据, 按需生成并缓存 (准备过程不计入耗时)
+
+    Args:
+        n_rows: 行数
+        seed: 合成数据随机种子
+        workdir: 存放临时CSV的目录
+    """
+
+    def __init__(self, n_rows, seed, workdir):
+        self.n_rows = n_rows
+        self.seed = seed
+        self.workdir = workdir
+        self._cache = {}
+
+    def _get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def population(self):
+        return self._get('population', lambda: generate_population(self.n_rows, seed=self.seed))
+
+    @property
+    def scored(self):
+        """CSHI 的输入: 原始数据 + Health_Score + 心血管分数列"""
+        def build():
+            cardio = CardioScoreCalculator().score_frame(self.population)
+            return pd.concat([self.population,
+                              HealthScoreCalculator().score_frame(self.population)['Health_Score'],
+                              cardio[['Cardio_Score', 'Score_BP', 'Score_HR']]], axis=1)
+        return self._get('scored', build)
+
+    @property
+    def csv_path(self):
+        def build():
+            path = os.path.join(self.workdir, f'population_{self.n_rows}.csv')
+            self.population.to_csv(path, index=False)
+            return path
+        return self._get('csv_path', build)
+
+    @property
+    def loaded(self):
+        return self._get('loaded', lambda: load_and_preprocess_data.__wrapped__(self.csv_path)[0])
+
+    @property
+    def filter_index(self):
+        return self._get('filter_index', lambda: FilterIndex(self.loaded))
+
+    @property
+    def cohort_cube(self):
+        return self._get('cohort_cube', lambda: CohortCube(self.loaded))
+
+    @property
+    def append_batch(self):
+        """追加基准的新到记录: 固定 1000 行, 耗时应与已有行数无关"""
+        return self._get('append_batch', lambda: self.loaded.iloc[:1000])
+
+
+def _quiet(func, *args, **kwargs):
+    """调用时屏蔽打印输出 (calculate_cshi 等会打印进度)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+# 基准名称 -> 以 Workload 为参数、返回待计时无参函数的工厂
+# 带 st.cache_data 的函数通过 __wrapped__ 调用原函数, 避免测到缓存命中
+BENCHMARKS = {
+    'health': lambda w: lambda: HealthScoreCalculator().score_frame(w.population),
+    'cardio': lambda w: lambda: CardioScoreCalculator().process_dataset(w.population),
+    'cshi': lambda w: lambda: _quiet(SleepIndexCalculator().calculate_cshi, w.scored),
+    'screen': lambda w: lambda: batch_screen(w.population),
+    'load': lambda w: lambda: load_and_preprocess_data.__wrapped__(w.csv_path),
+    'filter': lambda w: lambda: filter_data(w.loaded, gender='Female', occupation='Office Worker',
+                                            age_range=(30, 50), index=w.filter_index),
+    'append': lambda w: lambda: w.cohort_cube.append(w.append_batch),
+}
+
+
+def measure(func, repeat):
+    """
+    Returns:
+        tuple: (多次运行的最短耗时秒数, 单次运行的峰值内存MB)
+    """
+    # 峰值内存单独跑一次 (tracemalloc 会拖慢计时), 同时作为预热; numpy 与 pandas 的分配都会被记录
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best, peak / 1024 ** 2
+
+
+def environment():
+    """记录运行环境, 便于比较不同提交/机器的结果"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline_file):
+    """打印与基线结果的速度对比 (>1 表示变快)"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = {(r['benchmark'], r['rows']): r for r in json.load(f)['results']}
+
+    print(f"\n=== 与基线对比: {baseline_file} ===")
+    print(f"{'基准':<8} {'行数':>10} {'基线 行/秒':>14} {'当前 行/秒':>14} {'速度比':>8}")
+    for r in results:
+        old = baseline.get((r['benchmark'], r['rows']))
+        if old is None:
+            continue
+        ratio = r['rows_per_sec'] / old['rows_per_sec']
+        flag = '  <-- 变慢' if ratio < 0.9 else ''
+        print(f"{r['benchmark']:<8} {r['rows']:>10} {old['rows_per_sec']:>14,.0f} "
+              f"{r['rows_per_sec']:>14,.0f} {ratio:>7.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='评分、筛查与数据加载性能基准')
+    parser.add_argument('--rows', type=int, nargs='+', default=[400, 10000, 100000, 1000000],
+                        help='测试的数据规模 (最大可到 10000000)')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help='只运行指定的基准')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数, 取最短耗时')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据随机种子')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON结果文件')
+    parser.add_argument('--baseline', default=None, help='用于对比的历史JSON结果')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'基准':<8} {'行数':>10} {'耗时(s)':>10} {'行/秒':>14} {'峰值内存(MB)':>14}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in args.rows:
+            workload = Workload(n_rows, args.seed, workdir)
+            for name in args.only:
+                seconds, peak_mb = measure(BENCHMARKS[name](workload), args.repeat)
+                result = {
+                    'benchmark': name,
+                    'rows': n_rows,
+                    'seconds': seconds,
+                    'rows_per_sec': n_rows / seconds,
+                    'peak_mb': peak_mb,
+                }
+                results.append(result)
+                print(f"{name:<8} {n_rows:>10} {seconds:>10.4f} {result['rows_per_sec']:>14,.0f} {peak_mb:>14.1f}")
+                sys.stdout.flush()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'repeat': args.repeat, 'seed': args.seed,
+                   'results': results}, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 结果已保存: {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+启动耗时基准
+命令行脚本: 在全新的解释器中导入入口模块 (python -X importtime), 统计总导入耗时与最重的依赖包;
+仪表板页面: 在全新进程中用 streamlit AppTest 完整运行一次页面脚本, 近似服务启动后首次打开页面的首屏时间
+
+用法 (在项目根目录运行):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --only cli --repeat 5 --output startup.json
+    python -m benchmarks.startup --import-budget 1.0 --paint-budget 5.0   # 超出预算时以非零状态退出
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ENTRY_MODULES = [
+    'health_score_calculator',
+    'cardio_score_calculator',
+    'comprehensive_sleep_index',
+    'scoring_pipeline',
+    'sleep_disorder_screener',
+    'validate_screener',
+    'train_sleep_prediction_model',
+    'sleep_disorder_profile',
+    'sleep_health_analysis',
+    'cardio_visualization',
+    'health_score_visualization',
+    'cshi_visualization',
+    'generate_cardio_report',
+    'utils.storage',
+]
+
+PAGES = [
+    'app.py',
+    'pages/1_生活方式分析.py',
+    'pages/2_健康风险评估.py',
+    'pages/3_人群差异洞察.py',
+    'pages/4_深度探索.py',
+    'pages/5_综合睡眠指标.py',
+]
+
+# 首屏计时脚本: AppTest 本身的导入不计入 (对应服务进程已启动)
+FIRST_PAINT_SCRIPT = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=600).run()
+print(time.perf_counter() - start)
+"""
+
+
+def _run(args):
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True,
+                          env=dict(os.environ, PYTHONPATH=os.getcwd()))
+
+
+def import_profile(module, top_n=5):
+    """
+    在全新解释器中导入模块一次
+
+    Returns:
+        tuple: (总导入耗时秒数, [(依赖包, 累计耗时秒数), ...] 按耗时降序的前 top_n 个顶层包)
+    """
+    result = _run(['-X', 'importtime', '-c', f'import {module}'])
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+
+    total, packages = None, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue  # 表头
+        seconds = int(cumulative) / 1e6
+        name = name.rstrip()
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        if name == module:
+            total = seconds
+        elif '.' not in name and depth <= 3:
+            packages[name] = max(packages.get(name, 0), seconds)
+    top = sorted(packages.items(), key=lambda item: -item[1])[:top_n]
+    return total, top
+
+
+def first_paint(page):
+    """在全新进程中运行一次页面脚本, 返回耗时秒数"""
+    result = _run(['-c', FIRST_PAINT_SCRIPT, os.path.abspath(page)])
+    if result.returncode != 0:
+        raise RuntimeError(f"运行 {page} 失败:\n{result.stderr[-2000:]}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='命令行脚本与仪表板页面的启动耗时基准')
+    parser.add_argument('--only', choices=['cli', 'app'], default=None, help='只测命令行脚本或仪表板页面')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数, 取最短耗时')
+    parser.add_argument('--output', default=None, help='JSON结果文件')
+    parser.add_argument('--import-budget', type=float, default=None, help='命令行脚本导入耗时预算 (秒)')
+    parser.add_argument('--paint-budget', type=float, default=None, help='页面首屏耗时预算 (秒)')
+    args = parser.parse_args()
+
+    results = {'import': {}, 'first_paint': {}}
+
+    if args.only in (None, 'cli'):
+        print(f"{'入口模块':<32} {'导入耗时(s)':>12}  最重的依赖包")
+        for module in ENTRY_MODULES:
+            runs = [import_profile(module) for _ in range(args.repeat)]
+            total, top = min(runs, key=lambda run: run[0])
+            results['import'][module] = {'seconds': total, 'top_packages': dict(top)}
+            heavy = ', '.join(f'{name} {seconds:.2f}' for name, seconds in top)
+            print(f"{module:<32} {total:>12.3f}  {heavy}")
+            sys.stdout.flush()
+
+    if args.only in (None, 'app'):
+        print(f"\n{'页面':<32} {'首屏耗时(s)':>12}")
+        for page in PAGES:
+            seconds = min(first_paint(page) for _ in range(args.repeat))
+            results['first_paint'][page] = seconds
+            print(f"{page:<32} {seconds:>12.3f}")
+            sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 结果已保存: {args.output}")
+
+    over = [name for name, item in results['import'].items()
+            if args.import_budget is not None and item['seconds'] > args.import_budget]
+    over += [page for page, seconds in results['first_paint'].items()
+             if args.paint_budget is not None and seconds > args.paint_budget]
+    if over:
+        print(f"\n✗ 超出启动耗时预算: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,35 @@
+import argparse
+import functools
+import sys
+
 import pandas as pd
 import numpy as np
 
+from utils.scoring import round_half, parse_blood_pressure, parse_blood_pressure_column
+from utils.running_stats import RunningStats, RunningCounts, describe_frame
+from utils.storage import read_chunks, DatasetWriter
+from utils.parallel import map_chunks
+from utils.incremental import incremental_score, rules_fingerprint, RowHashWriter
+from utils import scoring, scoring_rules
+from utils.scoring_rules import (
+    CARDIO_STEPS, CARDIO_ACTIVITY, CARDIO_SLEEP_DURATION, CARDIO_SLEEP_QUALITY, CARDIO_STRESS,
+    CARDIO_BMI, CARDIO_MOTION_EFFECT, CARDIO_SLEEP_EFFECT, CARDIO_STRESS_EFFECT, CARDIO_DISORDER
+)
+
+# 心血管分数依赖的输入列 (增量模式按这些列的内容哈希判断是否需要重新评分)
+SCORE_INPUT_COLUMNS = [
+    'Blood Pressure (systolic/diastolic)', 'Heart Rate (bpm)', 'Age', 'Gender', 'Occupation',
+    'Daily Steps', 'Physical Activity Level (minutes/day)', 'Sleep Duration (hours)',
+    'Quality of Sleep (scale: 1-10)', 'Stress Level (scale: 1-10)', 'BMI Category', 'Sleep Disorder'
+]
+
 class CardioScoreCalculator:
     def __init__(self):
         pass
 
     def parse_blood_pressure(self, bp_str):
         """解析血压字符串 '124/70' -> (124, 70)"""
-        try:
-            sys, dia = map(int, bp_str.split('/'))
-            return sys, dia
-        except:
-            return None, None
+        return parse_blood_pressure(bp_str)
 
     def calculate_bp_score(self, systolic, diastolic, age, gender):
         """
@@ -125,55 +143,21 @@ class CardioScoreCalculator:
         生活方式匹配度评分
         """
         # A. 运动充足度 (25%)
-        # 步数达标(7000-10000)
-        score_steps = 0
-        if steps >= 10000: score_steps = 100
-        elif steps >= 7000: score_steps = 85
-        elif steps >= 5000: score_steps = 60
-        else: score_steps = 40
-        
-        # 活动时间达标(30-60分钟)
-        score_activity = 0
-        if 60 <= activity_min <= 90: score_activity = 100
-        elif 30 <= activity_min < 60: score_activity = 90
-        elif activity_min >= 15: score_activity = 70
-        else: score_activity = 40
-        
+        # 步数达标(7000-10000), 活动时间达标(30-60分钟)
+        score_steps = CARDIO_STEPS.score(steps)
+        score_activity = CARDIO_ACTIVITY.score(activity_min)
         score_motion = (score_steps + score_activity) / 2
 
         # B. 睡眠质量 (30%)
-        # 时长
-        score_dur = 0
-        if 7 <= sleep_dur <= 9: score_dur = 100
-        elif 6 <= sleep_dur < 7 or 9 < sleep_dur <= 10: score_dur = 80
-        else: score_dur = 50
-        
-        # 质量
-        score_qual = 0
-        if sleep_qual >= 8: score_qual = 100
-        elif sleep_qual >= 6: score_qual = 80
-        elif sleep_qual >= 4: score_qual = 60
-        else: score_qual = 40
-        
+        score_dur = CARDIO_SLEEP_DURATION.score(sleep_dur)
+        score_qual = CARDIO_SLEEP_QUALITY.score(sleep_qual)
         score_sleep = score_dur * 0.5 + score_qual * 0.5
 
         # C. 压力管理 (25%)
-        score_stress = 0
-        if 3 <= stress <= 5: score_stress = 100
-        elif stress <= 2: score_stress = 90 # 低压力也算好
-        elif 6 <= stress <= 7: score_stress = 70
-        else: score_stress = 40
+        score_stress = CARDIO_STRESS.score(stress)
 
         # D. BMI健康度 (20%)
-        score_bmi = 0
-        if bmi_cat == 'Normal' or bmi_cat == 'Normal Weight':
-            score_bmi = 100
-        elif bmi_cat == 'Overweight':
-            score_bmi = 70
-        elif bmi_cat == 'Underweight': # 虽然不是最优,但比肥胖好
-            score_bmi = 70
-        else: # Obese
-            score_bmi = 40
+        score_bmi = self.calculate_bmi_health(bmi_cat)
 
         # 加权总分
         total = (score_motion * 0.25 + 
@@ -183,36 +167,30 @@ class CardioScoreCalculator:
         
         return total
 
+    def calculate_bmi_health(self, bmi_cat):
+        """BMI健康度评分 (生活方式评分的BMI部分)"""
+        return CARDIO_BMI.score(bmi_cat)
+
+    def calculate_disorder_score(self, sleep_disorder):
+        """睡眠障碍风险调整评分 (相关性评分的睡眠障碍部分)"""
+        return CARDIO_DISORDER.score(sleep_disorder)
+
     def calculate_correlation_score(self, steps, sleep_qual, stress, sleep_disorder):
         """
         生活方式-心血管相关性评分 (协同效应)
         """
         # A. 运动保护效应 (30%)
         # 假设运动有助于心血管
-        motion_effect = 0
-        if steps >= 7000: motion_effect = 100
-        elif steps >= 5000: motion_effect = 70
-        else: motion_effect = 40
+        motion_effect = CARDIO_MOTION_EFFECT.score(steps)
 
         # B. 睡眠质量影响 (30%)
-        sleep_effect = 0
-        if sleep_qual >= 7: sleep_effect = 100
-        elif sleep_qual >= 5: sleep_effect = 70
-        else: sleep_effect = 40
+        sleep_effect = CARDIO_SLEEP_EFFECT.score(sleep_qual)
 
         # C. 压力管理效应 (25%)
-        stress_effect = 0
-        if stress <= 5: stress_effect = 100
-        elif stress <= 7: stress_effect = 70
-        else: stress_effect = 40
+        stress_effect = CARDIO_STRESS_EFFECT.score(stress)
 
         # D. 睡眠障碍风险调整 (15%)
-        disorder_score = 100
-        if pd.notna(sleep_disorder) and sleep_disorder != 'None':
-            if 'Insomnia' in sleep_disorder:
-                disorder_score = 60 # 风险增加
-            elif 'Apnea' in sleep_disorder:
-                disorder_score = 50 # 风险较高
+        disorder_score = self.calculate_disorder_score(sleep_disorder)
 
         total = (motion_effect * 0.30 +
                  sleep_effect * 0.30 +
@@ -228,7 +206,124 @@ class CardioScoreCalculator:
         elif score >= 40: return "中高风险", "⭐⭐"
         else: return "高风险", "⭐"
 
-    def process_dataset(self, df):
+    def parse_blood_pressure_column(self, bp_col):
+        """批量解析血压列 -> (收缩压数组, 舒张压数组), 无法解析的值为NaN"""
+        return parse_blood_pressure_column(bp_col)
+
+    def score_frame(self, df, integer_bp=None):
+        """
+        列式批量计算心血管健康分数
+        评分规则与逐行的 calculate_* 方法完全相同, 结果逐值一致; 返回结果保留df的索引
+
+        integer_bp: Score_BP / Systolic / Diastolic 是否输出为整数; 为空时按df中的血压是否全部可解析决定
+        (与逐行路径相同). 分块处理时各块须一致, 由调用方按整个文件决定 (见 bp_all_parsed)
+        """
+        sys, dia = self.parse_blood_pressure_column(df['Blood Pressure (systolic/diastolic)'])
+        bp_missing = np.isnan(sys) | np.isnan(dia)
+        if integer_bp is None:
+            integer_bp = not bp_missing.any()
+
+        age = df['Age'].to_numpy(dtype=float)
+        hr = df['Heart Rate (bpm)'].to_numpy(dtype=float)
+        # 生活方式字段保持原始数值类型, 整数输入可直接查表
+        steps = df['Daily Steps'].to_numpy()
+        activity_min = df['Physical Activity Level (minutes/day)'].to_numpy()
+        sleep_dur = df['Sleep Duration (hours)'].to_numpy()
+        sleep_qual = df['Quality of Sleep (scale: 1-10)'].to_numpy()
+        stress = df['Stress Level (scale: 1-10)'].to_numpy()
+        is_female = (df['Gender'] == 'Female').to_numpy()
+        occupation = df['Occupation']
+
+        with np.errstate(invalid='ignore'):
+            # 1. 血压分数 (同 calculate_bp_score)
+            score = np.select(
+                [(sys < 120) & (dia < 80), (sys < 130) & (dia < 85), (sys < 140) & (dia < 90),
+                 (sys < 160) & (dia < 100), (sys < 180) & (dia < 110)],
+                [100, 90, 75, 55, 35], default=20)
+            score = np.where((sys < 90) & (dia < 60), 65, score)
+            tolerant = (75 <= score) & (score <= 90)
+            middle_aged = (41 <= age) & (age <= 60)
+            age_bonus = np.where(middle_aged, 5, np.where(age > 60, 10, 0)) * tolerant
+            gender_bonus = np.where(is_female & (sys < 90), 5, 0)
+            score_bp = np.where(bp_missing, 50.0, np.minimum(100, score + age_bonus + gender_bonus))
+
+            # 2. 心率分数 (同 calculate_hr_score): 按年龄/性别/职业整列构造理想范围
+            ideal_low = np.select([age <= 30, age <= 50, age <= 70], [60, 65, 70], default=75)
+            ideal_low = ideal_low + np.where(is_female, 5, 0)
+            ideal_high = ideal_low + 20
+            ideal_high = ideal_high + np.select(
+                [(occupation == 'Manual Labor').to_numpy(), (occupation == 'Retired').to_numpy()],
+                [5, 3], default=0)
+            score_hr = np.select(
+                [np.isnan(hr),
+                 (ideal_low <= hr) & (hr <= ideal_high),
+                 ((ideal_low - 10) <= hr) & (hr < ideal_low) | (ideal_high < hr) & (hr <= (ideal_high + 10)),
+                 ((ideal_low - 20) <= hr) & (hr < (ideal_low - 10)) | ((ideal_high + 10) < hr) & (hr <= (ideal_high + 20))],
+                [50.0, 100.0, 85.0, 70.0], default=40.0)
+
+            # 3. 生活方式分数 (同 calculate_lifestyle_score, 规则见 utils.scoring_rules)
+            score_motion = (CARDIO_STEPS(steps) + CARDIO_ACTIVITY(activity_min)) / 2
+            score_sleep = CARDIO_SLEEP_DURATION(sleep_dur) * 0.5 + CARDIO_SLEEP_QUALITY(sleep_qual) * 0.5
+            score_stress = CARDIO_STRESS(stress)
+            score_bmi = CARDIO_BMI(df['BMI Category'])
+
+            score_life = (score_motion * 0.25 +
+                          score_sleep * 0.30 +
+                          score_stress * 0.25 +
+                          score_bmi * 0.20)
+
+            # 4. 相关性分数 (同 calculate_correlation_score)
+            motion_effect = CARDIO_MOTION_EFFECT(steps)
+            sleep_effect = CARDIO_SLEEP_EFFECT(sleep_qual)
+            stress_effect = CARDIO_STRESS_EFFECT(stress)
+            disorder_score = CARDIO_DISORDER(df['Sleep Disorder'])
+
+            score_corr = (motion_effect * 0.30 +
+                          sleep_effect * 0.30 +
+                          stress_effect * 0.25 +
+                          disorder_score * 0.15)
+
+        # 5. 综合分数
+        # 血压35% + 心率25% + 生活25% + 相关15%
+        final_score = (score_bp * 0.35 +
+                       score_hr * 0.25 +
+                       score_life * 0.25 +
+                       score_corr * 0.15)
+
+        # 风险等级 (同 get_risk_level), 缺失值为最低等级
+        risk_codes = np.searchsorted([40, 55, 70, 85], final_score, side='right')
+        risk_codes[np.isnan(final_score)] = 0
+        risk_labels = np.array(["高风险", "中高风险", "中等风险", "中低风险", "低风险"], dtype=object)
+        risk_stars = np.array(["⭐", "⭐⭐", "⭐⭐⭐", "⭐⭐⭐⭐", "⭐⭐⭐⭐⭐"], dtype=object)
+
+        # 血压全部可解析时, 逐行路径得到的是整数分数和整数血压值
+        if integer_bp:
+            score_bp = score_bp.astype(np.int64)
+            sys = sys.astype(np.int64)
+            dia = dia.astype(np.int64)
+        else:
+            score_bp = round_half(score_bp, 1)
+
+        return pd.DataFrame({
+            'Person ID': df['Person ID'].to_numpy(),
+            'Cardio_Score': round_half(final_score, 1),
+            'Risk_Level': pd.Series(risk_labels[risk_codes], index=df.index, dtype=object),
+            'Risk_Stars': pd.Series(risk_stars[risk_codes], index=df.index, dtype=object),
+            'Score_BP': score_bp,
+            'Score_HR': round_half(score_hr, 1),
+            'Score_Lifestyle': round_half(score_life, 1),
+            'Score_Correlation': round_half(score_corr, 1),
+            # 用于分析的派生列
+            'Systolic': sys,
+            'Diastolic': dia
+        }, index=df.index)
+
+    def process_dataset(self, df, integer_bp=None):
+        """批量计算心血管健康分数 (列式引擎), 输出与 process_dataset_rowwise 一致 (integer_bp 同 score_frame)"""
+        return self.score_frame(df, integer_bp).reset_index(drop=True)
+
+    def process_dataset_rowwise(self, df):
+        """逐行计算的参考实现, 用于结果校验和性能基准对比"""
         results = []
         
         for idx, row in df.iterrows():
@@ -279,34 +374,84 @@ class CardioScoreCalculator:
             
         return pd.DataFrame(results)
 
+def score_partition(df, integer_bp=None):
+    """对一个数据分区评分并合并原数据 (供进程池调用, 需为模块级函数; integer_bp 同 score_frame)"""
+    return pd.merge(df, CardioScoreCalculator().process_dataset(df, integer_bp), on='Person ID')
+
+
+def bp_all_parsed(csv_path, chunksize):
+    """
+    文件中的血压是否全部可解析 (只读取血压列)
+
+    分块处理时用它为所有块统一决定血压相关列的类型, 使输出与一次读入全部数据时相同
+    """
+    for chunk in read_chunks(csv_path, chunksize, columns=['Blood Pressure (systolic/diastolic)']):
+        sys, dia = parse_blood_pressure_column(chunk['Blood Pressure (systolic/diastolic)'])
+        if (np.isnan(sys) | np.isnan(dia)).any():
+            return False
+    return True
+
 def main():
+    parser = argparse.ArgumentParser(description='心血管健康分数计算')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='分块流式处理, 每块行数 (默认一次读入全部数据)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行评分的进程数 (默认1, 串行)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式: 只对新增或评分相关列有变化的行重新评分')
+    args = parser.parse_args()
+    if args.incremental and args.chunksize:
+        parser.error('--incremental 不能与 --chunksize 同时使用')
+
     # 读取数据
     print("正在读取数据...")
+    input_file = 'sleep_health_lifestyle_dataset_cleaned.csv'
     try:
-        df = pd.read_csv('sleep_health_lifestyle_dataset_cleaned.csv')
+        chunks = read_chunks(input_file, args.chunksize)
     except:
         # 如果找不到cleaned, 尝试原始文件
-        df = pd.read_csv('sleep_health_lifestyle_dataset.csv')
-    
-    calculator = CardioScoreCalculator()
+        input_file = 'sleep_health_lifestyle_dataset.csv'
+        chunks = read_chunks(input_file, args.chunksize)
     
     print("正在计算心血管健康分数...")
-    result_df = calculator.process_dataset(df)
-    
-    # 合并原始数据以便查看
-    final_df = pd.merge(df, result_df, on='Person ID')
-    
-    # 保存结果
     output_file = 'cardio_health_score_results.csv'
-    final_df.to_csv(output_file, index=False)
+    writer = DatasetWriter(output_file)
+    summary_columns = ['Cardio_Score', 'Score_BP', 'Score_HR', 'Score_Lifestyle']
+    score_stats = {column: RunningStats() for column in summary_columns}
+    risk_counts = RunningCounts('Risk_Level')
+    # 逐块(可多进程)评分并合并原数据以便查看, 按原顺序保存结果, 统计量跨块累积
+    fingerprint = rules_fingerprint(sys.modules[__name__], scoring, scoring_rules)
+    if args.incremental:
+        # 增量模式: 只对新增或依赖列变化的行重新评分 (可多进程), 其余行复用上次结果
+        def score_changed(changed):
+            (scored,) = map_chunks(score_partition, [changed], args.workers, split=True)
+            return scored
+        (df,) = chunks
+        final_df, n_rescored = incremental_score(df, score_changed, SCORE_INPUT_COLUMNS, output_file, fingerprint)
+        print(f"增量模式: 重新评分 {n_rescored} 条, 复用上次结果 {len(df) - n_rescored} 条")
+        results = [final_df]
+    else:
+        score = score_partition
+        if args.chunksize:
+            # 血压列的整数/小数格式按整个文件决定, 不能由各块分别决定 (否则同一列格式不一)
+            score = functools.partial(score_partition, integer_bp=bp_all_parsed(input_file, args.chunksize))
+        results = map_chunks(score, chunks, args.workers, split=not args.chunksize)
+    hash_writer = RowHashWriter(output_file, SCORE_INPUT_COLUMNS, fingerprint)
+    for final_df in results:
+        writer.write(final_df)
+        hash_writer.write(final_df)
+        for column in summary_columns:
+            score_stats[column].update(final_df[column])
+        risk_counts.update(final_df['Risk_Level'])
+    writer.close()
     print(f"计算完成! 结果已保存至 {output_file}")
     
     # 打印统计信息
     print("\n=== 分数统计 ===")
-    print(final_df[['Cardio_Score', 'Score_BP', 'Score_HR', 'Score_Lifestyle']].describe().round(1))
+    print(describe_frame(score_stats).round(1))
     
     print("\n=== 风险等级分布 ===")
-    print(final_df['Risk_Level'].value_counts())
+    print(risk_counts.value_counts())
 
 if __name__ == '__main__':
     main()
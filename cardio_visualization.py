@@ -9,14 +9,20 @@ import platform
 import warnings
 warnings.filterwarnings('ignore')
 
-# --- 字体配置 ---
-import matplotlib.pyplot as plt
+from utils.storage import read_dataset
+
+# 图表用到的列 (只读取这些列)
+PLOT_COLUMNS = ['Age', 'Daily Steps', 'Physical Activity Level (minutes/day)', 'Sleep Duration (hours)',
+                'Quality of Sleep (scale: 1-10)', 'Stress Level (scale: 1-10)', 'Heart Rate (bpm)',
+                'Systolic', 'Diastolic', 'Cardio_Score', 'Risk_Level']
+
+# --- 字体配置 (在 setup_style 中执行, 导入本模块时不查找字体) ---
 from matplotlib import font_manager
-import platform
 import os
 
 # 全局字体属性
 chinese_font = None
+_style_ready = False
 
 def setup_font():
     global chinese_font
@@ -48,11 +54,17 @@ def setup_font():
         plt.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei', 'Arial Unicode MS']
         plt.rcParams['axes.unicode_minus'] = False
 
-setup_font()
-sns.set_style("whitegrid")
-# 恢复字体设置 (因为seaborn style可能会覆盖)
-if chinese_font:
-   plt.rcParams['font.family'] = chinese_font.get_name()
+def setup_style():
+    """首次绘图前配置中文字体与 seaborn 样式 (不在导入模块时执行, 只执行一次)"""
+    global _style_ready
+    if _style_ready:
+        return
+    _style_ready = True
+    setup_font()
+    sns.set_style("whitegrid")
+    # 恢复字体设置 (因为seaborn style可能会覆盖)
+    if chinese_font:
+        plt.rcParams['font.family'] = chinese_font.get_name()
 
 def create_correlation_heatmap(df):
     """1. 相关性热力图"""
@@ -180,12 +192,13 @@ def create_scatter_analysis(df):
 def main():
     print("Loading results...")
     try:
-        df = pd.read_csv('cardio_health_score_results.csv')
+        df = read_dataset('cardio_health_score_results.csv', columns=PLOT_COLUMNS)
     except FileNotFoundError:
         print("Error: cardio_health_score_results.csv not found. Please run calculator first.")
         return
 
     print("Generating visualizations...")
+    setup_style()
     create_correlation_heatmap(df)
     create_score_boxplots(df)
     create_risk_distribution(df)
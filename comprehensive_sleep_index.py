@@ -2,9 +2,27 @@
 综合睡眠健康指数 (CSHI) 计算器 v2.0
 整合: 睡眠核心(40%) + 运动促眠(25%) + 健康基石(35%)
 """
+import argparse
+import sys
+from itertools import zip_longest
+
 import pandas as pd
 import numpy as np
 
+from utils.scoring import round_half
+from utils.running_stats import RunningStats, RunningCounts, describe_frame
+from utils.storage import read_chunks, read_dataset, DatasetWriter
+from utils.parallel import map_chunks
+from utils.incremental import incremental_score, rules_fingerprint, RowHashWriter
+from utils import scoring, scoring_rules
+from utils.scoring_rules import CSHI_SLEEP_DURATION, CSHI_STEPS, CSHI_ACTIVITY
+
+# 从心血管分数结果中取用的列
+CARDIO_COLUMNS = ['Person ID', 'Cardio_Score', 'Score_BP', 'Score_HR']
+
+# CSHI 依赖的输入列 (增量模式按这些列的内容哈希判断是否需要重新评分)
+SCORE_INPUT_COLUMNS = ['Sleep Duration (hours)', 'Quality of Sleep (scale: 1-10)', 'Health_Score', 'Cardio_Score']
+
 class SleepIndexCalculator:
     def __init__(self):
         pass
@@ -14,13 +32,12 @@ class SleepIndexCalculator:
         print("正在加载基础数据...")
         try:
             # 1. 基础生活健康分 (包含Health_Score)
-            df_life = pd.read_csv('sleep_health_lifestyle_dataset_with_scores.csv')
+            df_life = read_dataset('sleep_health_lifestyle_dataset_with_scores.csv')
             # 2. 心血管健康分 (包含Cardio_Score)
-            df_cardio = pd.read_csv('cardio_health_score_results.csv')
+            # 注意: Cardio表中已经包含了一些列, 我们只读取需要的
+            df_cardio_subset = read_dataset('cardio_health_score_results.csv', columns=CARDIO_COLUMNS)
             
             # 合并 (基于Person ID)
-            # 注意: Cardio表中已经包含了一些列, 我们只取需要的
-            df_cardio_subset = df_cardio[['Person ID', 'Cardio_Score', 'Score_BP', 'Score_HR']]
             
             df_merged = pd.merge(df_life, df_cardio_subset, on='Person ID', how='inner')
             return df_merged
@@ -28,15 +45,38 @@ class SleepIndexCalculator:
             print(f"Error: 缺少必要的数据文件 - {e}")
             return None
 
+    def load_data_chunks(self, chunksize):
+        """
+        分块加载并合并所需数据集
+
+        两个结果文件都由清洗后的数据集按相同行序生成, 因此按块同步读取, 逐块按 Person ID 合并
+
+        Args:
+            chunksize: 每块行数
+
+        Returns:
+            合并后DataFrame块的迭代器; 缺少数据文件时返回None
+        """
+        print("正在分块加载基础数据...")
+        try:
+            life_chunks = read_chunks('sleep_health_lifestyle_dataset_with_scores.csv', chunksize)
+            cardio_chunks = read_chunks('cardio_health_score_results.csv', chunksize, columns=CARDIO_COLUMNS)
+        except FileNotFoundError as e:
+            print(f"Error: 缺少必要的数据文件 - {e}")
+            return None
+        return self._merge_chunks(life_chunks, cardio_chunks)
+
+    def _merge_chunks(self, life_chunks, cardio_chunks):
+        for df_life, df_cardio in zip_longest(life_chunks, cardio_chunks):
+            if (df_life is None or df_cardio is None or
+                    not np.array_equal(df_life['Person ID'].to_numpy(), df_cardio['Person ID'].to_numpy())):
+                raise ValueError("健康分数与心血管分数文件的 Person ID 行序不一致, 无法分块合并, 请去掉 --chunksize 运行")
+            yield pd.merge(df_life, df_cardio, on='Person ID', how='inner')
+
     def calculate_sleep_dimension(self, row):
         """1. 睡眠核心维度 (40%)"""
         # 时长评分 (0-100)
-        dur = row['Sleep Duration (hours)']
-        score_dur = 0
-        if 7 <= dur <= 9: score_dur = 100
-        elif 6 <= dur < 7 or 9 < dur <= 10: score_dur = 85
-        elif 5 <= dur < 6: score_dur = 60
-        else: score_dur = 40
+        score_dur = CSHI_SLEEP_DURATION.score(row['Sleep Duration (hours)'])
         
         # 质量评分 (0-100)
         qual = row['Quality of Sleep (scale: 1-10)']
@@ -47,16 +87,11 @@ class SleepIndexCalculator:
 
     def calculate_motion_dimension(self, row):
         """2. 运动促眠维度 (25%)"""
-        # 步数评分
-        steps = row['Daily Steps']
-        score_steps = min(100, (steps / 7000) * 100)
-        if steps >= 10000: score_steps = 100 # 封顶
+        # 步数评分 (按7000步折算, 封顶100)
+        score_steps = CSHI_STEPS.score(row['Daily Steps'])
         
         # 活动时间评分
-        activity = row['Physical Activity Level (minutes/day)']
-        score_activity = 0
-        if 30 <= activity <= 90: score_activity = 100
-        else: score_activity = min(100, (activity / 30) * 80)
+        score_activity = CSHI_ACTIVITY.score(row['Physical Activity Level (minutes/day)'])
         
         # 维度分: 步数50% + 时间50%
         return score_steps * 0.5 + score_activity * 0.5
@@ -72,13 +107,49 @@ class SleepIndexCalculator:
         # 维度分: 各占50%
         return cardio * 0.5 + health * 0.5
 
+    def score_frame(self, df):
+        """
+        列式批量计算综合指数
+        规则与逐行的 calculate_cshi_rowwise 相同, 结果逐值一致; 返回结果保留df的索引
+        df 需已包含 Health_Score 与 Cardio_Score 列
+        """
+        dur = df['Sleep Duration (hours)'].to_numpy()
+        qual = df['Quality of Sleep (scale: 1-10)'].to_numpy(dtype=float)
+        dim_cardio = df['Cardio_Score'].to_numpy(dtype=float)
+        dim_lifestyle = df['Health_Score'].to_numpy(dtype=float)
+
+        # 睡眠核心维度 (同 calculate_sleep_dimension)
+        score_dur = CSHI_SLEEP_DURATION(dur)
+        dim_sleep = score_dur * 0.5 + qual * 10 * 0.5
+
+        cshi = (dim_sleep * 0.50 +
+                dim_cardio * 0.25 +
+                dim_lifestyle * 0.25)
+
+        # 等级: <60 差, <75 一般, <85 良, 其余(含缺失值)为优
+        level_codes = np.searchsorted([60, 75, 85], cshi, side='right')
+        levels = np.array(['差', '一般', '良', '优'], dtype=object)
+
+        return pd.DataFrame({
+            'Person ID': df['Person ID'].to_numpy(),
+            'CSHI_Score': round_half(cshi, 1),
+            'CSHI_Level': pd.Series(levels[level_codes], index=df.index, dtype=object),
+            'Dim_Sleep': round_half(dim_sleep, 1),
+            'Dim_Cardio': round_half(dim_cardio, 1),
+            'Dim_Lifestyle': round_half(dim_lifestyle, 1)
+        }, index=df.index)
+
     def calculate_cshi(self, df):
         """计算综合指数"""
-        results = []
-        
         print("正在计算综合睡眠健康指数 (CSHI)...")
         print("权重配置: 睡眠(50%) + 心血管(25%) + 生活方式(25%) [已移除运动维度]")
         
+        return self.score_frame(df).reset_index(drop=True)
+
+    def calculate_cshi_rowwise(self, df):
+        """逐行计算综合指数的参考实现, 用于结果校验和性能基准对比"""
+        results = []
+        
         for idx, row in df.iterrows():
             # 计算各维度
             dim_sleep = self.calculate_sleep_dimension(row)
@@ -108,29 +179,68 @@ class SleepIndexCalculator:
             
         return pd.DataFrame(results)
 
+def score_partition(df):
+    """对一个数据分区计算CSHI并合并全量信息 (供进程池调用, 需为模块级函数)"""
+    return pd.merge(df, SleepIndexCalculator().score_frame(df), on='Person ID')
+
 def main():
+    parser = argparse.ArgumentParser(description='综合睡眠健康指数 (CSHI) 计算')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='分块流式处理, 每块行数 (默认一次读入全部数据)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行评分的进程数 (默认1, 串行)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式: 只对新增或评分相关列有变化的行重新评分')
+    args = parser.parse_args()
+    if args.incremental and args.chunksize:
+        parser.error('--incremental 不能与 --chunksize 同时使用')
+
     calculator = SleepIndexCalculator()
     
     # 1. 加载
-    df = calculator.load_data()
-    if df is None: return
-    
-    # 2. 计算
-    result_df = calculator.calculate_cshi(df)
-    
-    # 3. 合并全量信息
-    final_df = pd.merge(df, result_df, on='Person ID')
+    if args.chunksize:
+        chunks = calculator.load_data_chunks(args.chunksize)
+    else:
+        df = calculator.load_data()
+        chunks = None if df is None else [df]
+    if chunks is None: return
     
-    # 4. 保存
     output_file = 'comprehensive_sleep_health_index.csv'
-    final_df.to_csv(output_file, index=False)
+    writer = DatasetWriter(output_file)
+    summary_columns = ['CSHI_Score', 'Dim_Sleep', 'Dim_Cardio', 'Dim_Lifestyle']
+    score_stats = {column: RunningStats() for column in summary_columns}
+    level_counts = RunningCounts('CSHI_Level')
+    print("正在计算综合睡眠健康指数 (CSHI)...")
+    print("权重配置: 睡眠(50%) + 心血管(25%) + 生活方式(25%) [已移除运动维度]")
+    # 2. 逐块(可多进程)计算并合并全量信息
+    fingerprint = rules_fingerprint(sys.modules[__name__], scoring, scoring_rules)
+    if args.incremental:
+        # 增量模式: 只对新增或依赖列变化的行重新评分 (可多进程), 其余行复用上次结果
+        def score_changed(changed):
+            (scored,) = map_chunks(score_partition, [changed], args.workers, split=True)
+            return scored
+        (df,) = chunks
+        final_df, n_rescored = incremental_score(df, score_changed, SCORE_INPUT_COLUMNS, output_file, fingerprint)
+        print(f"增量模式: 重新评分 {n_rescored} 条, 复用上次结果 {len(df) - n_rescored} 条")
+        results = [final_df]
+    else:
+        results = map_chunks(score_partition, chunks, args.workers, split=not args.chunksize)
+    hash_writer = RowHashWriter(output_file, SCORE_INPUT_COLUMNS, fingerprint)
+    for final_df in results:
+        # 3. 按原顺序逐块保存, 统计量跨块累积
+        writer.write(final_df)
+        hash_writer.write(final_df)
+        for column in summary_columns:
+            score_stats[column].update(final_df[column])
+        level_counts.update(final_df['CSHI_Level'])
+    writer.close()
     
     print(f"\n计算完成! 结果已保存至 {output_file}")
     print("\n=== CSHI 分数统计 ===")
-    print(result_df[['CSHI_Score', 'Dim_Sleep', 'Dim_Cardio', 'Dim_Lifestyle']].describe().round(1))
+    print(describe_frame(score_stats).round(1))
     
     print("\n=== CSHI 等级分布 ===")
-    print(result_df['CSHI_Level'].value_counts())
+    print(level_counts.value_counts())
 
 if __name__ == '__main__':
     main()
@@ -1,15 +1,26 @@
 """
 综合睡眠健康指数 (CSHI) 可视化脚本
+绘图函数返回独立的 Figure (不经过 pyplot, 不会在进程中累积), 仪表板通过 CHARTS 渲染并缓存图片
 """
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
+import threading
 from matplotlib import font_manager
+from matplotlib.figure import Figure
 
-# --- 字体配置 ---
+from utils.storage import read_dataset
+
+# 图表用到的列 (只读取这些列)
+PLOT_COLUMNS = ['Age', 'Gender', 'Occupation', 'CSHI_Score', 'CSHI_Level', 'Dim_Sleep', 'Dim_Cardio', 'Dim_Lifestyle']
+
+# --- 字体配置 (首次绘图时执行, 导入本模块时不查找字体) ---
 chinese_font = None
+_style_lock = threading.Lock()
+_style_ready = False
+
 def setup_font():
     global chinese_font
     font_paths = ['C:/Windows/Fonts/msyh.ttc', 'C:/Windows/Fonts/simhei.ttf']
@@ -25,13 +36,22 @@ def setup_font():
         font_manager.fontManager.addfont(font_path)
         plt.rcParams['axes.unicode_minus'] = False
 
-setup_font()
-sns.set_style("whitegrid")
-if chinese_font: plt.rcParams['font.family'] = chinese_font.get_name()
+def setup_style():
+    """首次绘图前配置中文字体与 seaborn 样式 (不在导入模块时执行, 只执行一次)"""
+    global _style_ready
+    with _style_lock:
+        if _style_ready:
+            return
+        setup_font()
+        sns.set_style("whitegrid")
+        if chinese_font: plt.rcParams['font.family'] = chinese_font.get_name()
+        _style_ready = True
 
 def create_cshi_distribution(df, save_path=None):
     """1. CSHI 分数分布直方图"""
-    fig, ax = plt.subplots(figsize=(10, 6))
+    setup_style()
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
     sns.histplot(data=df, x='CSHI_Score', hue='CSHI_Level', multiple='stack', 
                  palette={'优':'#2ecc71', '良':'#3498db', '一般':'#f1c40f', '差':'#e74c3c'},
                  binwidth=2, kde=True, ax=ax)
@@ -40,14 +60,15 @@ def create_cshi_distribution(df, save_path=None):
     ax.set_xlabel('综合分数 (0-100)')
     ax.set_ylabel('人数')
     
-    plt.tight_layout()
+    fig.tight_layout()
     if save_path:
-        plt.savefig(save_path, dpi=300)
+        fig.savefig(save_path, dpi=300)
         print(f"✓ 生成: {save_path}")
     return fig
 
 def create_dimension_radar(df, save_path=None):
     """2. 综合维度雷达图 (不同CSHI等级的平均表现)"""
+    setup_style()
     # 准备数据
     levels = ['优', '良', '一般', '差']
     metrics = ['Dim_Sleep', 'Dim_Cardio', 'Dim_Lifestyle']
@@ -59,7 +80,8 @@ def create_dimension_radar(df, save_path=None):
     angles = np.linspace(0, 2*np.pi, len(metrics), endpoint=False).tolist()
     angles += angles[:1] # 闭合
     
-    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(polar=True))
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots(subplot_kw=dict(polar=True))
     
     colors = ['#2ecc71', '#3498db', '#f1c40f', '#e74c3c']
     
@@ -79,15 +101,17 @@ def create_dimension_radar(df, save_path=None):
     ax.set_title('CSHI 各等级维度表现对比', fontsize=15, fontweight='bold', y=1.05)
     ax.legend(bbox_to_anchor=(1.1, 1), loc='upper left')
     
-    plt.tight_layout()
+    fig.tight_layout()
     if save_path:
-        plt.savefig(save_path, dpi=300)
+        fig.savefig(save_path, dpi=300)
         print(f"✓ 生成: {save_path}")
     return fig
 
 def create_cshi_comparison_grid(df, save_path=None):
     """3. 多维度对比图 (性别/年龄/职业)"""
-    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+    setup_style()
+    fig = Figure(figsize=(18, 6))
+    axes = fig.subplots(1, 3)
     
     # 1. 性别对比
     sns.boxplot(data=df, x='Gender', y='CSHI_Score', palette='Set3', ax=axes[0])
@@ -95,11 +119,10 @@ def create_cshi_comparison_grid(df, save_path=None):
     axes[0].set_ylabel('综合睡眠健康指数')
     
     # 2. 年龄段对比
-    # 创建年龄分桶
-    if 'Age_Group' not in df.columns:
-        df['Age_Group'] = pd.cut(df['Age'], bins=[0, 30, 40, 50, 60, 100], 
-                                labels=['30岁以下', '30-40岁', '40-50岁', '50-60岁', '60岁以上'])
-    sns.boxplot(data=df, x='Age_Group', y='CSHI_Score', palette='Pastel1', ax=axes[1])
+    # 创建年龄分桶 (不修改传入的数据)
+    age_group = pd.cut(df['Age'], bins=[0, 30, 40, 50, 60, 100],
+                       labels=['30岁以下', '30-40岁', '40-50岁', '50-60岁', '60岁以上'])
+    sns.boxplot(x=age_group, y=df['CSHI_Score'], palette='Pastel1', ax=axes[1])
     axes[1].set_title('不同年龄段的 CSHI 分布', fontsize=12, fontweight='bold')
     axes[1].set_xlabel('年龄段')
     axes[1].set_ylabel('')
@@ -113,15 +136,22 @@ def create_cshi_comparison_grid(df, save_path=None):
     axes[2].set_ylabel('')
     axes[2].tick_params(axis='x', rotation=45)
     
-    plt.tight_layout()
+    fig.tight_layout()
     if save_path:
-        plt.savefig(save_path, dpi=300)
+        fig.savefig(save_path, dpi=300)
         print(f"✓ 生成: {save_path}")
     return fig
 
+# 图表ID (与仓库根目录下的图片文件名一致) -> 绘图函数
+CHARTS = {
+    'cshi_distribution': create_cshi_distribution,
+    'cshi_radar': create_dimension_radar,
+    'cshi_comparison_grid': create_cshi_comparison_grid,
+}
+
 def main():
     try:
-        df = pd.read_csv('comprehensive_sleep_health_index.csv')
+        df = read_dataset('comprehensive_sleep_health_index.csv', columns=PLOT_COLUMNS)
         create_cshi_distribution(df)
         create_dimension_radar(df)
         create_cshi_comparison_grid(df)
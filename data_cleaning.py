@@ -3,6 +3,9 @@ import numpy as np
 from datetime import datetime
 import shutil
 
+from utils.cleaning import ANOMALY_DESCRIPTIONS, annotate_anomalies, split_annotated
+from utils.storage import write_dataset
+
 print("=" * 80)
 print("睡眠健康数据集清洗程序")
 print("=" * 80)
@@ -20,63 +23,12 @@ print("\n[步骤2] 读取数据集...")
 df = pd.read_csv('sleep_health_lifestyle_dataset.csv')
 print(f"✓ 数据集总行数: {len(df)}")
 
-# 3. 初始化质量标记列
+# 3-4. 初始化质量标记列并检测异常 (规则定义见 utils.cleaning, 增量导入使用同一套规则)
 print("\n[步骤3] 初始化数据质量标记...")
-df['Data_Quality_Flag'] = 'Normal'
-df['Anomaly_Type'] = ''
-
-# 4. 检测并标注异常
 print("\n[步骤4] 检测并标注异常数据...")
-
-# 异常类型计数器
-anomaly_count = {
-    'AGE_OCCUPATION_1.2': 0,
-    'AGE_OCCUPATION_1.3': 0,
-    'STRESS_SLEEP_6.1': 0,
-    'STRESS_SLEEP_6.2': 0,
-    'STEPS_ACTIVITY_9.1': 0
-}
-
-# 条件1.2：年龄<30 且 职业=Retired
-condition_1_2 = (df['Age'] < 30) & (df['Occupation'] == 'Retired')
-df.loc[condition_1_2, 'Data_Quality_Flag'] = 'Anomaly'
-df.loc[condition_1_2, 'Anomaly_Type'] = 'AGE_OCCUPATION_1.2'
-anomaly_count['AGE_OCCUPATION_1.2'] = condition_1_2.sum()
-print(f"  - 类型1.2 (年龄<30但已退休): {condition_1_2.sum()}条")
-
-# 条件1.3：年龄>=70 且 职业=Student
-condition_1_3 = (df['Age'] >= 70) & (df['Occupation'] == 'Student')
-df.loc[condition_1_3, 'Data_Quality_Flag'] = 'Anomaly'
-df.loc[condition_1_3, 'Anomaly_Type'] = 'AGE_OCCUPATION_1.3'
-anomaly_count['AGE_OCCUPATION_1.3'] = condition_1_3.sum()
-print(f"  - 类型1.3 (年龄>=70仍是学生): {condition_1_3.sum()}条")
-
-# 条件6.1：压力>=9 且 睡眠质量>=8（且尚未被标记）
-condition_6_1 = (df['Stress Level (scale: 1-10)'] >= 9) & \
-                (df['Quality of Sleep (scale: 1-10)'] >= 8) & \
-                (df['Data_Quality_Flag'] == 'Normal')
-df.loc[condition_6_1, 'Data_Quality_Flag'] = 'Anomaly'
-df.loc[condition_6_1, 'Anomaly_Type'] = 'STRESS_SLEEP_6.1'
-anomaly_count['STRESS_SLEEP_6.1'] = condition_6_1.sum()
-print(f"  - 类型6.1 (高压力但高睡眠质量): {condition_6_1.sum()}条")
-
-# 条件6.2：压力<=2 且 睡眠质量<=4（且尚未被标记）
-condition_6_2 = (df['Stress Level (scale: 1-10)'] <= 2) & \
-                (df['Quality of Sleep (scale: 1-10)'] <= 4) & \
-                (df['Data_Quality_Flag'] == 'Normal')
-df.loc[condition_6_2, 'Data_Quality_Flag'] = 'Anomaly'
-df.loc[condition_6_2, 'Anomaly_Type'] = 'STRESS_SLEEP_6.2'
-anomaly_count['STRESS_SLEEP_6.2'] = condition_6_2.sum()
-print(f"  - 类型6.2 (低压力但低睡眠质量): {condition_6_2.sum()}条")
-
-# 条件9.1：日步数>=18000 且 运动时长<=30（且尚未被标记）
-condition_9_1 = (df['Daily Steps'] >= 18000) & \
-                (df['Physical Activity Level (minutes/day)'] <= 30) & \
-                (df['Data_Quality_Flag'] == 'Normal')
-df.loc[condition_9_1, 'Data_Quality_Flag'] = 'Anomaly'
-df.loc[condition_9_1, 'Anomaly_Type'] = 'STEPS_ACTIVITY_9.1'
-anomaly_count['STEPS_ACTIVITY_9.1'] = condition_9_1.sum()
-print(f"  - 类型9.1 (高步数但低运动时长): {condition_9_1.sum()}条")
+df, anomaly_count = annotate_anomalies(df)
+for anomaly_type, count in anomaly_count.items():
+    print(f"  - 类型{anomaly_type.rsplit('_', 1)[1]} ({ANOMALY_DESCRIPTIONS[anomaly_type]}): {count}条")
 
 # 统计异常总数
 total_anomalies = (df['Data_Quality_Flag'] == 'Anomaly').sum()
@@ -87,19 +39,17 @@ print("\n[步骤5] 生成清洗后的数据集...")
 
 # 5.1 完整标注数据集（包含所有记录和质量标记）
 df_full_annotated = df.copy()
-df_full_annotated.to_csv('sleep_health_lifestyle_dataset_full_annotated.csv', index=False)
+write_dataset(df_full_annotated, 'sleep_health_lifestyle_dataset_full_annotated.csv')
 print(f"✓ 完整标注数据集: sleep_health_lifestyle_dataset_full_annotated.csv ({len(df_full_annotated)}条)")
 
 # 5.2 清洗后数据集（仅包含正常记录）
-df_cleaned = df[df['Data_Quality_Flag'] == 'Normal'].copy()
 # 删除质量标记列（这些列只用于内部标注）
-df_cleaned = df_cleaned.drop(columns=['Data_Quality_Flag', 'Anomaly_Type'])
-df_cleaned.to_csv('sleep_health_lifestyle_dataset_cleaned.csv', index=False)
+df_cleaned, df_anomalies = split_annotated(df)
+write_dataset(df_cleaned, 'sleep_health_lifestyle_dataset_cleaned.csv')
 print(f"✓ 清洗后数据集: sleep_health_lifestyle_dataset_cleaned.csv ({len(df_cleaned)}条)")
 
 # 5.3 异常数据集（仅包含异常记录）
-df_anomalies = df[df['Data_Quality_Flag'] == 'Anomaly'].copy()
-df_anomalies.to_csv('sleep_health_lifestyle_dataset_anomalies.csv', index=False)
+write_dataset(df_anomalies, 'sleep_health_lifestyle_dataset_anomalies.csv')
 print(f"✓ 异常数据集: sleep_health_lifestyle_dataset_anomalies.csv ({len(df_anomalies)}条)")
 
 # 6. 生成清洗报告
@@ -129,13 +79,7 @@ report_lines.append("| 异常类型 | 描述 | 数量 | 占总异常比例 |")
 report_lines.append("|---------|------|------|-------------|")
 
 for anomaly_type, count in anomaly_count.items():
-    desc = {
-        'AGE_OCCUPATION_1.2': '年龄<30岁但职业为Retired',
-        'AGE_OCCUPATION_1.3': '年龄>=70岁但职业为Student',
-        'STRESS_SLEEP_6.1': '压力>=9分但睡眠质量>=8分',
-        'STRESS_SLEEP_6.2': '压力<=2分但睡眠质量<=4分',
-        'STEPS_ACTIVITY_9.1': '日步数>=18000但运动时长<=30分钟'
-    }[anomaly_type]
+    desc = ANOMALY_DESCRIPTIONS[anomaly_type]
     
     pct = (count / total_anomalies * 100) if total_anomalies > 0 else 0
     report_lines.append(f"| {anomaly_type} | {desc} | {count} | {pct:.2f}% |")
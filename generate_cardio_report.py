@@ -1,12 +1,13 @@
 """
 心血管健康评分 - 个人报告生成器
 """
-import pandas as pd
 import sys
 
+from utils.storage import read_dataset
+
 def generate_report(person_id=None):
     try:
-        df = pd.read_csv('cardio_health_score_results.csv')
+        df = read_dataset('cardio_health_score_results.csv')
     except:
         print("未找到结果文件")
         return
@@ -1,8 +1,9 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+from utils.storage import read_dataset
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei', 'Arial Unicode MS']
 plt.rcParams['axes.unicode_minus'] = False
@@ -13,7 +14,7 @@ print("=" * 80)
 
 # 读取清洗后的数据
 print("\n读取清洗后的数据集...")
-df = pd.read_csv('sleep_health_lifestyle_dataset_cleaned.csv')
+df = read_dataset('sleep_health_lifestyle_dataset_cleaned.csv')
 print(f"✓ 数据加载成功，共 {len(df)} 条记录")
 
 # 解析血压数据
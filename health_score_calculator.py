@@ -3,9 +3,29 @@
 基于职业分类的个性化健康评分系统
 """
 
+import argparse
+import sys
+
 import pandas as pd
 import numpy as np
 
+from utils.scoring import round_half
+from utils.running_stats import RunningStats, RunningCounts, RunningGroupMeans
+from utils.storage import read_chunks, DatasetWriter
+from utils.parallel import map_chunks
+from utils.incremental import incremental_score, rules_fingerprint, RowHashWriter
+from utils import scoring, scoring_rules
+from utils.scoring_rules import (
+    HEALTH_STEPS, HEALTH_ACTIVITY, HEALTH_ACTIVITY_MANUAL_LABOR, HEALTH_BMI,
+    HEALTH_STRESS, HEALTH_SLEEP_DURATION, HEALTH_SLEEP_QUALITY
+)
+
+# 健康分数依赖的输入列 (增量模式按这些列的内容哈希判断是否需要重新评分)
+SCORE_INPUT_COLUMNS = [
+    'Occupation', 'Daily Steps', 'Physical Activity Level (minutes/day)', 'BMI Category',
+    'Stress Level (scale: 1-10)', 'Sleep Duration (hours)', 'Quality of Sleep (scale: 1-10)'
+]
+
 
 class HealthScoreCalculator:
     """健康分数计算器"""
@@ -57,6 +77,9 @@ class HealthScoreCalculator:
                 'sleep_quality': +0.03
             }
         }
+        
+        # 健康等级 (由低到高, 分数线见 get_health_level)
+        self.health_levels = np.array(['差', '较差', '中等', '良好', '优秀'], dtype=object)
     
     def get_occupation_weights(self, occupation):
         """
@@ -94,20 +117,8 @@ class HealthScoreCalculator:
         Returns:
             float: 评分 (0-100)
         """
-        if daily_steps >= 10000:
-            return 100.0
-        elif daily_steps >= 7000:
-            # 7000-9999步: 80-99分线性插值
-            return 80 + (daily_steps - 7000) / 3000 * 19
-        elif daily_steps >= 5000:
-            # 5000-6999步: 60-79分
-            return 60 + (daily_steps - 5000) / 2000 * 19
-        elif daily_steps >= 3000:
-            # 3000-4999步: 40-59分
-            return 40 + (daily_steps - 3000) / 2000 * 19
-        else:
-            # <3000步: 20-39分
-            return max(20, 20 + daily_steps / 3000 * 19)
+        # 规则见 utils.scoring_rules.HEALTH_STEPS
+        return HEALTH_STEPS.score(daily_steps)
     
     def score_activity(self, activity_minutes, occupation=None):
         """
@@ -120,24 +131,10 @@ class HealthScoreCalculator:
         Returns:
             float: 评分 (0-100)
         """
-        if 60 <= activity_minutes <= 90:
-            return 100.0
-        elif 30 <= activity_minutes < 60:
-            # 30-59分钟: 80-99分
-            return 80 + (activity_minutes - 30) / 30 * 19
-        elif 15 <= activity_minutes < 30:
-            # 15-29分钟: 60-79分
-            return 60 + (activity_minutes - 15) / 15 * 19
-        elif activity_minutes < 15:
-            return 40.0
-        else:  # >90分钟
-            # 体力劳动者不扣分,其他职业适度扣分
-            if occupation == 'Manual Labor':
-                return 100.0
-            else:
-                # 超过90分钟后逐渐降低分数
-                excess = activity_minutes - 90
-                return max(70, 100 - excess * 0.2)
+        # 体力劳动者超过90分钟不扣分,其他职业适度扣分 (规则见 utils.scoring_rules)
+        if occupation == 'Manual Labor':
+            return HEALTH_ACTIVITY_MANUAL_LABOR.score(activity_minutes)
+        return HEALTH_ACTIVITY.score(activity_minutes)
     
     def score_bmi(self, bmi_category):
         """
@@ -149,13 +146,7 @@ class HealthScoreCalculator:
         Returns:
             float: 评分 (0-100)
         """
-        bmi_scores = {
-            'Normal': 100.0,
-            'Overweight': 70.0,
-            'Underweight': 70.0,
-            'Obese': 40.0
-        }
-        return bmi_scores.get(bmi_category, 50.0)
+        return HEALTH_BMI.score(bmi_category)
     
     def score_stress(self, stress_level):
         """
@@ -167,21 +158,8 @@ class HealthScoreCalculator:
         Returns:
             float: 评分 (0-100)
         """
-        if 3 <= stress_level <= 5:
-            # 适度压力
-            return 100.0
-        elif 6 <= stress_level <= 7:
-            # 中等压力
-            return 70.0
-        elif 1 <= stress_level <= 2:
-            # 压力过低
-            return 60.0
-        elif stress_level == 8:
-            return 40.0
-        elif stress_level == 9:
-            return 35.0
-        else:  # stress_level == 10
-            return 30.0
+        # 适度压力(3-5)满分, 压力过低或过高均扣分 (规则见 utils.scoring_rules.HEALTH_STRESS)
+        return HEALTH_STRESS.score(stress_level)
     
     def score_sleep_duration(self, sleep_hours):
         """
@@ -193,20 +171,8 @@ class HealthScoreCalculator:
         Returns:
             float: 评分 (0-100)
         """
-        if 7 <= sleep_hours <= 9:
-            # 理想睡眠时长
-            return 100.0
-        elif 6 <= sleep_hours < 7:
-            return 80.0
-        elif 9 < sleep_hours <= 10:
-            return 85.0
-        elif 5 <= sleep_hours < 6:
-            return 60.0
-        elif sleep_hours < 5:
-            return 30.0
-        else:  # >10小时
-            # 过度睡眠
-            return 50.0
+        # 理想睡眠时长7-9小时 (规则见 utils.scoring_rules.HEALTH_SLEEP_DURATION)
+        return HEALTH_SLEEP_DURATION.score(sleep_hours)
     
     def score_sleep_quality(self, quality_score):
         """
@@ -218,18 +184,8 @@ class HealthScoreCalculator:
         Returns:
             float: 评分 (0-100)
         """
-        if 8 <= quality_score <= 10:
-            # 高质量睡眠
-            return 100.0
-        elif 6 <= quality_score < 8:
-            # 6-7分: 70-85分
-            return 70 + (quality_score - 6) / 2 * 15
-        elif 4 <= quality_score < 6:
-            # 4-5分: 50-65分
-            return 50 + (quality_score - 4) / 2 * 15
-        else:  # 1-3分
-            # 1-3分: 20-45分
-            return 20 + (quality_score - 1) / 2 * 25
+        # 规则见 utils.scoring_rules.HEALTH_SLEEP_QUALITY
+        return HEALTH_SLEEP_QUALITY.score(quality_score)
     
     def get_health_level(self, score):
         """
@@ -312,55 +268,156 @@ class HealthScoreCalculator:
             'Weight_Sleep_Quality': round(weights['sleep_quality'], 3)
         }
 
+    def score_frame(self, df):
+        """
+        批量计算整个数据集的健康分数 (向量化)
+
+        评分规则与 calculate_health_score 完全相同 (同一套规则表), 但六项得分、
+        职业权重、总分和等级都以整列数组运算完成, 不再逐行调用评分方法
+
+        Args:
+            df: 包含原始字段的DataFrame
+
+        Returns:
+            DataFrame: 与 calculate_health_score 返回字典同名的14列, 索引与df一致
+        """
+        # 提取数据 (保持原始数值类型, 整数输入可直接查表)
+        occupation = df['Occupation']
+        is_manual_labor = (occupation == 'Manual Labor').to_numpy()
+        activity_minutes = df['Physical Activity Level (minutes/day)'].to_numpy()
+
+        # 各项得分: 每列按规则表求值一次
+        score_steps = HEALTH_STEPS(df['Daily Steps'].to_numpy())
+        score_activity = np.where(is_manual_labor,
+                                  HEALTH_ACTIVITY_MANUAL_LABOR(activity_minutes),
+                                  HEALTH_ACTIVITY(activity_minutes))
+        score_bmi = HEALTH_BMI(df['BMI Category'])
+        score_stress = HEALTH_STRESS(df['Stress Level (scale: 1-10)'].to_numpy())
+        score_sleep_dur = HEALTH_SLEEP_DURATION(df['Sleep Duration (hours)'].to_numpy())
+        score_sleep_qual = HEALTH_SLEEP_QUALITY(df['Quality of Sleep (scale: 1-10)'].to_numpy())
+
+        # 职业权重: 每种职业只计算一次, 再按职业编码取出 (编码-1即缺失值, 使用基础权重)
+        weight_keys = ['steps', 'activity', 'bmi', 'stress', 'sleep_duration', 'sleep_quality']
+        codes, occupations = pd.factorize(occupation)
+        weight_table = [self.get_occupation_weights(occ) for occ in occupations]
+        weight_table.append(self.base_weights.copy())
+        weights = {
+            key: np.array([w[key] for w in weight_table])[codes]
+            for key in weight_keys
+        }
+        rounded_weights = {
+            key: np.array([round(w[key], 3) for w in weight_table])[codes]
+            for key in weight_keys
+        }
+
+        # 加权求和
+        total_score = (
+            score_steps * weights['steps'] +
+            score_activity * weights['activity'] +
+            score_bmi * weights['bmi'] +
+            score_stress * weights['stress'] +
+            score_sleep_dur * weights['sleep_duration'] +
+            score_sleep_qual * weights['sleep_quality']
+        )
+
+        # 健康等级 (同 get_health_level): 按分数线分段取等级, 缺失值为'差'
+        level_codes = np.searchsorted([40, 55, 70, 85], total_score, side='right')
+        level_codes[np.isnan(total_score)] = 0
+        health_level = pd.Series(self.health_levels[level_codes], index=df.index, dtype=object)
+
+        return pd.DataFrame({
+            'Health_Score': round_half(total_score, 1),
+            'Health_Level': health_level,
+            'Score_Steps': round_half(score_steps, 1),
+            'Score_Activity': round_half(score_activity, 1),
+            'Score_BMI': round_half(score_bmi, 1),
+            'Score_Stress': round_half(score_stress, 1),
+            'Score_Sleep_Duration': round_half(score_sleep_dur, 1),
+            'Score_Sleep_Quality': round_half(score_sleep_qual, 1),
+            'Weight_Steps': rounded_weights['steps'],
+            'Weight_Activity': rounded_weights['activity'],
+            'Weight_BMI': rounded_weights['bmi'],
+            'Weight_Stress': rounded_weights['stress'],
+            'Weight_Sleep_Duration': rounded_weights['sleep_duration'],
+            'Weight_Sleep_Quality': rounded_weights['sleep_quality']
+        }, index=df.index)
+
+
+def score_partition(df):
+    """对一个数据分区评分并合并到原数据 (供进程池调用, 需为模块级函数)"""
+    return pd.concat([df, HealthScoreCalculator().score_frame(df)], axis=1)
+
 
 def main():
     """主函数:批量计算健康分数"""
+    parser = argparse.ArgumentParser(description='加权健康分数计算器')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='分块流式处理, 每块行数 (默认一次读入全部数据)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行评分的进程数 (默认1, 串行)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式: 只对新增或评分相关列有变化的行重新评分')
+    args = parser.parse_args()
+    if args.incremental and args.chunksize:
+        parser.error('--incremental 不能与 --chunksize 同时使用')
+
     print("=" * 80)
     print("加权健康分数计算器")
     print("=" * 80)
     
     # 读取清洗后的数据
     print("\n[1] 读取数据集...")
-    df = pd.read_csv('sleep_health_lifestyle_dataset_cleaned.csv')
-    print(f"✓ 数据集加载完成: {len(df)} 条记录")
-    
-    # 初始化计算器
-    calculator = HealthScoreCalculator()
+    chunks = read_chunks('sleep_health_lifestyle_dataset_cleaned.csv', args.chunksize)
+    if args.chunksize:
+        print(f"✓ 分块读取: 每块 {args.chunksize} 条记录")
+    else:
+        print(f"✓ 数据集加载完成: {len(chunks[0])} 条记录")
     
-    # 批量计算健康分数
+    # 批量计算健康分数: 逐块(可多进程)评分、合并到原数据并按原顺序追加写出, 统计量跨块累积
     print("\n[2] 计算健康分数...")
-    results = []
-    for idx, row in df.iterrows():
-        result = calculator.calculate_health_score(row)
-        results.append(result)
-    
-    # 将结果转换为DataFrame
-    results_df = pd.DataFrame(results)
-    
-    # 合并到原数据集
-    df_with_scores = pd.concat([df, results_df], axis=1)
-    
-    # 保存结果
     output_file = 'sleep_health_lifestyle_dataset_with_scores.csv'
-    df_with_scores.to_csv(output_file, index=False)
+    writer = DatasetWriter(output_file)
+    score_stats = RunningStats()
+    level_counts = RunningCounts('Health_Level')
+    occupation_means = RunningGroupMeans()
+    fingerprint = rules_fingerprint(sys.modules[__name__], scoring, scoring_rules)
+    if args.incremental:
+        # 增量模式: 只对新增或依赖列变化的行重新评分 (可多进程), 其余行复用上次结果
+        def score_changed(changed):
+            (scored,) = map_chunks(score_partition, [changed], args.workers, split=True)
+            return scored
+        (df,) = chunks
+        df_with_scores, n_rescored = incremental_score(df, score_changed, SCORE_INPUT_COLUMNS, output_file, fingerprint)
+        print(f"增量模式: 重新评分 {n_rescored} 条, 复用上次结果 {len(df) - n_rescored} 条")
+        results = [df_with_scores]
+    else:
+        results = map_chunks(score_partition, chunks, args.workers, split=not args.chunksize)
+    hash_writer = RowHashWriter(output_file, SCORE_INPUT_COLUMNS, fingerprint)
+    for df_with_scores in results:
+        writer.write(df_with_scores)
+        hash_writer.write(df_with_scores)
+
+        score_stats.update(df_with_scores['Health_Score'])
+        level_counts.update(df_with_scores['Health_Level'])
+        occupation_means.update(df_with_scores['Occupation'], df_with_scores['Health_Score'])
+    writer.close()
     print(f"✓ 健康分数计算完成,已保存到: {output_file}")
     
     # 统计分析
     print("\n[3] 健康分数统计:")
-    print(f"  平均分: {results_df['Health_Score'].mean():.1f}")
-    print(f"  中位数: {results_df['Health_Score'].median():.1f}")
-    print(f"  最高分: {results_df['Health_Score'].max():.1f}")
-    print(f"  最低分: {results_df['Health_Score'].min():.1f}")
+    print(f"  平均分: {score_stats.mean():.1f}")
+    print(f"  中位数: {score_stats.median():.1f}")
+    print(f"  最高分: {score_stats.max:.1f}")
+    print(f"  最低分: {score_stats.min:.1f}")
     
     print("\n[4] 健康等级分布:")
-    level_counts = results_df['Health_Level'].value_counts()
     for level in ['优秀', '良好', '中等', '较差', '差']:
         count = level_counts.get(level, 0)
-        pct = count / len(results_df) * 100
+        pct = count / writer.rows * 100
         print(f"  {level}: {count}人 ({pct:.1f}%)")
     
     print("\n[5] 各职业平均健康分数:")
-    occupation_scores = df_with_scores.groupby('Occupation')['Health_Score'].mean().sort_values(ascending=False)
+    occupation_scores = occupation_means.means().sort_values(ascending=False)
     for occupation, score in occupation_scores.items():
         print(f"  {occupation}: {score:.1f}分")
     
@@ -3,13 +3,22 @@
 生成健康分数的各类统计图表 - 使用英文标签避免字体问题
 """
 
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.storage import read_dataset
+
+# 图表用到的列 (只读取这些列)
+PLOT_COLUMNS = [
+    'Occupation', 'Daily Steps', 'Physical Activity Level (minutes/day)', 'Stress Level (scale: 1-10)',
+    'Sleep Duration (hours)', 'Quality of Sleep (scale: 1-10)', 'Health_Score', 'Health_Level',
+    'Score_Steps', 'Score_Activity', 'Score_BMI', 'Score_Stress', 'Score_Sleep_Duration', 'Score_Sleep_Quality',
+    'Weight_Steps', 'Weight_Activity', 'Weight_BMI', 'Weight_Stress', 'Weight_Sleep_Duration', 'Weight_Sleep_Quality'
+]
+
 # 设置样式
 sns.set_style("whitegrid")
 plt.rcParams['figure.dpi'] = 100
@@ -211,7 +220,7 @@ def main():
     
     # 读取带分数的数据
     print("\n[1] Loading data...")
-    df = pd.read_csv('sleep_health_lifestyle_dataset_with_scores.csv')
+    df = read_dataset('sleep_health_lifestyle_dataset_with_scores.csv', columns=PLOT_COLUMNS)
     print(f"✓ Data loaded: {len(df)} records")
     
     # 生成各类图表
@@ -0,0 +1,222 @@
+"""
+增量导入守护进程
+监视收件箱目录, 新的调查批次 (与 sleep_health_lifestyle_dataset.csv 结构相同的CSV) 出现后,
+只对这一批做校验、清洗标注与三套评分, 结果追加到各数据集文件末尾 (行哈希旁路文件同步追加,
+之后各评分脚本的 --incremental 仍可接着使用); 仪表板检测到数据文件增长后只读入新增的行
+(utils.dataset_store), 不需要重跑清洗、评分和绘图脚本
+
+处理成功的批次移到 <收件箱>/processed/, 校验失败的移到 <收件箱>/rejected/ 并附带 .error.txt 说明;
+写入方应先写到其他目录或其他后缀, 写完后再改名为 .csv 放入收件箱
+
+用法:
+    python ingest_daemon.py                      # 监视 inbox/ 目录, 每2秒检查一次
+    python ingest_daemon.py --inbox drops --once # 只处理当前已有的批次后退出
+"""
+import argparse
+import os
+import shutil
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import cardio_score_calculator
+import comprehensive_sleep_index
+import health_score_calculator
+from scoring_pipeline import score_all
+from utils import scoring, scoring_rules
+from utils.cleaning import annotate_anomalies, split_annotated
+from utils.incremental import RowHashWriter, hash_path, rules_fingerprint
+from utils.storage import append_dataset, dataset_columns, read_dataset
+
+DATA_FILE = 'sleep_health_lifestyle_dataset.csv'
+ANNOTATED_FILE = 'sleep_health_lifestyle_dataset_full_annotated.csv'
+CLEANED_FILE = 'sleep_health_lifestyle_dataset_cleaned.csv'
+ANOMALIES_FILE = 'sleep_health_lifestyle_dataset_anomalies.csv'
+
+# 评分结果: (结果文件, 评分模块 (提供 SCORE_INPUT_COLUMNS 与规则指纹), 评分函数)
+SCORE_OUTPUTS = [
+    ('sleep_health_lifestyle_dataset_with_scores.csv', health_score_calculator, health_score_calculator.score_partition),
+    ('cardio_health_score_results.csv', cardio_score_calculator, cardio_score_calculator.score_partition),
+    ('comprehensive_sleep_health_index.csv', comprehensive_sleep_index, score_all),
+]
+
+KEY = 'Person ID'
+BLOOD_PRESSURE = 'Blood Pressure (systolic/diastolic)'
+TEXT_COLUMNS = ['Gender', 'Occupation', 'BMI Category', BLOOD_PRESSURE, 'Sleep Disorder']
+REQUIRED_TEXT_COLUMNS = ['Gender', 'Occupation', 'BMI Category', BLOOD_PRESSURE]
+
+
+class BatchError(ValueError):
+    """批次不符合导入要求"""
+
+
+def _rows(mask, limit=5):
+    """出错行在CSV文件中的行号 (表头为第1行), 最多列出 limit 个"""
+    lines = [str(i + 2) for i in mask.to_numpy().nonzero()[0][:limit]]
+    return ', '.join(lines) + (' ...' if mask.sum() > limit else '')
+
+
+def validate_batch(batch, columns, known_ids):
+    """
+    校验一个批次
+
+    Args:
+        batch: 读入的批次
+        columns: 数据集的列 (批次须恰好包含这些列, 顺序不限)
+        known_ids: 已导入的 Person ID
+
+    Returns:
+        DataFrame: 按数据集列顺序排列的批次
+
+    Raises:
+        BatchError: 列不一致、数值无效、必填项缺失或 Person ID 重复
+    """
+    missing = [c for c in columns if c not in batch.columns]
+    extra = [c for c in batch.columns if c not in columns]
+    if missing or extra:
+        raise BatchError(f"列与数据集不一致: 缺少 {missing}, 多出 {extra}")
+    batch = batch[columns]
+    if batch.empty:
+        raise BatchError("批次中没有记录")
+
+    for column in columns:
+        if column in TEXT_COLUMNS:
+            continue
+        invalid = pd.to_numeric(batch[column], errors='coerce').isna()
+        if invalid.any():
+            raise BatchError(f"列 {column} 第 {_rows(invalid)} 行不是有效数值")
+    for column in REQUIRED_TEXT_COLUMNS:
+        invalid = batch[column].isna()
+        if invalid.any():
+            raise BatchError(f"列 {column} 第 {_rows(invalid)} 行缺失")
+    invalid = ~batch[BLOOD_PRESSURE].astype(str).str.fullmatch(r'\d+/\d+')
+    if invalid.any():
+        raise BatchError(f"列 {BLOOD_PRESSURE} 第 {_rows(invalid)} 行不是 收缩压/舒张压 格式")
+
+    duplicated = batch[KEY].duplicated(keep=False) | batch[KEY].isin(known_ids)
+    if duplicated.any():
+        raise BatchError(f"{KEY} 第 {_rows(duplicated)} 行在批次内重复或已导入")
+    return batch
+
+
+def ingest_batch(batch):
+    """
+    导入一个已校验的批次: 清洗标注, 对正常记录评分, 追加到各数据集文件
+
+    原始数据最后追加: 仪表板以它的增长为准, 读到新记录时评分结果已经写好
+
+    Returns:
+        dict: 各类记录数
+    """
+    annotated, _ = annotate_anomalies(batch)
+    cleaned, anomalies = split_annotated(annotated)
+    cleaned = cleaned.reset_index(drop=True)
+
+    append_dataset(annotated, ANNOTATED_FILE)
+    append_dataset(cleaned, CLEANED_FILE)
+    if len(anomalies):
+        append_dataset(anomalies, ANOMALIES_FILE)
+
+    if len(cleaned):
+        for output_file, module, score in SCORE_OUTPUTS:
+            scored = score(cleaned)
+            append_dataset(scored, output_file)
+            # 旁路文件不存在时不新建: 只含新批次的哈希与结果文件对不上, 下次增量运行会全量重算
+            if os.path.exists(hash_path(output_file)):
+                fingerprint = rules_fingerprint(module, scoring, scoring_rules)
+                RowHashWriter(output_file, module.SCORE_INPUT_COLUMNS, fingerprint, append=True).write(scored)
+
+    # 原始数据集中没有睡眠障碍记为 'None'
+    append_dataset(batch.fillna({'Sleep Disorder': 'None'}), DATA_FILE)
+    return {'records': len(batch), 'cleaned': len(cleaned), 'anomalies': len(anomalies)}
+
+
+class Inbox:
+    """
+    收件箱目录
+
+    Args:
+        directory: 收件箱路径 (不存在时创建)
+        settle: 文件最后修改后至少经过的秒数, 之前视为仍在写入
+    """
+
+    def __init__(self, directory, settle=1.0):
+        self.directory = directory
+        self.settle = settle
+        self.processed = os.path.join(directory, 'processed')
+        self.rejected = os.path.join(directory, 'rejected')
+        for path in (directory, self.processed, self.rejected):
+            os.makedirs(path, exist_ok=True)
+
+    def ready(self):
+        """已经写完的批次文件, 按修改时间先后排列"""
+        now = time.time()
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith('.csv') and not name.startswith('.')]
+        paths = [p for p in paths if os.path.isfile(p) and now - os.path.getmtime(p) >= self.settle]
+        return sorted(paths, key=os.path.getmtime)
+
+    def _move(self, path, directory):
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        target = os.path.join(directory, f"{stamp}_{os.path.basename(path)}")
+        shutil.move(path, target)
+        return target
+
+    def done(self, path):
+        return self._move(path, self.processed)
+
+    def reject(self, path, reason):
+        target = self._move(path, self.rejected)
+        with open(target + '.error.txt', 'w', encoding='utf-8') as f:
+            f.write(reason + '\n')
+        return target
+
+
+def process(inbox, columns, known_ids):
+    """处理收件箱中当前所有已写完的批次; 返回处理的批次数"""
+    paths = inbox.ready()
+    for path in paths:
+        start = time.perf_counter()
+        name = os.path.basename(path)
+        try:
+            try:
+                batch = pd.read_csv(path)
+            except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+                raise BatchError(f"无法读取CSV: {e}")
+            batch = validate_batch(batch, columns, known_ids)
+        except BatchError as e:
+            inbox.reject(path, str(e))
+            print(f"✗ {name}: {e}")
+            continue
+
+        counts = ingest_batch(batch)
+        known_ids.update(batch[KEY])
+        inbox.done(path)
+        print(f"✓ {name}: {counts['records']} 条 (正常 {counts['cleaned']}, 异常 {counts['anomalies']}), "
+              f"耗时 {time.perf_counter() - start:.2f}s")
+    return len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量导入: 监视收件箱目录, 只对新批次清洗评分并追加到数据集')
+    parser.add_argument('--inbox', default='inbox', help='收件箱目录')
+    parser.add_argument('--interval', type=float, default=2.0, help='检查间隔 (秒)')
+    parser.add_argument('--settle', type=float, default=1.0, help='文件最后修改后等待的秒数')
+    parser.add_argument('--once', action='store_true', help='处理当前已有的批次后退出')
+    args = parser.parse_args()
+
+    inbox = Inbox(args.inbox, args.settle)
+    columns = dataset_columns(DATA_FILE)
+    known_ids = set(read_dataset(DATA_FILE, columns=[KEY])[KEY])
+    print(f"监视收件箱: {args.inbox} (已有 {len(known_ids)} 条记录)")
+
+    while True:
+        process(inbox, columns, known_ids)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,18 +4,29 @@
 """
 
 import streamlit as st
-from utils.data_loader import load_and_preprocess_data, filter_data
+from utils.data_loader import filter_data
+from utils.dataset_store import load_datasets, load_insights, load_filter_index, load_charts, show_chart
 from utils.insights import get_top_occupation_by_stress
+from utils.profiling_panel import show_profiling, start_profiling
+
+# 本页图表 (sleep_health_analysis.CHARTS 中的ID)
+CHART_IDS = [
+    '02_activity_sleep_regression',
+    '03_occupation_stress_boxplot',
+    '08_activity_segments_line',
+    '12_occupation_horizontal_bars',
+    '18_stress_sleep_quality_line',
+    '19_steps_occupation_facet',
+]
 
 # 页面配置
 st.set_page_config(page_title="生活方式分析", page_icon="🏃", layout="wide")
 
-# 加载数据
-@st.cache_data
-def load_data():
-    return load_and_preprocess_data('sleep_health_lifestyle_dataset.csv')
+# 性能剖析 (SAH_PROFILE 环境变量或 ?profile=1 启用)
+start_profiling(__file__)
 
-df, df_encoded = load_data()
+# 加载数据 (进程共享, 只读)
+df, df_encoded = load_datasets()
 
 # 页面标题
 st.title("🏃 生活方式分析")
@@ -30,12 +41,10 @@ occupation_filter = st.sidebar.multiselect(
     default=[]
 )
 
-if occupation_filter:
-    df_display = df[df['Occupation'].isin(occupation_filter)]
-else:
-    df_display = df
+df_display = filter_data(df, occupation=occupation_filter, index=load_filter_index())
+insights = load_insights(occupation=occupation_filter)
 
-st.sidebar.markdown(f"**当前样本数**: {len(df_display)} 条")
+st.sidebar.markdown(f"**当前样本数**: {insights.total} 条")
 
 # 核心洞察
 st.markdown("## 💡 核心洞察")
@@ -46,9 +55,9 @@ with col1:
     st.info(f"""
     ### 运动与睡眠
     
-    平均运动时长: **{df_display['Physical Activity Level (minutes/day)'].mean():.0f}** 分钟/天
+    平均运动时长: **{insights.stats['avg_activity']:.0f}** 分钟/天
     
-    相关性系数: **{df_display['Physical Activity Level (minutes/day)'].corr(df_display['Quality of Sleep (scale: 1-10)']):.3f}**
+    相关性系数: **{insights.activity_quality_corr:.3f}**
     
     运动量越高，睡眠质量通常越好 ✅
     """)
@@ -57,22 +66,23 @@ with col2:
     st.warning(f"""
     ### 压力最大职业 TOP 3
     
-    {get_top_occupation_by_stress(df_display, top_n=3)}
+    {get_top_occupation_by_stress(insights, top_n=3)}
     
     职业压力是影响睡眠的重要因素 ⚠️
     """)
 
 st.markdown("---")
 
-# 图表展示
+# 图表展示 (按侧边栏筛选条件绘制, 渲染结果进程内缓存)
 st.markdown("## 📊 数据可视化")
+charts = load_charts(CHART_IDS, occupation=occupation_filter)
 
 # 第一行：运动与睡眠 + 职业压力
 col_chart1, col_chart2 = st.columns(2)
 
 with col_chart1:
     st.markdown("### 🏃‍♂️ 运动与睡眠质量回归分析")
-    st.image('outputs/02_activity_sleep_regression.png', use_container_width=True)
+    show_chart(charts, '02_activity_sleep_regression')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -84,7 +94,7 @@ with col_chart1:
 
 with col_chart2:
     st.markdown("### 📦 职业压力分布箱线图")
-    st.image('outputs/03_occupation_stress_boxplot.png', use_container_width=True)
+    show_chart(charts, '03_occupation_stress_boxplot')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -101,7 +111,7 @@ col_chart3, col_chart4 = st.columns(2)
 
 with col_chart3:
     st.markdown("### 📈 运动量分段分析")
-    st.image('outputs/08_activity_segments_line.png', use_container_width=True)
+    show_chart(charts, '08_activity_segments_line')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -112,7 +122,7 @@ with col_chart3:
 
 with col_chart4:
     st.markdown("### 🎯 职业健康指标综合对比")
-    st.image('outputs/12_occupation_horizontal_bars.png', use_container_width=True)
+    show_chart(charts, '12_occupation_horizontal_bars')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -128,7 +138,7 @@ col_chart5, col_chart6 = st.columns(2)
 
 with col_chart5:
     st.markdown("### 😰 压力与睡眠质量趋势")
-    st.image('outputs/18_stress_sleep_quality_line.png', use_container_width=True)
+    show_chart(charts, '18_stress_sleep_quality_line')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -139,7 +149,7 @@ with col_chart5:
 
 with col_chart6:
     st.markdown("### 👣 每日步数职业分布")
-    st.image('outputs/19_steps_occupation_facet.png', use_container_width=True)
+    show_chart(charts, '19_steps_occupation_facet')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -179,3 +189,5 @@ st.markdown("""
     <p>💪 改善生活方式，从了解数据开始</p>
 </div>
 """, unsafe_allow_html=True)
+
+show_profiling()
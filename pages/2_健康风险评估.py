@@ -4,18 +4,29 @@
 """
 
 import streamlit as st
-from utils.data_loader import load_and_preprocess_data
+from utils.dataset_store import load_datasets, load_insights, load_charts, show_chart
 from utils.insights import generate_risk_insight
+from utils.profiling_panel import show_profiling, start_profiling
+
+# 本页图表 (sleep_health_analysis.CHARTS 中的ID)
+CHART_IDS = [
+    '04_bmi_disorder_countplot',
+    '10_bmi_sleep_violin',
+    '13_heartrate_stress_scatter',
+    '20_heartrate_stress_kde',
+    '16_bmi_heart_stress_dual',
+    '21_hypertension_risk_matrix',
+]
 
 # 页面配置
 st.set_page_config(page_title="健康风险评估", page_icon="💔", layout="wide")
 
-# 加载数据
-@st.cache_data
-def load_data():
-    return load_and_preprocess_data('sleep_health_lifestyle_dataset.csv')
+# 性能剖析 (SAH_PROFILE 环境变量或 ?profile=1 启用)
+start_profiling(__file__)
 
-df, df_encoded = load_data()
+# 加载数据 (进程共享, 只读)
+df, df_encoded = load_datasets()
+insights = load_insights()
 
 # 页面标题
 st.title("💔 健康风险评估")
@@ -28,30 +39,31 @@ st.markdown("## 🚨 风险警报")
 col_alert1, col_alert2, col_alert3 = st.columns(3)
 
 with col_alert1:
-    obese_count = (df['BMI Category'] == 'Obese').sum()
-    obese_rate = obese_count / len(df) * 100
+    obese_count = insights.obese
+    obese_rate = obese_count / insights.total * 100
     st.metric("肥胖人群", f"{obese_count} 人", f"{obese_rate:.1f}%")
 
 with col_alert2:
-    high_bp_count = (df['Systolic_BP'] >= 140).sum()
-    high_bp_rate = high_bp_count / len(df) * 100
+    high_bp_count = insights.high_bp
+    high_bp_rate = high_bp_count / insights.total * 100
     st.metric("高血压风险", f"{high_bp_count} 人", f"{high_bp_rate:.1f}%", delta_color="inverse")
 
 with col_alert3:
-    high_hr_count = (df['Heart Rate (bpm)'] >= 100).sum()
-    high_hr_rate = high_hr_count / len(df) * 100
+    high_hr_count = insights.high_hr
+    high_hr_rate = high_hr_count / insights.total * 100
     st.metric("心率过快", f"{high_hr_count} 人", f"{high_hr_rate:.1f}%", delta_color="inverse")
 
 st.markdown("---")
 
 # 核心洞察
 st.markdown("## 💡 核心洞察")
-st.error(generate_risk_insight(df))
+st.error(generate_risk_insight(insights))
 
 st.markdown("---")
 
-# 图表展示
+# 图表展示 (由当前数据绘制, 渲染结果进程内缓存)
 st.markdown("## 📊 数据可视化")
+charts = load_charts(CHART_IDS)
 
 # 第一行：BMI相关分析
 st.markdown("### 🏋️ BMI 与睡眠障碍")
@@ -60,7 +72,7 @@ col_chart1, col_chart2 = st.columns(2)
 
 with col_chart1:
     st.markdown("#### BMI类别与睡眠障碍分布")
-    st.image('outputs/04_bmi_disorder_countplot.png', use_container_width=True)
+    show_chart(charts, '04_bmi_disorder_countplot')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -72,7 +84,7 @@ with col_chart1:
 
 with col_chart2:
     st.markdown("#### BMI类别与睡眠时长分布")
-    st.image('outputs/10_bmi_sleep_violin.png', use_container_width=True)
+    show_chart(charts, '10_bmi_sleep_violin')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -91,7 +103,7 @@ col_chart3, col_chart4 = st.columns(2)
 
 with col_chart3:
     st.markdown("#### 心率与压力散点图")
-    st.image('outputs/13_heartrate_stress_scatter.png', use_container_width=True)
+    show_chart(charts, '13_heartrate_stress_scatter')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -103,7 +115,7 @@ with col_chart3:
 
 with col_chart4:
     st.markdown("#### 心率压力核密度估计")
-    st.image('outputs/20_heartrate_stress_kde.png', use_container_width=True)
+    show_chart(charts, '20_heartrate_stress_kde')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -121,7 +133,7 @@ col_chart5, col_chart6 = st.columns(2)
 
 with col_chart5:
     st.markdown("#### BMI、心率、压力综合分析")
-    st.image('outputs/16_bmi_heart_stress_dual.png', use_container_width=True)
+    show_chart(charts, '16_bmi_heart_stress_dual')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -133,7 +145,7 @@ with col_chart5:
 
 with col_chart6:
     st.markdown("#### 高血压风险矩阵")
-    st.image('outputs/21_hypertension_risk_matrix.png', use_container_width=True)
+    show_chart(charts, '21_hypertension_risk_matrix')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -203,3 +215,5 @@ st.markdown("""
     <p>⚕️ 预防胜于治疗，定期健康检查很重要</p>
 </div>
 """, unsafe_allow_html=True)
+
+show_profiling()
@@ -4,19 +4,29 @@
 """
 
 import streamlit as st
-import pandas as pd
-from utils.data_loader import load_and_preprocess_data
+from utils.dataset_store import load_datasets, load_cohort_cube, load_insights, load_charts, show_chart
 from utils.insights import generate_gender_insight
+from utils.profiling_panel import show_profiling, start_profiling
+
+# 本页图表 (sleep_health_analysis.CHARTS 中的ID)
+CHART_IDS = [
+    '06_age_sleep_quality_line',
+    '24_age_health_trajectory',
+    '14_occupation_gender_dual',
+    '23_gender_stress_interaction',
+    '15_exercise_gender_defense_dual',
+    '17_age_gender_sleep_heatmap',
+]
 
 # 页面配置
 st.set_page_config(page_title="人群差异洞察", page_icon="👥", layout="wide")
 
-# 加载数据
-@st.cache_data
-def load_data():
-    return load_and_preprocess_data('sleep_health_lifestyle_dataset.csv')
+# 性能剖析 (SAH_PROFILE 环境变量或 ?profile=1 启用)
+start_profiling(__file__)
 
-df, df_encoded = load_data()
+# 加载数据 (进程共享, 只读)
+df, df_encoded = load_datasets()
+cohort = load_cohort_cube().view()
 
 # 页面标题
 st.title("👥 人群差异洞察")
@@ -29,31 +39,32 @@ st.markdown("## 📊 人群统计")
 col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
 
 with col_stat1:
-    male_count = (df['Gender'] == 'Male').sum()
-    female_count = (df['Gender'] == 'Female').sum()
+    male_count = cohort.within(gender='Male').count()
+    female_count = cohort.within(gender='Female').count()
     st.metric("男性样本", f"{male_count} 人", f"{male_count/(male_count+female_count)*100:.1f}%")
 
 with col_stat2:
     st.metric("女性样本", f"{female_count} 人", f"{female_count/(male_count+female_count)*100:.1f}%")
 
 with col_stat3:
-    avg_age = df['Age'].mean()
+    avg_age = cohort.mean('Age')
     st.metric("平均年龄", f"{avg_age:.1f} 岁")
 
 with col_stat4:
-    age_range = df['Age'].max() - df['Age'].min()
-    st.metric("年龄跨度", f"{df['Age'].min()}-{df['Age'].max()} 岁")
+    age_min, age_max = cohort.age_span()
+    st.metric("年龄跨度", f"{age_min}-{age_max} 岁")
 
 st.markdown("---")
 
 # 性别差异洞察
 st.markdown("## 💡 性别差异洞察")
-st.info(generate_gender_insight(df))
+st.info(generate_gender_insight(load_insights()))
 
 st.markdown("---")
 
-# 图表展示
+# 图表展示 (由当前数据绘制, 渲染结果进程内缓存)
 st.markdown("## 📊 数据可视化")
+charts = load_charts(CHART_IDS)
 
 # 第一行：年龄趋势分析
 st.markdown("### 📈 年龄趋势分析")
@@ -62,7 +73,7 @@ col_chart1, col_chart2 = st.columns(2)
 
 with col_chart1:
     st.markdown("#### 年龄段睡眠质量变化趋势")
-    st.image('outputs/06_age_sleep_quality_line.png', use_container_width=True)
+    show_chart(charts, '06_age_sleep_quality_line')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -75,7 +86,7 @@ with col_chart1:
 
 with col_chart2:
     st.markdown("#### 年龄与健康轨迹")
-    st.image('outputs/24_age_health_trajectory.png', use_container_width=True)
+    show_chart(charts, '24_age_health_trajectory')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -93,7 +104,7 @@ col_chart3, col_chart4 = st.columns(2)
 
 with col_chart3:
     st.markdown("#### 职业压力：性别对比")
-    st.image('outputs/14_occupation_gender_dual.png', use_container_width=True)
+    show_chart(charts, '14_occupation_gender_dual')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -105,7 +116,7 @@ with col_chart3:
 
 with col_chart4:
     st.markdown("#### 性别压力交互效应")
-    st.image('outputs/23_gender_stress_interaction.png', use_container_width=True)
+    show_chart(charts, '23_gender_stress_interaction')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -123,7 +134,7 @@ col_chart5, col_chart6 = st.columns(2)
 
 with col_chart5:
     st.markdown("#### 运动量与血压（性别分组）")
-    st.image('outputs/15_exercise_gender_defense_dual.png', use_container_width=True)
+    show_chart(charts, '15_exercise_gender_defense_dual')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -136,7 +147,7 @@ with col_chart5:
 
 with col_chart6:
     st.markdown("#### 年龄性别睡眠热力图")
-    st.image('outputs/17_age_gender_sleep_heatmap.png', use_container_width=True)
+    show_chart(charts, '17_age_gender_sleep_heatmap')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -155,14 +166,14 @@ col_table1, col_table2 = st.columns(2)
 
 with col_table1:
     st.markdown("### 性别对比")
-    gender_comparison = df.groupby('Gender').agg({
-        'Age': 'mean',
-        'Quality of Sleep (scale: 1-10)': 'mean',
-        'Sleep Duration (hours)': 'mean',
-        'Physical Activity Level (minutes/day)': 'mean',
-        'Stress Level (scale: 1-10)': 'mean',
-        'Heart Rate (bpm)': 'mean'
-    }).round(2)
+    gender_comparison = cohort.group_means('Gender', [
+        'Age',
+        'Quality of Sleep (scale: 1-10)',
+        'Sleep Duration (hours)',
+        'Physical Activity Level (minutes/day)',
+        'Stress Level (scale: 1-10)',
+        'Heart Rate (bpm)'
+    ]).round(2)
     
     gender_comparison.columns = ['平均年龄', '睡眠质量', '睡眠时长', '运动时长', '压力水平', '心率']
     st.dataframe(gender_comparison, use_container_width=True)
@@ -170,17 +181,14 @@ with col_table1:
 with col_table2:
     st.markdown("### 年龄段对比")
     
-    # 创建年龄段
-    df_temp = df.copy()
-    df_temp['年龄段'] = pd.cut(df_temp['Age'], bins=[20, 30, 40, 50, 60], 
-                              labels=['20-29岁', '30-39岁', '40-49岁', '50-59岁'])
-    
-    age_comparison = df_temp.groupby('年龄段').agg({
-        'Quality of Sleep (scale: 1-10)': 'mean',
-        'Sleep Duration (hours)': 'mean',
-        'Physical Activity Level (minutes/day)': 'mean',
-        'Stress Level (scale: 1-10)': 'mean'
-    }).round(2)
+    # 按年龄段汇总 (整岁单元再分段)
+    age_comparison = cohort.group_means('Age', [
+        'Quality of Sleep (scale: 1-10)',
+        'Sleep Duration (hours)',
+        'Physical Activity Level (minutes/day)',
+        'Stress Level (scale: 1-10)'
+    ], bins=[20, 30, 40, 50, 60], labels=['20-29岁', '30-39岁', '40-49岁', '50-59岁']).round(2)
+    age_comparison.index.name = '年龄段'
     
     age_comparison.columns = ['睡眠质量', '睡眠时长', '运动时长', '压力水平']
     st.dataframe(age_comparison, use_container_width=True)
@@ -234,3 +242,5 @@ st.markdown("""
     <p>🧬 了解人群差异，实现精准健康管理</p>
 </div>
 """, unsafe_allow_html=True)
+
+show_profiling()
@@ -4,18 +4,32 @@
 """
 
 import streamlit as st
-import pandas as pd
-from utils.data_loader import load_and_preprocess_data
+from utils.correlation import METHODS
+from utils.data_grid import PAGE_SIZES, page_count, page_frame, sorted_rows
+from utils.data_loader import filter_rows
+from utils.dataset_store import (
+    load_datasets, load_filter_index, load_sort_index, load_cohort_cube, load_describe, load_top_correlations,
+    load_charts, show_chart
+)
+from utils.export_widgets import export_button
+from utils.profiling_panel import show_profiling, start_profiling
+
+# 本页图表 (sleep_health_analysis.CHARTS 中的ID)
+CHART_IDS = [
+    '07_disorder_comparison_line',
+    '11_disorder_area',
+    '09_occupation_radar',
+    '22_disorder_radar_profile',
+]
 
 # 页面配置
 st.set_page_config(page_title="深度探索", page_icon="🔬", layout="wide")
 
-# 加载数据
-@st.cache_data
-def load_data():
-    return load_and_preprocess_data('sleep_health_lifestyle_dataset.csv')
+# 性能剖析 (SAH_PROFILE 环境变量或 ?profile=1 启用)
+start_profiling(__file__)
 
-df, df_encoded = load_data()
+# 加载数据 (进程共享, 只读)
+df, df_encoded = load_datasets()
 
 # 页面标题
 st.title("🔬 深度探索")
@@ -67,15 +81,16 @@ with col_disorder3:
 
 st.markdown("---")
 
-# 图表展示
+# 图表展示 (由当前数据绘制, 渲染结果进程内缓存)
 st.markdown("## 📊 睡眠障碍深度分析")
+charts = load_charts(CHART_IDS)
 
 # 第一行：障碍对比与分布
 col_chart1, col_chart2 = st.columns(2)
 
 with col_chart1:
     st.markdown("### 📈 睡眠障碍多维对比")
-    st.image('outputs/07_disorder_comparison_line.png', use_container_width=True)
+    show_chart(charts, '07_disorder_comparison_line')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -87,7 +102,7 @@ with col_chart1:
 
 with col_chart2:
     st.markdown("### 📊 睡眠障碍分布面积图")
-    st.image('outputs/11_disorder_area.png', use_container_width=True)
+    show_chart(charts, '11_disorder_area')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -103,7 +118,7 @@ col_chart3, col_chart4 = st.columns(2)
 
 with col_chart3:
     st.markdown("### 🎯 职业多维度雷达图")
-    st.image('outputs/09_occupation_radar.png', use_container_width=True)
+    show_chart(charts, '09_occupation_radar')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -115,7 +130,7 @@ with col_chart3:
 
 with col_chart4:
     st.markdown("### 🧬 睡眠障碍人群画像雷达")
-    st.image('outputs/22_disorder_radar_profile.png', use_container_width=True)
+    show_chart(charts, '22_disorder_radar_profile')
     
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -151,28 +166,45 @@ with col_filter3:
         ['全部'] + list(df['BMI Category'].unique())
     )
 
-# 应用筛选
-df_filtered = df.copy()
+# 应用筛选 (得到行号, 表格分页排序都在行号上进行)
+data_filters = dict(gender=selected_gender, bmi=selected_bmi, disorder=selected_disorder)
+filtered_rows = filter_rows(load_filter_index(), **data_filters)
+# 分类分布由人群聚合立方回答, 描述性统计按筛选条件缓存: 交互时不取出筛选后的数据
+cohort = load_cohort_cube().select(**data_filters)
+
+st.markdown(f"**筛选后样本数**: {len(filtered_rows)} 条")
 
-if selected_disorder != '全部':
-    df_filtered = df_filtered[df_filtered['Sleep Disorder'] == selected_disorder]
+# 表格控件: 排序与分页在服务端完成, 只把当前页发送到浏览器
+col_grid1, col_grid2, col_grid3, col_grid4 = st.columns(4)
 
-if selected_gender != '全部':
-    df_filtered = df_filtered[df_filtered['Gender'] == selected_gender]
+with col_grid1:
+    sort_column = st.selectbox("排序列", ['原始顺序'] + list(df.columns))
 
-if selected_bmi != '全部':
-    df_filtered = df_filtered[df_filtered['BMI Category'] == selected_bmi]
+with col_grid2:
+    sort_order = st.radio("排序方向", ['升序', '降序'], horizontal=True)
+
+with col_grid3:
+    page_size = st.selectbox("每页行数", PAGE_SIZES, index=PAGE_SIZES.index(100))
+
+grid_rows = sorted_rows(
+    filtered_rows,
+    load_sort_index(),
+    column=None if sort_column == '原始顺序' else sort_column,
+    ascending=sort_order == '升序'
+)
+n_pages = page_count(len(grid_rows), page_size)
 
-st.markdown(f"**筛选后样本数**: {len(df_filtered)} 条")
+with col_grid4:
+    page = st.number_input("页码", min_value=1, max_value=n_pages, value=1, step=1)
 
 # 显示数据表
 st.dataframe(
-    df_filtered.head(100),
+    page_frame(df, grid_rows, page, page_size),
     use_container_width=True,
     height=400
 )
 
-st.caption("💡 提示: 显示前100条数据，可使用下方下载按钮获取完整数据")
+st.caption(f"💡 第 {page}/{n_pages} 页, 每页 {page_size} 条; 完整数据可使用下方下载按钮获取")
 
 st.markdown("---")
 
@@ -183,8 +215,7 @@ tab1, tab2, tab3 = st.tabs(["描述性统计", "分类变量分布", "相关性
 
 with tab1:
     st.markdown("### 数值型变量描述性统计")
-    numeric_cols = df_filtered.select_dtypes(include=['int64', 'float64']).columns
-    st.dataframe(df_filtered[numeric_cols].describe().round(2), use_container_width=True)
+    st.dataframe(load_describe(**data_filters).round(2), use_container_width=True)
 
 with tab2:
     st.markdown("### 分类变量分布")
@@ -193,81 +224,56 @@ with tab2:
     
     with col_cat1:
         st.markdown("#### 性别分布")
-        st.bar_chart(df_filtered['Gender'].value_counts())
+        st.bar_chart(cohort.counts('Gender'))
         
         st.markdown("#### BMI类别分布")
-        st.bar_chart(df_filtered['BMI Category'].value_counts())
+        st.bar_chart(cohort.counts('BMI Category'))
     
     with col_cat2:
         st.markdown("#### 睡眠障碍分布")
-        st.bar_chart(df_filtered['Sleep Disorder'].value_counts())
+        st.bar_chart(cohort.counts('Sleep Disorder'))
         
         st.markdown("#### 职业分布")
-        st.bar_chart(df_filtered['Occupation'].value_counts())
+        st.bar_chart(cohort.counts('Occupation'))
 
 with tab3:
     st.markdown("### Top 10 相关性对")
     
-    # 计算相关性矩阵
-    corr_matrix = df_encoded.corr()
-    
-    # 提取上三角（避免重复）
-    corr_pairs = []
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            corr_pairs.append({
-                '变量1': corr_matrix.columns[i],
-                '变量2': corr_matrix.columns[j],
-                '相关系数': corr_matrix.iloc[i, j]
-            })
+    corr_method = st.radio(
+        "相关方法",
+        list(METHODS),
+        format_func=lambda method: METHODS[method],
+        horizontal=True,
+        help="Spearman 为秩相关, 对非线性的单调关系和异常值更稳健"
+    )
     
-    # 转换为DataFrame并排序
-    corr_df = pd.DataFrame(corr_pairs)
-    corr_df = corr_df.reindex(corr_df['相关系数'].abs().sort_values(ascending=False).index)
+    # 在筛选后的数据上计算, 只取绝对值最大的10对
+    corr_df = load_top_correlations(corr_method, 10, **data_filters)
     
-    st.dataframe(corr_df.head(10).round(3), use_container_width=True)
+    if corr_df.empty:
+        st.info("当前筛选条件下样本不足, 无法计算相关性")
+    else:
+        st.dataframe(corr_df.round(3), use_container_width=True)
 
 st.markdown("---")
 
 # 数据下载功能
 st.markdown("## 📥 数据导出")
 
+# 导出文件只在点击"生成"后按当前筛选条件生成, 生成过的文件所有会话共享
 col_download1, col_download2, col_download3 = st.columns(3)
 
 with col_download1:
-    # CSV下载
-    csv = df_filtered.to_csv(index=False).encode('utf-8-sig')
-    st.download_button(
-        label="📊 下载筛选数据 (CSV)",
-        data=csv,
-        file_name="sleep_health_filtered.csv",
-        mime="text/csv"
-    )
+    export_button('csv', "📊 下载筛选数据 (CSV)", "sleep_health_filtered.csv", "text/csv", **data_filters)
 
 with col_download2:
-    # Excel下载（需要转换）
-    import io
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df_filtered.to_excel(writer, index=False, sheet_name='睡眠健康数据')
-    
-    st.download_button(
-        label="📊 下载筛选数据 (Excel)",
-        data=buffer.getvalue(),
-        file_name="sleep_health_filtered.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    export_button(
+        'xlsx', "📊 下载筛选数据 (Excel)", "sleep_health_filtered.xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", **data_filters
     )
 
 with col_download3:
-    # 统计摘要下载
-    stats_summary = df_filtered.describe().round(2)
-    csv_stats = stats_summary.to_csv().encode('utf-8-sig')
-    st.download_button(
-        label="📊 下载统计摘要 (CSV)",
-        data=csv_stats,
-        file_name="statistics_summary.csv",
-        mime="text/csv"
-    )
+    export_button('summary', "📊 下载统计摘要 (CSV)", "statistics_summary.csv", "text/csv", **data_filters)
 
 st.markdown("---")
 
@@ -303,3 +309,5 @@ st.markdown("""
     <p>🔬 数据探索无止境，保持好奇心</p>
 </div>
 """, unsafe_allow_html=True)
+
+show_profiling()
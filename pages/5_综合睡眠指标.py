@@ -4,22 +4,23 @@
 """
 
 import streamlit as st
-import pandas as pd
-import os
+
+from utils.dataset_store import load_cshi_data, load_cshi_charts, show_chart
+from utils.profiling_panel import show_profiling, start_profiling
+
+# 本页图表 (cshi_visualization.CHARTS 中的ID)
+CHART_IDS = ['cshi_distribution', 'cshi_radar', 'cshi_comparison_grid']
 
 # 页面配置
 st.set_page_config(page_title="综合睡眠指标", page_icon="🌟", layout="wide")
 
-# 加载数据
-@st.cache_data
-def load_cshi_data():
-    if os.path.exists('comprehensive_sleep_health_index.csv'):
-        return pd.read_csv('comprehensive_sleep_health_index.csv')
-    else:
-        st.error("未找到综合睡眠健康指数数据文件 (comprehensive_sleep_health_index.csv)")
-        return None
+# 性能剖析 (SAH_PROFILE 环境变量或 ?profile=1 启用)
+start_profiling(__file__)
 
+# 加载数据 (进程共享, 只读)
 df = load_cshi_data()
+if df is None:
+    st.error("未找到综合睡眠健康指数数据文件 (comprehensive_sleep_health_index.csv)")
 
 # 页面标题
 st.title("🌟 综合睡眠指标")
@@ -55,13 +56,12 @@ if df is not None:
     
     col_chart1, col_chart2 = st.columns(2)
     
-    # 导入绘制函数
-    from cshi_visualization import create_cshi_distribution, create_dimension_radar, create_cshi_comparison_grid
+    # 每个数据版本只渲染一次, 之后的重新运行直接显示缓存的图片
+    charts = load_cshi_charts(CHART_IDS)
     
     with col_chart1:
         st.markdown("### 📊 CSHI 分数分布")
-        fig_dist = create_cshi_distribution(df)
-        st.pyplot(fig_dist)
+        show_chart(charts, 'cshi_distribution')
         
         with st.expander("📖 图表说明"):
             st.markdown("""
@@ -72,8 +72,7 @@ if df is not None:
 
     with col_chart2:
         st.markdown("### 🎯 各等级维度表现雷达图")
-        fig_radar = create_dimension_radar(df)
-        st.pyplot(fig_radar)
+        show_chart(charts, 'cshi_radar')
 
         with st.expander("📖 图表说明"):
             st.markdown("""
@@ -85,8 +84,7 @@ if df is not None:
     st.markdown("---")
     
     st.markdown("### 👥 多维度详细对比")
-    fig_grid = create_cshi_comparison_grid(df)
-    st.pyplot(fig_grid)
+    show_chart(charts, 'cshi_comparison_grid')
         
     with st.expander("📖 图表说明"):
         st.markdown("""
@@ -142,3 +140,5 @@ if df is not None:
         <p>🌟 综合指标提供更全面的健康视角</p>
     </div>
     """, unsafe_allow_html=True)
+
+show_profiling()
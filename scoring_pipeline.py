@@ -0,0 +1,78 @@
+"""
+融合评分流水线
+一次读取清洗后的数据集, 在同一份列数据上依次计算 Health_Score、Cardio_Score 与 CSHI,
+只写出一个结果文件; 取代 健康分数 -> 心血管分数 -> CSHI 三个脚本之间的中间CSV与合并
+"""
+import argparse
+
+import pandas as pd
+
+import comprehensive_sleep_index
+from health_score_calculator import HealthScoreCalculator
+from cardio_score_calculator import CardioScoreCalculator
+from comprehensive_sleep_index import SleepIndexCalculator
+from utils import scoring, scoring_rules
+from utils.incremental import RowHashWriter, rules_fingerprint
+from utils.parallel import map_chunks
+from utils.storage import read_dataset, write_dataset
+
+# CSHI 结果中保留的心血管分数列 (与 SleepIndexCalculator.load_data 一致)
+CARDIO_COLUMNS = ['Cardio_Score', 'Score_BP', 'Score_HR']
+
+
+def score_all(df, health_calculator=None, cardio_calculator=None, index_calculator=None):
+    """
+    对同一个DataFrame一次性计算三套分数
+
+    Args:
+        df: 清洗后的原始数据
+        health_calculator / cardio_calculator / index_calculator: 可选的计算器实例
+
+    Returns:
+        DataFrame: 与 comprehensive_sleep_health_index.csv 相同的列结构
+    """
+    health_calculator = health_calculator or HealthScoreCalculator()
+    cardio_calculator = cardio_calculator or CardioScoreCalculator()
+    index_calculator = index_calculator or SleepIndexCalculator()
+
+    health = health_calculator.score_frame(df)
+    cardio = cardio_calculator.score_frame(df)[CARDIO_COLUMNS]
+
+    # 三套结果共享df的索引, 直接按列拼接, 不需要按 Person ID 合并
+    scored = pd.concat([df, health, cardio], axis=1)
+    cshi = index_calculator.score_frame(scored).drop(columns='Person ID')
+
+    return pd.concat([scored, cshi], axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='融合评分流水线: 一次计算健康分数、心血管分数与CSHI')
+    parser.add_argument('--input', default='sleep_health_lifestyle_dataset_cleaned.csv',
+                        help='清洗后的数据集')
+    parser.add_argument('--output', default='comprehensive_sleep_health_index.csv',
+                        help='结果文件')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='并行评分的进程数 (默认1, 串行)')
+    args = parser.parse_args()
+
+    print(f"正在读取数据: {args.input}")
+    df = read_dataset(args.input)
+
+    print("正在计算 Health_Score / Cardio_Score / CSHI ...")
+    (result_df,) = map_chunks(score_all, [df], args.workers, split=True)
+
+    write_dataset(result_df, args.output)
+    # 同步更新行哈希旁路文件, 使 comprehensive_sleep_index.py --incremental 可以接着使用本结果
+    RowHashWriter(args.output, comprehensive_sleep_index.SCORE_INPUT_COLUMNS,
+                  rules_fingerprint(comprehensive_sleep_index, scoring, scoring_rules)).write(result_df)
+    print(f"计算完成! {len(result_df)} 条记录已保存至 {args.output}")
+
+    print("\n=== CSHI 分数统计 ===")
+    print(result_df[['CSHI_Score', 'Dim_Sleep', 'Dim_Cardio', 'Dim_Lifestyle']].describe().round(1))
+
+    print("\n=== CSHI 等级分布 ===")
+    print(result_df['CSHI_Level'].value_counts())
+
+
+if __name__ == '__main__':
+    main()
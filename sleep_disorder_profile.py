@@ -8,8 +8,12 @@ import numpy as np
 import os
 from matplotlib import font_manager
 
-# --- 字体配置 ---
+from utils.storage import read_dataset
+
+# --- 字体配置 (在 setup_style 中执行, 导入本模块时不查找字体) ---
 chinese_font = None
+_style_ready = False
+
 def setup_font():
     global chinese_font
     font_paths = [
@@ -33,17 +37,23 @@ def setup_font():
         plt.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei']
         plt.rcParams['axes.unicode_minus'] = False
 
-setup_font()
-sns.set_style("whitegrid")
-# 恢复字体
-if chinese_font:
-   plt.rcParams['font.family'] = chinese_font.get_name()
+def setup_style():
+    """首次绘图前配置中文字体与 seaborn 样式 (不在导入模块时执行, 只执行一次)"""
+    global _style_ready
+    if _style_ready:
+        return
+    _style_ready = True
+    setup_font()
+    sns.set_style("whitegrid")
+    # 恢复字体
+    if chinese_font:
+        plt.rcParams['font.family'] = chinese_font.get_name()
 
 def load_data():
     try:
-        df = pd.read_csv('sleep_health_lifestyle_dataset_cleaned.csv')
+        df = read_dataset('sleep_health_lifestyle_dataset_cleaned.csv')
     except:
-        df = pd.read_csv('sleep_health_lifestyle_dataset.csv')
+        df = read_dataset('sleep_health_lifestyle_dataset.csv')
     
     # 填充缺失值为 'None'
     df['Sleep Disorder'] = df['Sleep Disorder'].fillna('None')
@@ -131,6 +141,7 @@ def main():
     df = load_data()
     
     print("正在生成分析图表...")
+    setup_style()
     create_bmi_disorder_plot(df)
     create_stress_disorder_plot(df)
     create_bp_scatter_plot(df)
@@ -2,8 +2,48 @@
 睡眠障碍风险智能筛查器
 基于数据集特征分析开发的规则引擎
 """
+from string import Formatter
+
+import numpy as np
 import pandas as pd
 
+from utils.scoring import parse_blood_pressure_column
+
+# 批量筛查的风险因素位掩码: 每条规则占一位, 第i位对应下表第i项
+# (得分, 风险因素描述模板); 模板在展示时才用个人数据填充, 为None的规则只计分不展示
+APNEA_RULES = [
+    (60, "肥胖 (Obese)"),
+    (40, "超重 (Overweight)"),
+    (30, "高血压 ({Systolic}/{Diastolic})"),
+    (20, "血压偏高 ({Systolic}/{Diastolic})"),
+    (15, "高压力 (Level {Stress Level})"),
+    (20, "年龄 > 35"),
+]
+
+INSOMNIA_RULES = [
+    (45, "极高压力 (Level {Stress Level})"),
+    (20, "压力 (Level {Stress Level})"),
+    (35, "睡眠严重不足 ({Sleep Duration}h)"),
+    (20, "睡眠偏少 ({Sleep Duration}h)"),
+    (30, "体重过轻 (Underweight)"),
+    (15, "肥胖"),
+    (10, None),
+]
+
+
+def _flag_score_table(rules):
+    """预先计算每种位掩码组合对应的得分 (封顶100), 批量计分时只需一次查表"""
+    table = np.zeros(2 ** len(rules), dtype=np.int64)
+    for flags in range(len(table)):
+        score = sum(points for bit, (points, _) in enumerate(rules) if flags >> bit & 1)
+        table[flags] = min(100, score)
+    return table
+
+
+APNEA_SCORE_TABLE = _flag_score_table(APNEA_RULES)
+INSOMNIA_SCORE_TABLE = _flag_score_table(INSOMNIA_RULES)
+
+
 class SleepDisorderScreener:
     def __init__(self):
         self.risk_thresholds = {
@@ -119,23 +159,181 @@ class SleepDisorderScreener:
             'Insomnia_Factors': insomnia_factors
         }
 
+    def screen_frame(self, df):
+        """
+        对整个数据集进行向量化筛查
+
+        每条规则的命中情况记录为整数位掩码 (Apnea_Flags / Insomnia_Flags),
+        得分由位掩码查表得到; 风险因素文字只在展示时用 decode_screen_results 解码
+
+        Args:
+            df: 原始数据集
+
+        Returns:
+            DataFrame: Person ID, Actual_Disorder, 两种障碍的得分、等级与位掩码
+        """
+        sys, dia = parse_blood_pressure_column(df['Blood Pressure (systolic/diastolic)'])
+        bmi_cat = df['BMI Category'].to_numpy()
+        stress = df['Stress Level (scale: 1-10)'].to_numpy(dtype=float)
+        sleep_dur = df['Sleep Duration (hours)'].to_numpy(dtype=float)
+        age = df['Age'].to_numpy(dtype=float)
+        steps = df['Daily Steps'].to_numpy(dtype=float)
+
+        with np.errstate(invalid='ignore'):
+            high_bp = (sys >= 140) | (dia >= 90)
+            elevated_bp = ~high_bp & ((sys >= 130) | (dia >= 85))
+            apnea_bits = [
+                bmi_cat == 'Obese',
+                bmi_cat == 'Overweight',
+                high_bp,
+                elevated_bp,
+                stress >= 6,
+                age >= 35,
+            ]
+            insomnia_bits = [
+                stress >= 7,
+                (stress < 7) & (stress >= 5),
+                sleep_dur < 6,
+                (sleep_dur >= 6) & (sleep_dur < 7),
+                bmi_cat == 'Underweight',
+                bmi_cat == 'Obese',
+                steps > 10000,
+            ]
+
+        apnea_flags = np.zeros(len(df), dtype=np.uint8)
+        for bit, hit in enumerate(apnea_bits):
+            apnea_flags |= hit.astype(np.uint8) << bit
+        insomnia_flags = np.zeros(len(df), dtype=np.uint8)
+        for bit, hit in enumerate(insomnia_bits):
+            insomnia_flags |= hit.astype(np.uint8) << bit
+
+        apnea_score = APNEA_SCORE_TABLE[apnea_flags]
+        insomnia_score = INSOMNIA_SCORE_TABLE[insomnia_flags]
+
+        return pd.DataFrame({
+            'Person ID': df['Person ID'].to_numpy(),
+            'Actual_Disorder': df['Sleep Disorder'].to_numpy(),
+            'Apnea_Score': apnea_score,
+            'Apnea_Level': self.get_risk_levels(apnea_score),
+            'Apnea_Flags': apnea_flags,
+            'Insomnia_Score': insomnia_score,
+            'Insomnia_Level': self.get_risk_levels(insomnia_score),
+            'Insomnia_Flags': insomnia_flags
+        }, index=df.index)
+
+    def get_risk_levels(self, scores):
+        """批量版 get_risk_level, 返回分类类型 (每个等级只存一份文字)"""
+        levels = ["极低风险 (Minimal Risk)", "低风险 (Low Risk)", "中风险 (Medium Risk)", "高风险 (High Risk)"]
+        thresholds = [self.risk_thresholds['Low'], self.risk_thresholds['Medium'], self.risk_thresholds['High']]
+        codes = np.searchsorted(thresholds, scores, side='right')
+        return pd.Categorical.from_codes(codes, categories=levels)
+
+
+def person_data_from_row(row):
+    """将数据集的一行转换为筛查接口使用的个人数据字典"""
+    sys, dia = str(row['Blood Pressure (systolic/diastolic)']).split('/')
+    return {
+        'Age': row['Age'],
+        'BMI Category': row['BMI Category'],
+        'Systolic': int(sys),
+        'Diastolic': int(dia),
+        'Stress Level': row['Stress Level (scale: 1-10)'],
+        'Sleep Duration': row['Sleep Duration (hours)'],
+        'Daily Steps': row['Daily Steps']
+    }
+
+
+def _template_fields(rows):
+    """
+    描述模板中各字段的取值 -> 文字的批量转换 (文字与 person_data_from_row 的取值格式化结果相同)
+
+    Returns:
+        dict: {字段名: 函数 f(行号数组) -> 文字数组 (object)}
+    """
+    sys, dia = parse_blood_pressure_column(rows['Blood Pressure (systolic/diastolic)'])
+    stress = rows['Stress Level (scale: 1-10)'].to_numpy()
+    sleep_dur = rows['Sleep Duration (hours)'].to_numpy()
+
+    def text(values, as_int=False):
+        # 只转换命中规则的行 (这些行的血压一定可以解析)
+        return lambda idx: (values[idx].astype(np.int64) if as_int else values[idx]).astype(str).astype(object)
+
+    return {
+        'Systolic': text(sys, as_int=True),
+        'Diastolic': text(dia, as_int=True),
+        'Stress Level': text(stress),
+        'Sleep Duration': text(sleep_dur),
+    }
+
+
+def decode_flag_column(flags, rules, fields):
+    """
+    批量将位掩码解码为风险因素列表: 每条规则按位选出命中的行, 用整列字符串拼接填充模板
+
+    Args:
+        flags: 位掩码数组
+        rules: APNEA_RULES 或 INSOMNIA_RULES
+        fields: _template_fields 的结果 (与 flags 行序相同)
+
+    Returns:
+        list: 每行的风险因素列表, 与逐行筛查 (assess_*_risk) 的结果相同
+    """
+    flags = np.asarray(flags, dtype=np.int64)
+    factors = [[] for _ in range(len(flags))]
+    for bit, (_, template) in enumerate(rules):
+        if template is None:
+            continue
+        hit = np.flatnonzero(flags >> bit & 1)
+        if len(hit) == 0:
+            continue
+        texts = np.full(len(hit), '', dtype=object)
+        for literal, field, _, _ in Formatter().parse(template):
+            texts = texts + literal
+            if field is not None:
+                texts = texts + fields[field](hit)
+        for i, text in zip(hit.tolist(), texts.tolist()):
+            factors[i].append(text)
+    return factors
+
+
+def decode_screen_results(results, df):
+    """
+    将 screen_frame 结果中的位掩码列解码为风险因素列表列 (按规则批量解码, 不逐行遍历)
+
+    Args:
+        results: screen_frame 的结果 (可以是筛选后的子集)
+        df: 原始数据集, 按索引取出对应行填充描述模板
+
+    Returns:
+        DataFrame: 与逐行筛查输出相同的列 (Apnea_Factors / Insomnia_Factors)
+    """
+    decoded = results.copy()
+    fields = _template_fields(df.loc[results.index])
+
+    for col, rules in [('Apnea_Flags', APNEA_RULES), ('Insomnia_Flags', INSOMNIA_RULES)]:
+        factors = decode_flag_column(results[col].to_numpy(), rules, fields)
+        decoded[col] = pd.Series(factors, index=results.index, dtype=object)
+    decoded = decoded.rename(columns={'Apnea_Flags': 'Apnea_Factors', 'Insomnia_Flags': 'Insomnia_Factors'})
+    for col in ['Apnea_Level', 'Insomnia_Level']:
+        decoded[col] = decoded[col].astype(object)
+    return decoded
+
+
 def batch_screen(df):
-    """批量筛查数据集"""
+    """批量筛查数据集 (含解码后的风险因素列表)"""
+    screener = SleepDisorderScreener()
+    results = screener.screen_frame(df)
+    return decode_screen_results(results, df).reset_index(drop=True)
+
+
+def batch_screen_rowwise(df):
+    """逐行筛查的参考实现, 用于结果校验和性能基准对比"""
     screener = SleepDisorderScreener()
     results = []
     
     for idx, row in df.iterrows():
         # 准备数据以匹配接口
-        sys, dia = str(row['Blood Pressure (systolic/diastolic)']).split('/')
-        data = {
-            'Age': row['Age'],
-            'BMI Category': row['BMI Category'],
-            'Systolic': int(sys),
-            'Diastolic': int(dia),
-            'Stress Level': row['Stress Level (scale: 1-10)'],
-            'Sleep Duration': row['Sleep Duration (hours)'],
-            'Daily Steps': row['Daily Steps']
-        }
+        data = person_data_from_row(row)
         
         res = screener.screen(data)
         
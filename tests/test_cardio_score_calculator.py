@@ -0,0 +1,29 @@
+"""cardio_score_calculator 分块输出与一次性处理一致"""
+import sys
+
+import pandas as pd
+import pytest
+
+import cardio_score_calculator
+
+BP = 'Blood Pressure (systolic/diastolic)'
+
+
+def _run(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['cardio_score_calculator.py', *args])
+    cardio_score_calculator.main()
+    with open('cardio_health_score_results.csv', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('bad_row', [3, 250])
+def test_chunked_output_matches_full_with_missing_bp(tmp_path, monkeypatch, bad_row):
+    df = pd.read_csv('sleep_health_lifestyle_dataset.csv', nrows=300)
+    df.loc[bad_row, BP] = 'unknown'
+    monkeypatch.chdir(tmp_path)
+    df.to_csv('sleep_health_lifestyle_dataset_cleaned.csv', index=False)
+
+    full = _run(monkeypatch)
+    assert _run(monkeypatch, '--chunksize', '100') == full
+    # 缺失的血压在任何一块中, 血压相关列都按小数输出 (与一次性处理相同)
+    assert pd.read_csv('cardio_health_score_results.csv')['Systolic'].dtype == float
@@ -0,0 +1,33 @@
+"""utils.cleaning 的异常标注"""
+import pandas as pd
+
+from utils.cleaning import annotate_anomalies, split_annotated
+
+
+def _frame():
+    return pd.DataFrame({
+        'Age': [25, 72, 40, 40, 40, 40],
+        'Occupation': ['Retired', 'Student', 'Engineer', 'Engineer', 'Engineer', 'Retired'],
+        'Stress Level (scale: 1-10)': [9, 5, 9, 2, 5, 5],
+        'Quality of Sleep (scale: 1-10)': [8, 6, 8, 3, 6, 6],
+        'Daily Steps': [5000, 5000, 5000, 5000, 20000, 5000],
+        'Physical Activity Level (minutes/day)': [60, 60, 60, 60, 20, 60],
+    })
+
+
+def test_annotate_anomalies():
+    df = _frame()
+    annotated, counts = annotate_anomalies(df)
+
+    # 第一行同时命中年龄-职业与压力-睡眠规则, 只记第一条
+    assert annotated['Anomaly_Type'].tolist() == [
+        'AGE_OCCUPATION_1.2', 'AGE_OCCUPATION_1.3', 'STRESS_SLEEP_6.1', 'STRESS_SLEEP_6.2', 'STEPS_ACTIVITY_9.1', ''
+    ]
+    assert annotated['Data_Quality_Flag'].tolist() == ['Anomaly'] * 5 + ['Normal']
+    assert counts == {'AGE_OCCUPATION_1.2': 1, 'AGE_OCCUPATION_1.3': 1, 'STRESS_SLEEP_6.1': 1,
+                      'STRESS_SLEEP_6.2': 1, 'STEPS_ACTIVITY_9.1': 1}
+    assert 'Anomaly_Type' not in df.columns
+
+    cleaned, anomalies = split_annotated(annotated)
+    assert cleaned.index.tolist() == [5]
+    assert len(anomalies) == 5
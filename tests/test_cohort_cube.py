@@ -0,0 +1,58 @@
+"""utils.cohort_cube 的汇总结果与直接在数据行上计算一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cohort_cube import CohortCube
+from utils.data_loader import preprocess_data
+
+ACTIVITY = 'Physical Activity Level (minutes/day)'
+QUALITY = 'Quality of Sleep (scale: 1-10)'
+HEART_RATE = 'Heart Rate (bpm)'
+
+
+@pytest.fixture(scope='module')
+def df():
+    df = preprocess_data()[0].copy()
+    df[HEART_RATE] = df[HEART_RATE].astype(np.float64)
+    df.loc[df.index[:10], HEART_RATE] = np.nan
+    df.loc[df.index[5:15], 'Systolic_BP'] = np.nan
+    df[ACTIVITY] = df[ACTIVITY].astype(np.float64)
+    df.loc[df.index[20:30], ACTIVITY] = np.nan
+    return df
+
+
+def test_metrics_skip_missing_values(df):
+    view = CohortCube(df).view()
+    for metric in [HEART_RATE, 'Systolic_BP', ACTIVITY, 'Age']:
+        assert view.mean(metric) == pytest.approx(df[metric].mean(), rel=1e-12)
+        assert view.std(metric) == pytest.approx(df[metric].std(), rel=1e-9)
+    assert view.corr(ACTIVITY, QUALITY) == pytest.approx(df[ACTIVITY].corr(df[QUALITY]), rel=1e-9)
+
+
+def test_group_means_skip_missing_values(df):
+    view = CohortCube(df).view()
+    expected = df.groupby('Gender', observed=True)[[HEART_RATE, 'Systolic_BP']].mean()
+    result = view.group_means('Gender', [HEART_RATE, 'Systolic_BP'])
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-12, check_index_type=False)
+
+
+def test_append_matches_full_build(df):
+    half = len(df) // 2
+    appended = CohortCube(df.iloc[:half]).append(df.iloc[half:]).view()
+    full = CohortCube(df).view()
+    for metric in [HEART_RATE, 'Systolic_BP', ACTIVITY]:
+        assert appended.mean(metric) == pytest.approx(full.mean(metric), rel=1e-12)
+        assert appended.std(metric) == pytest.approx(full.std(metric), rel=1e-9)
+
+
+def test_moments_stable_for_large_offsets(df):
+    # 取值远离0时, 平方和 - 和²/n 的相减会丢掉全部有效数字
+    shifted = df.copy()
+    shifted[HEART_RATE] = shifted[HEART_RATE] + 1e9
+    shifted[ACTIVITY] = shifted[ACTIVITY] + 1e9
+    third = len(shifted) // 3
+    cube = CohortCube(shifted.iloc[:third]).append(shifted.iloc[third:2 * third]).append(shifted.iloc[2 * third:])
+    view = cube.view()
+    assert view.std(HEART_RATE) == pytest.approx(df[HEART_RATE].std(), rel=1e-6)
+    assert view.corr(ACTIVITY, QUALITY) == pytest.approx(df[ACTIVITY].corr(df[QUALITY]), rel=1e-6)
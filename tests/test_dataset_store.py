@@ -0,0 +1,41 @@
+"""utils.dataset_store 追加记录后的共享数据与重新加载一致"""
+import numpy as np
+import pandas as pd
+
+from utils.dataset_store import DatasetStore
+
+SELECTIONS = [{}, {'gender': 'Female'}, {'occupation': ['Student', 'Office Worker'], 'age_range': (30, 50)}]
+
+
+def _refresh(store):
+    store._checked = float('-inf')
+    store.refresh()
+
+
+def test_append_matches_reload(tmp_path):
+    with open('sleep_health_lifestyle_dataset.csv', encoding='utf-8') as f:
+        lines = f.readlines()
+    data_file = tmp_path / 'data.csv'
+    data_file.write_text(''.join(lines[:301]), encoding='utf-8')
+
+    store = DatasetStore(str(data_file), str(tmp_path / 'cshi.csv'))
+    store.sort_index().order('Daily Steps')
+    with open(data_file, 'a', encoding='utf-8') as f:
+        f.writelines(lines[301:])
+    _refresh(store)
+    fresh = DatasetStore(str(data_file), str(tmp_path / 'cshi.csv'))
+
+    assert store._version == 2
+    df, df_encoded = store.datasets()
+    expected, expected_encoded = fresh.datasets()
+    pd.testing.assert_frame_equal(df, expected)
+    pd.testing.assert_frame_equal(df_encoded, expected_encoded)
+    np.testing.assert_array_equal(store.sort_index().order('Daily Steps'), fresh.sort_index().order('Daily Steps'))
+    for selection in SELECTIONS:
+        conditions = {k: v for k, v in selection.items() if k != 'age_range'}
+        columns = {'gender': 'Gender', 'occupation': 'Occupation'}
+        query = {'conditions': {columns[k]: v for k, v in conditions.items()}, 'age_range': selection.get('age_range')}
+        np.testing.assert_array_equal(store.filter_index().select(**query), fresh.filter_index().select(**query))
+        view, expected_view = store.cohort_cube().select(**selection), fresh.cohort_cube().select(**selection)
+        assert view.count() == expected_view.count()
+        assert np.isclose(view.std('Daily Steps'), expected_view.std('Daily Steps'), rtol=1e-12)
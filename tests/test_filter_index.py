@@ -0,0 +1,55 @@
+"""utils.filter_index / utils.data_grid 的索引在追加行后与重新建立一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_grid import SortIndex
+from utils.data_loader import preprocess_data
+from utils.filter_index import FilterIndex
+
+QUERIES = [
+    {},
+    {'conditions': {'Gender': 'Female'}},
+    {'conditions': {'Occupation': ['Student', 'Office Worker'], 'Sleep Disorder': 'Insomnia'}},
+    {'age_range': (30, 45)},
+    {'conditions': {'BMI Category': 'Obese'}, 'age_range': (20, 80)},
+    {'conditions': {'Gender': 'Male'}, 'age_range': (50, 51)},
+]
+
+
+@pytest.fixture(scope='module')
+def df():
+    return preprocess_data()[0]
+
+
+@pytest.mark.parametrize('split', [0, 5, 8, 203])
+def test_filter_index_extend_matches_rebuild(df, split):
+    extended = FilterIndex(df.iloc[:split]).extend(df.iloc[split:])
+    rebuilt = FilterIndex(df)
+    assert extended.n_rows == rebuilt.n_rows
+    for query in QUERIES:
+        np.testing.assert_array_equal(extended.select(**query), rebuilt.select(**query))
+    np.testing.assert_array_equal(extended._age_order, rebuilt._age_order)
+
+
+def test_filter_index_extend_with_new_value(df):
+    head = df[df['Occupation'] != 'Retired']
+    tail = df[df['Occupation'] == 'Retired']
+    combined = pd.concat([head, tail], ignore_index=True)
+    extended = FilterIndex(head).extend(tail)
+    np.testing.assert_array_equal(extended.select({'Occupation': 'Retired'}),
+                                  FilterIndex(combined).select({'Occupation': 'Retired'}))
+
+
+def test_sort_index_extend_matches_rebuild(df):
+    df = df.copy()
+    df['Heart Rate (bpm)'] = df['Heart Rate (bpm)'].astype(np.float64)
+    df.loc[[3, 250, 390], 'Heart Rate (bpm)'] = np.nan
+    columns = ['Heart Rate (bpm)', 'Occupation', 'Age']
+    head = SortIndex(df.iloc[:250])
+    for column in columns:
+        head.order(column)
+    extended = head.extend(df)
+    rebuilt = SortIndex(df)
+    for column in columns:
+        np.testing.assert_array_equal(extended.order(column), rebuilt.order(column))
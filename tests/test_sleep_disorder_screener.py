@@ -0,0 +1,10 @@
+"""sleep_disorder_screener 的批量筛查与逐行参考实现一致"""
+import pandas as pd
+
+from sleep_disorder_screener import batch_screen, batch_screen_rowwise
+
+
+def test_batch_screen_matches_rowwise():
+    df = pd.read_csv('sleep_health_lifestyle_dataset.csv')
+    # pandas 3 把逐行结果中的字符串列推断为 str 类型, 只比较取值
+    pd.testing.assert_frame_equal(batch_screen(df), batch_screen_rowwise(df), check_dtype=False)
@@ -8,13 +8,13 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 from matplotlib import font_manager
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from sklearn.preprocessing import LabelEncoder
 
-# --- 字体配置 ---
+from utils.storage import read_dataset
+
+# --- 字体配置 (在 setup_style 中执行, 导入本模块时不查找字体) ---
 chinese_font = None
+_style_ready = False
+
 def setup_font():
     global chinese_font
     font_paths = ['C:/Windows/Fonts/msyh.ttc', 'C:/Windows/Fonts/simhei.ttf']
@@ -30,17 +30,23 @@ def setup_font():
         font_manager.fontManager.addfont(font_path)
         plt.rcParams['axes.unicode_minus'] = False
 
-setup_font()
-sns.set_style("whitegrid")
-if chinese_font: plt.rcParams['font.family'] = chinese_font.get_name()
+def setup_style():
+    """首次绘图前配置中文字体与 seaborn 样式 (不在导入模块时执行, 只执行一次)"""
+    global _style_ready
+    if _style_ready:
+        return
+    _style_ready = True
+    setup_font()
+    sns.set_style("whitegrid")
+    if chinese_font: plt.rcParams['font.family'] = chinese_font.get_name()
 
 def load_and_preprocess_data():
     """加载并预处理数据"""
     print("[1] 加载数据...")
     try:
-        df = pd.read_csv('sleep_health_lifestyle_dataset_cleaned.csv')
+        df = read_dataset('sleep_health_lifestyle_dataset_cleaned.csv')
     except:
-        df = pd.read_csv('sleep_health_lifestyle_dataset.csv')
+        df = read_dataset('sleep_health_lifestyle_dataset.csv')
         
     print(f"    原始数据量: {len(df)}")
     
@@ -69,6 +75,7 @@ def load_and_preprocess_data():
     X = pd.get_dummies(X, columns=cat_cols, drop_first=False)
     
     # 目标变量编码 (Label Encoding)
+    from sklearn.preprocessing import LabelEncoder
     le = LabelEncoder()
     y_encoded = le.fit_transform(y)
     
@@ -79,6 +86,10 @@ def load_and_preprocess_data():
 
 def train_and_evaluate(X, y, le):
     """训练并评估模型"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, classification_report
+
     print("\n[2] 划分训练集与测试集 (80/20)...")
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
     
@@ -118,6 +129,8 @@ def train_and_evaluate(X, y, le):
 
 def plot_confusion_matrix(y_test, y_pred, target_names):
     """绘制混淆矩阵"""
+    from sklearn.metrics import confusion_matrix
+
     cm = confusion_matrix(y_test, y_pred)
     
     plt.figure(figsize=(8, 6))
@@ -148,6 +161,8 @@ def plot_feature_importance(model, feature_names):
     print("✓ 生成: model_feature_importance.png")
 
 def main():
+    setup_style()
+
     # 1. 数据准备
     X, y, le, raw_df = load_and_preprocess_data()
     
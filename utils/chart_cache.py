@@ -0,0 +1,235 @@
+"""
+渲染结果缓存
+按 (图表ID, 数据版本, 筛选签名) 缓存渲染好的PNG字节, 总字节数有上限, 超出时淘汰最久未使用的图表;
+未命中时在后台线程池中渲染, 同一个键正在渲染时后来的请求等待同一个结果, 不重复渲染;
+相关性排名、洞察统计等计算较快的小结果用 ResultCache 按条目数缓存
+"""
+import io
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+from utils.filter_index import selected_values
+from utils.profiling import object_nbytes
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_RESULTS = 128
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+CHART_DPI = 120
+
+
+def filter_signature(**filters):
+    """
+    筛选条件的规范化签名: None / '全部' / 空列表都表示不筛选, 多选的取值与顺序无关
+
+    Returns:
+        tuple: 可哈希的 ((条件名, 取值), ...)
+    """
+    signature = []
+    for name, value in sorted(filters.items()):
+        if name == 'age_range':
+            value = tuple(value) if value else None
+        else:
+            values = selected_values(value)
+            value = tuple(sorted(map(str, values))) if values is not None else None
+        if value is not None:
+            signature.append((name, value))
+    return tuple(signature)
+
+
+def figure_png(fig, dpi=CHART_DPI):
+    """把 Figure 渲染为PNG字节, 渲染后释放图中的所有对象"""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+class ChartCache:
+    """
+    大小受限的LRU图表缓存 (线程安全)
+
+    Args:
+        max_bytes: 缓存的PNG总字节数上限
+        workers: 后台渲染线程数
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, workers=DEFAULT_WORKERS):
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chart-render')
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def submit(self, key, render):
+        """
+        取缓存的图表; 未命中时提交后台渲染
+
+        Args:
+            key: 可哈希的缓存键, 一般为 (图表ID, 数据版本, 筛选签名)
+            render: 无参数函数, 返回PNG字节
+
+        Returns:
+            Future: 结果为PNG字节 (命中缓存时已完成); 渲染失败时为对应的异常
+        """
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                future = Future()
+                future.set_result(png)
+                return future
+            future = self._pending.get(key)
+            if future is None:
+                self.misses += 1
+                future = self._executor.submit(self._render, key, render)
+                self._pending[key] = future
+            return future
+
+    def _render(self, key, render):
+        try:
+            png = render()
+        except BaseException:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        # 写入缓存与撤销"正在渲染"在同一把锁内完成, 之间不会有请求重复提交
+        with self._lock:
+            self._pending.pop(key, None)
+            self._store(key, png)
+        return png
+
+    def _store(self, key, png):
+        if len(png) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= len(old)
+        self._entries[key] = png
+        self.nbytes += len(png)
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= len(evicted)
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'图表': {'hits', 'misses', 'entries', 'nbytes'}}
+        """
+        with self._lock:
+            return {'图表': {'hits': self.hits, 'misses': self.misses,
+                           'entries': len(self._entries), 'nbytes': self.nbytes}}
+
+    def rekey(self, update):
+        """
+        逐项改写缓存键 (数据追加后把不受影响的图表改挂到新数据版本)
+
+        Args:
+            update: 函数 update(key), 返回新键; 返回 None 时丢弃该项
+        """
+        with self._lock:
+            self._entries = rekey_entries(self._entries, update)
+            self.nbytes = sum(len(png) for png in self._entries.values())
+
+    def clear(self):
+        """清空缓存 (正在渲染的图表完成后仍会写入, 键中的数据版本保证它们不会再被命中)"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+class ResultCache:
+    """
+    小型计算结果缓存 (线程安全, 按条目数淘汰最久未使用的结果);
+    命中/未命中次数按结果类型 (缓存键的第一项, 如 'insights') 分别统计
+
+    Args:
+        max_entries: 缓存的结果数上限
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_RESULTS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, compute):
+        """
+        取缓存结果; 未命中时调用 compute() 计算并缓存 (并发未命中时可能重复计算, 结果相同)
+
+        Returns:
+            结果本身 (调用方不应修改); DataFrame 返回浅拷贝
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits[key[0]] += 1
+            else:
+                self.misses[key[0]] += 1
+        if result is None:
+            result = compute()
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if isinstance(result, pd.DataFrame):
+            return result.copy(deep=False)
+        return result
+
+    def stats(self):
+        """
+        Returns:
+            dict: {结果类型: {'hits', 'misses', 'entries', 'nbytes'}}, nbytes 为估计值
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+            kinds = set(self.hits) | set(self.misses)
+            stats = {kind: {'hits': self.hits[kind], 'misses': self.misses[kind], 'entries': 0, 'nbytes': 0}
+                     for kind in kinds}
+        for key, result in entries:
+            item = stats.setdefault(key[0], {'hits': 0, 'misses': 0, 'entries': 0, 'nbytes': 0})
+            item['entries'] += 1
+            item['nbytes'] += object_nbytes(result)
+        return stats
+
+    def rekey(self, update):
+        """逐项改写缓存键, 参数同 ChartCache.rekey"""
+        with self._lock:
+            self._entries = rekey_entries(self._entries, update)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def rekey_entries(entries, update, discard=None):
+    """按 update 改写键后的新 OrderedDict (保持使用顺序); 被丢弃的值交给 discard"""
+    result = OrderedDict()
+    for key, value in entries.items():
+        new_key = update(key)
+        if new_key is None:
+            if discard is not None:
+                discard(value)
+        else:
+            result[new_key] = value
+    return result
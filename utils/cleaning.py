@@ -0,0 +1,66 @@
+"""
+数据清洗规则
+data_cleaning.py 与增量导入 (ingest_daemon.py) 共用的逻辑异常判定: 规则按顺序检查,
+每条记录只标注第一条命中的规则 (年龄-职业两条规则之后的规则只检查尚未标注的记录)
+"""
+import numpy as np
+
+AGE = 'Age'
+OCCUPATION = 'Occupation'
+STRESS = 'Stress Level (scale: 1-10)'
+QUALITY = 'Quality of Sleep (scale: 1-10)'
+STEPS = 'Daily Steps'
+ACTIVITY = 'Physical Activity Level (minutes/day)'
+
+# (异常类型, 描述, 判定函数, 是否只检查尚未标注的记录)
+ANOMALY_RULES = [
+    ('AGE_OCCUPATION_1.2', '年龄<30岁但职业为Retired',
+     lambda df: (df[AGE] < 30) & (df[OCCUPATION] == 'Retired'), False),
+    ('AGE_OCCUPATION_1.3', '年龄>=70岁但职业为Student',
+     lambda df: (df[AGE] >= 70) & (df[OCCUPATION] == 'Student'), False),
+    ('STRESS_SLEEP_6.1', '压力>=9分但睡眠质量>=8分',
+     lambda df: (df[STRESS] >= 9) & (df[QUALITY] >= 8), True),
+    ('STRESS_SLEEP_6.2', '压力<=2分但睡眠质量<=4分',
+     lambda df: (df[STRESS] <= 2) & (df[QUALITY] <= 4), True),
+    ('STEPS_ACTIVITY_9.1', '日步数>=18000但运动时长<=30分钟',
+     lambda df: (df[STEPS] >= 18000) & (df[ACTIVITY] <= 30), True),
+]
+
+ANOMALY_DESCRIPTIONS = {name: description for name, description, _, _ in ANOMALY_RULES}
+
+
+def annotate_anomalies(df):
+    """
+    标注逻辑异常 (结果与逐条规则依次赋值相同)
+
+    Args:
+        df: 原始数据
+
+    Returns:
+        tuple: (增加 Data_Quality_Flag / Anomaly_Type 两列的副本, {异常类型: 命中条数})
+    """
+    annotated = df.copy()
+    anomaly = np.zeros(len(df), dtype=bool)
+    types = np.full(len(df), '', dtype=object)
+    counts = {}
+    for name, _, rule, only_normal in ANOMALY_RULES:
+        hit = rule(df).to_numpy(dtype=bool)
+        if only_normal:
+            hit = hit & ~anomaly
+        anomaly |= hit
+        types[hit] = name
+        counts[name] = int(hit.sum())
+
+    annotated['Data_Quality_Flag'] = np.where(anomaly, 'Anomaly', 'Normal')
+    annotated['Anomaly_Type'] = types
+    return annotated, counts
+
+
+def split_annotated(annotated):
+    """
+    Returns:
+        tuple: (清洗后数据 (只含正常记录, 去掉标记列), 异常记录 (保留标记列))
+    """
+    normal = annotated['Data_Quality_Flag'] == 'Normal'
+    cleaned = annotated[normal].drop(columns=['Data_Quality_Flag', 'Anomaly_Type'])
+    return cleaned, annotated[~normal].copy()
@@ -0,0 +1,376 @@
+"""
+人群聚合立方
+按 性别 × 职业 × 年龄 × BMI类别 × 睡眠障碍 预先汇总每个非空单元的人数、各数值指标的非空个数、均值与离差平方和 (M2),
+以及阈值指示量 (高压力/高血压/高心率人数) 和相关分析所需的协矩 (离差乘积和, 只计两列都非空的行)。
+缺失值不计入个数与均值, 均值、标准差与相关系数的缺失处理与 pandas 相同;
+离差平方和与协矩按并行公式合并, 不用 平方和 - 和²/n 的相减 (数据不断追加、取值偏离0较远时会丢失精度)
+仪表板的指标卡片、洞察文字和分组对比表只需合并选中的单元, 不再扫描数据行
+
+年龄按整岁作为维度 (数据中的年龄均为整数), 因此任意年龄范围筛选都能精确回答,
+年龄段表格由整岁单元再汇总得到
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.filter_index import selected_values
+
+DIMENSIONS = ['Gender', 'Occupation', 'Age', 'BMI Category', 'Sleep Disorder']
+
+METRICS = [
+    'Age',
+    'Sleep Duration (hours)',
+    'Quality of Sleep (scale: 1-10)',
+    'Physical Activity Level (minutes/day)',
+    'Stress Level (scale: 1-10)',
+    'Heart Rate (bpm)',
+    'Daily Steps',
+    'Systolic_BP',
+    'Diastolic_BP',
+]
+
+# 指示量名称 -> (列, 阈值), 统计 列 >= 阈值 的人数
+INDICATORS = {
+    'High_Stress': ('Stress Level (scale: 1-10)', 7),
+    'High_BP': ('Systolic_BP', 140),
+    'High_HR': ('Heart Rate (bpm)', 100),
+}
+
+# 需要计算相关系数的指标对
+PAIRS = [
+    ('Physical Activity Level (minutes/day)', 'Quality of Sleep (scale: 1-10)'),
+]
+
+# selection 参数名 -> 维度
+SELECTION_DIMENSIONS = {
+    'gender': 'Gender',
+    'occupation': 'Occupation',
+    'bmi': 'BMI Category',
+    'disorder': 'Sleep Disorder',
+}
+
+
+def _pair_name(x, y):
+    return f'{x} * {y}'
+
+
+def _layout(columns):
+    """
+    单元中各矩的列名 (只含 columns 中有的指标与指标对)
+
+    Returns:
+        tuple: ([(个数列, 均值列, 离差平方和列), ...], [(个数列, x均值列, y均值列, 协矩列), ...])
+    """
+    moments, comoments = [], []
+    for metric in METRICS:
+        if f'{metric}:n' in columns:
+            moments.append((f'{metric}:n', f'{metric}:mean', f'{metric}:m2'))
+    for x, y in PAIRS:
+        name = _pair_name(x, y)
+        if f'{name}:n' in columns:
+            n = f'{name}:n'
+            moments += [(n, f'{name}:mean_x', f'{name}:m2_x'), (n, f'{name}:mean_y', f'{name}:m2_y')]
+            comoments.append((n, f'{name}:mean_x', f'{name}:mean_y', f'{name}:c2'))
+    return moments, comoments
+
+
+def _cells(df):
+    """把数据行汇总为单元: 每个非空单元一行, 列为各维度取值与汇总量"""
+    # 每行先看作只含一个人的单元: 个数为0或1, 均值为取值 (缺失时为0); 离差平方和与协矩为0, 不建列
+    stats = {'count': np.ones(len(df), dtype=np.int64)}
+    for metric in METRICS:
+        if metric not in df.columns:
+            continue
+        values = df[metric].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        stats[f'{metric}:n'] = present.astype(np.int64)
+        stats[f'{metric}:mean'] = np.where(present, values, 0.0)
+    for name, (column, threshold) in INDICATORS.items():
+        if column in df.columns:
+            stats[f'{name}:sum'] = (df[column] >= threshold).to_numpy(dtype=np.int64)
+    for x, y in PAIRS:
+        if x in df.columns and y in df.columns:
+            # 相关系数按两列都非空的行计算 (与 DataFrame.corr 相同)
+            xs, ys = df[x].to_numpy(dtype=np.float64), df[y].to_numpy(dtype=np.float64)
+            present = ~(np.isnan(xs) | np.isnan(ys))
+            name = _pair_name(x, y)
+            stats[f'{name}:n'] = present.astype(np.int64)
+            stats[f'{name}:mean_x'] = np.where(present, xs, 0.0)
+            stats[f'{name}:mean_y'] = np.where(present, ys, 0.0)
+
+    return _combine(pd.DataFrame(stats, index=df.index), [df[d] for d in DIMENSIONS])
+
+
+def _combine(parts, keys):
+    """
+    按维度取值合并单元: 人数、个数与指示量直接相加; 均值按个数加权,
+    离差平方和与协矩按并行公式 (Chan 等) 合并: M2 = Σ M2_i + Σ n_i (均值_i - 均值)²
+
+    Args:
+        parts: 待合并的单元 (每行一个, 列为汇总量; 没有离差平方和或协矩列时视为0)
+        keys: 各行的维度取值 (groupby 的分组键)
+
+    Returns:
+        DataFrame: 每个非空单元一行, 列为各维度取值与汇总量
+    """
+    moments, comoments = _layout(parts.columns)
+
+    # 先对 个数×均值 求和得到各组均值
+    weighted = parts.copy(deep=False)
+    for n, mean, _ in moments:
+        weighted[mean] = parts[n].to_numpy() * parts[mean].to_numpy()
+    groups = weighted.groupby(keys, sort=False, observed=True, dropna=False)
+    ids = groups.ngroup().to_numpy()
+    cells = groups.sum()
+    n_cells = len(cells)
+
+    for n, mean, _ in moments:
+        counts = cells[n].to_numpy()
+        cells[mean] = np.divide(cells[mean].to_numpy(), counts, out=np.zeros(n_cells), where=counts > 0)
+    # 再加上各部分均值与组均值之差的贡献
+    deviations = {}
+    for n, mean, m2 in moments:
+        if mean not in deviations:
+            deviations[mean] = parts[mean].to_numpy() - cells[mean].to_numpy()[ids]
+        dev = deviations[mean]
+        weights = parts[n].to_numpy() * dev * dev
+        cells[m2] = _column_or_zero(cells, m2) + np.bincount(ids, weights, minlength=n_cells)
+    for n, mean_x, mean_y, c2 in comoments:
+        weights = parts[n].to_numpy() * deviations[mean_x] * deviations[mean_y]
+        cells[c2] = _column_or_zero(cells, c2) + np.bincount(ids, weights, minlength=n_cells)
+    return cells.reset_index()
+
+
+def _column_or_zero(frame, column):
+    return frame[column].to_numpy() if column in frame.columns else 0.0
+
+
+class CohortCube:
+    """
+    人群聚合立方 (只读; 追加数据时由 append 得到新的立方)
+
+    各单元的汇总量 (人数、个数、均值、离差平方和、协矩) 都可以按并行公式合并, 因此新到的一批记录只需汇总这一批,
+    再与已有单元按维度合并; 不同分区分别建立的立方也可以用 merge 合并
+
+    Args:
+        df: 预处理后的数据 (utils.data_loader.preprocess_data 的第一个返回值)
+    """
+
+    def __init__(self, df):
+        self._build(_cells(df))
+
+    def _build(self, cells):
+        self._cells = cells
+        self.metrics = [m for m in METRICS if f'{m}:n' in cells.columns]
+        self._codes = {}
+        for dimension in DIMENSIONS:
+            if dimension == 'Age':
+                continue
+            codes, uniques = pd.factorize(cells[dimension], use_na_sentinel=False)
+            self._codes[dimension] = (codes, uniques)
+        self._age = cells['Age'].to_numpy()
+        self._stats = cells.drop(columns=DIMENSIONS)
+        self._columns = {name: i for i, name in enumerate(self._stats.columns)}
+        self._values = self._stats.to_numpy(dtype=np.float64)
+
+    def append(self, df):
+        """
+        追加一批新记录
+
+        只汇总新增的行再与已有单元合并, 耗时取决于批大小与单元数, 与已有行数无关;
+        原立方不变 (正在读取它的会话不受影响)
+
+        Args:
+            df: 新记录 (与建立立方时的数据结构相同)
+
+        Returns:
+            CohortCube: 包含新记录的立方
+        """
+        return self.merge(CohortCube(df))
+
+    def merge(self, other):
+        """
+        合并另一个立方 (例如另一分区的数据), 结果与在合并后的数据上直接建立相同
+
+        Returns:
+            CohortCube: 新的立方
+        """
+        if other.n_cells == 0:
+            return self
+        cells = pd.concat([self._cells, other._cells], ignore_index=True)
+        cube = CohortCube.__new__(CohortCube)
+        cube._build(_combine(cells.drop(columns=DIMENSIONS), [cells[d] for d in DIMENSIONS]))
+        return cube
+
+    @property
+    def n_cells(self):
+        return len(self._values)
+
+    def select(self, gender=None, occupation=None, age_range=None, bmi=None, disorder=None):
+        """
+        选出满足条件的单元 (取值语义与 utils.data_loader.filter_data 相同)
+
+        Returns:
+            CubeView: 选中单元组成的视图
+        """
+        return CubeView(self, self._mask(gender, occupation, age_range, bmi, disorder))
+
+    def _mask(self, gender=None, occupation=None, age_range=None, bmi=None, disorder=None):
+        mask = np.ones(self.n_cells, dtype=bool)
+        selection = {'gender': gender, 'occupation': occupation, 'bmi': bmi, 'disorder': disorder}
+        for argument, value in selection.items():
+            values = selected_values(value)
+            if values is None:
+                continue
+            codes, uniques = self._codes[SELECTION_DIMENSIONS[argument]]
+            mask &= np.isin(codes, np.flatnonzero(uniques.isin(values)))
+        if age_range:
+            mask &= (self._age >= age_range[0]) & (self._age <= age_range[1])
+        return mask
+
+    def view(self):
+        """全部数据的视图"""
+        return CubeView(self, np.ones(self.n_cells, dtype=bool))
+
+
+class CubeView:
+    """
+    聚合立方中一组单元的汇总接口, 统计结果与在对应数据行上直接计算相同 (均值等至多相差浮点舍入误差)
+
+    Args:
+        cube: CohortCube
+        mask: 选中单元的布尔数组
+    """
+
+    def __init__(self, cube, mask):
+        self._cube = cube
+        self._mask = mask
+        self._values = cube._values[mask]
+        self._age = cube._age[mask]
+        self._codes = {d: (codes[mask], uniques) for d, (codes, uniques) in cube._codes.items()}
+        self._totals = {}
+        self._moments = {}
+
+    def within(self, **selection):
+        """在当前视图中进一步筛选 (参数同 CohortCube.select)"""
+        return CubeView(self._cube, self._mask & self._cube._mask(**selection))
+
+    def _column(self, name):
+        return self._values[:, self._cube._columns[name]]
+
+    def _total(self, name):
+        """可直接相加的汇总量 (人数、个数、指示量) 的总和"""
+        total = self._totals.get(name)
+        if total is None:
+            # 单元数远少于行数, 用精确求和: 结果与单元的汇总顺序无关
+            total = self._totals[name] = np.float64(math.fsum(self._column(name)))
+        return total
+
+    def _moment(self, prefix, axis=''):
+        """
+        合并选中单元的 (个数, 均值, 离差平方和); prefix 为指标名或指标对名, axis 为指标对的 'x' / 'y'
+        """
+        key = (prefix, axis)
+        moment = self._moments.get(key)
+        if moment is None:
+            suffix = f'_{axis}' if axis else ''
+            n = self._column(f'{prefix}:n')
+            mean, m2 = self._column(f'{prefix}:mean{suffix}'), self._column(f'{prefix}:m2{suffix}')
+            total = self._total(f'{prefix}:n')
+            if total == 0:
+                moment = (total, np.nan, np.nan)
+            else:
+                center = math.fsum(n * mean) / total
+                dev = mean - center
+                moment = (total, np.float64(center), math.fsum(m2) + math.fsum(n * dev * dev))
+            self._moments[key] = moment
+        return moment
+
+    def __len__(self):
+        return int(self._total('count'))
+
+    def count(self, indicator=None):
+        """总人数; 指定指示量 (如 'High_BP') 时为满足该阈值的人数 (np.int64, 与 (mask).sum() 相同)"""
+        name = 'count' if indicator is None else f'{indicator}:sum'
+        return np.int64(self._total(name))
+
+    def mean(self, metric):
+        """均值 (不计缺失值)"""
+        return self._moment(metric)[1]
+
+    def std(self, metric):
+        """样本标准差 (ddof=1, 不计缺失值)"""
+        n, _, m2 = self._moment(metric)
+        return np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+
+    def corr(self, x, y):
+        """Pearson 相关系数 (x, y 须在 PAIRS 中; 只用两列都非空的行)"""
+        if (x, y) not in PAIRS:
+            x, y = y, x
+        name = _pair_name(x, y)
+        n, mean_x, m2_x = self._moment(name, 'x')
+        _, mean_y, m2_y = self._moment(name, 'y')
+        if n < 2:
+            return np.nan
+        # 协矩按与离差平方和相同的方式合并
+        dx = self._column(f'{name}:mean_x') - mean_x
+        dy = self._column(f'{name}:mean_y') - mean_y
+        c2 = math.fsum(self._column(f'{name}:c2')) + math.fsum(self._column(f'{name}:n') * dx * dy)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.float64(c2) / np.sqrt(m2_x * m2_y)
+
+    def age_span(self):
+        """(最小年龄, 最大年龄); 没有选中任何人时为 (nan, nan)"""
+        ages = self._age[self._column('count') > 0]
+        if len(ages) == 0:
+            return np.nan, np.nan
+        return ages.min(), ages.max()
+
+    def counts(self, dimension):
+        """
+        各取值的人数 (只含人数大于0的取值, 按人数降序)
+
+        Returns:
+            Series
+        """
+        counts = self._group(self._column('count'), dimension).astype(np.int64)
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def _group(self, values, dimension, bins=None, labels=None):
+        """按维度对各单元的 values 求和, 返回以维度取值为索引的 Series (按取值排序)"""
+        if dimension == 'Age':
+            keys = self._age if bins is None else pd.cut(self._age, bins=bins, labels=labels)
+            return pd.Series(values).groupby(keys, observed=True).sum()
+        codes, uniques = self._codes[dimension]
+        totals = np.bincount(codes, values, minlength=len(uniques))
+        return pd.Series(totals, index=pd.Index(uniques, name=dimension)).sort_index()
+
+    def group_means(self, dimension, metrics, bins=None, labels=None):
+        """
+        按维度分组的各指标均值, 等价于 df.groupby(dimension)[metrics].mean()
+
+        Args:
+            dimension: 分组维度
+            metrics: 指标列表
+            bins, labels: 按年龄分段时传给 pd.cut 的分段与标签
+
+        Returns:
+            DataFrame: 索引为组, 列为指标; 不含没有人的组
+        """
+        counts = self._group(self._column('count'), dimension, bins, labels)
+        result = {}
+        for m in metrics:
+            n, mean = self._column(f'{m}:n'), self._column(f'{m}:mean')
+            result[m] = self._group(n * mean, dimension, bins, labels) / self._group(n, dimension, bins, labels)
+        result = pd.DataFrame(result)
+        result = result[counts > 0]
+        result.index.name = dimension if bins is None else None
+        return result
+
+
+def cube_view(data):
+    """把 DataFrame 或 CubeView 统一为 CubeView (传入 DataFrame 时临时建立聚合立方)"""
+    if isinstance(data, CubeView):
+        return data
+    return CohortCube(data).view()
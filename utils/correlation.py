@@ -0,0 +1,55 @@
+"""
+相关性排名
+上三角用数组下标一次取出, 按绝对值用部分选择 (argpartition) 取前 k 对, 只对这 k 对排序;
+仪表板按 (相关方法, k, 数据版本, 筛选签名) 缓存结果 (utils.dataset_store)
+"""
+import numpy as np
+import pandas as pd
+
+METHODS = {'pearson': 'Pearson', 'spearman': 'Spearman'}
+DEFAULT_TOP_K = 10
+
+
+def top_pairs(corr, k=DEFAULT_TOP_K):
+    """
+    相关系数矩阵中绝对值最大的 k 对变量 (不含对角线, 每对只出现一次; 缺失的系数跳过)
+
+    Args:
+        corr: 相关系数矩阵 (DataFrame)
+        k: 取前几对
+
+    Returns:
+        DataFrame: 列为 变量1 / 变量2 / 相关系数, 按绝对值降序 (绝对值相同时保持矩阵中的先后顺序)
+    """
+    values = corr.to_numpy(dtype=float)
+    left, right = np.triu_indices(len(values), k=1)
+    r = values[left, right]
+    valid = ~np.isnan(r)
+    left, right, r = left[valid], right[valid], r[valid]
+
+    if k < len(r):
+        # 先按下标排序保证并列时的顺序稳定
+        keep = np.sort(np.argpartition(-np.abs(r), k - 1)[:k])
+        left, right, r = left[keep], right[keep], r[keep]
+    order = np.argsort(-np.abs(r), kind='stable')
+
+    columns = np.asarray(corr.columns)
+    return pd.DataFrame({
+        '变量1': columns[left[order]],
+        '变量2': columns[right[order]],
+        '相关系数': r[order],
+    })
+
+
+def correlation_pairs(df, method='pearson', k=DEFAULT_TOP_K):
+    """
+    数值列之间相关性最强的 k 对变量
+
+    Args:
+        df: 数据框 (一般为编码后的数据或其筛选子集)
+        method: 'pearson' 或 'spearman' (秩相关)
+        k: 取前几对
+    """
+    if method not in METHODS:
+        raise ValueError(f"未知的相关方法: {method}")
+    return top_pairs(df.corr(method=method, numeric_only=True), k)
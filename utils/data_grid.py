@@ -0,0 +1,112 @@
+"""
+服务端分页与排序
+每列的排序排列 (稳定 argsort) 在第一次按该列排序时计算一次, 之后每次交互只在排列上
+按筛选结果取出子序列并切出当前页: 不排序、不复制数据框, 只有当前页的行交给浏览器;
+数据追加记录时已算出的排列与新行归并, 不重新排序
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.filter_index import merge_order
+
+PAGE_SIZES = [25, 50, 100, 500, 1000]
+
+
+class SortIndex:
+    """
+    数据集各列的排序排列 (只读, 按需计算并缓存; 与建立时的行顺序对应)
+
+    Args:
+        df: 数据框
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self._df = df
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def order(self, column):
+        """
+        按该列升序排列的行号 (相同取值保持原始行序, 缺失值排在最后)
+
+        Returns:
+            np.ndarray: 行号 (位置下标)
+        """
+        order = self._orders.get(column)
+        if order is None:
+            with self._lock:
+                order = self._orders.get(column)
+                if order is None:
+                    order = np.argsort(_sort_keys(self._df[column]), kind='stable')
+                    self._orders[column] = order
+        return order
+
+    def extend(self, df):
+        """
+        追加行后的排序索引 (df 的前 n_rows 行即原数据): 已算出的排列与新行归并 (merge_order), 不重新排序
+
+        Returns:
+            SortIndex: 新的排序索引
+        """
+        index = SortIndex(df)
+        for column, order in list(self._orders.items()):
+            keys = _sort_keys(df[column])
+            index._orders[column] = merge_order(order, keys[order], keys[self.n_rows:])[0]
+        return index
+
+
+def _sort_keys(column):
+    """排序键: 分类列用分类编码 (缺失值编码 -1 移到最后), 其余列直接用取值"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        return np.where(codes < 0, len(column.cat.categories), codes)
+    return column.to_numpy()
+
+
+def sorted_rows(rows, sort_index=None, column=None, ascending=True):
+    """
+    筛选结果按某列排序
+
+    Args:
+        rows: 升序行号 (FilterIndex.select 的结果)
+        sort_index: 数据集的 SortIndex
+        column: 排序列; 为空时保持原始行序
+        ascending: 是否升序 (降序为升序排列的逆序)
+
+    Returns:
+        np.ndarray: 排好序的行号
+    """
+    if column is None:
+        result = rows
+    else:
+        order = sort_index.order(column)
+        if len(rows) == sort_index.n_rows:
+            result = order
+        else:
+            selected = np.zeros(sort_index.n_rows, dtype=bool)
+            selected[rows] = True
+            result = order[selected[order]]
+    return result if ascending else result[::-1]
+
+
+def page_count(n_rows, page_size):
+    """总页数 (没有数据时也有1页)"""
+    return max(1, -(-n_rows // page_size))
+
+
+def page_frame(df, rows, page, page_size):
+    """
+    取出一页数据 (只复制这一页的行)
+
+    Args:
+        df: 数据框
+        rows: 排好序的行号
+        page: 页码, 从1开始 (超出范围时取最后一页)
+        page_size: 每页行数
+    """
+    page = min(max(page, 1), page_count(len(rows), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[rows[start:start + page_size]]
@@ -3,15 +3,36 @@
 使用缓存优化性能
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-from sklearn.preprocessing import LabelEncoder
+
+from utils.cohort_cube import cube_view
+from utils.filter_index import FilterIndex, take_rows
+from utils.profiling import profiled
+from utils.scoring import parse_blood_pressure_column
+from utils.storage import read_dataset
+
+# 分类列及其已知取值 (决定分类编码, 按字母序)
+CATEGORIES = {
+    'Gender': ['Female', 'Male'],
+    'Occupation': ['Manual Labor', 'Office Worker', 'Retired', 'Student'],
+    'BMI Category': ['Normal', 'Obese', 'Overweight', 'Underweight'],
+    'Sleep Disorder': ['Insomnia', 'No Disorder', 'Sleep Apnea'],
+}
+
+# 同一BMI类别的不同写法
+BMI_ALIASES = {'Normal Weight': 'Normal'}
+
+# 读CSV时预先声明的列类型
+CSV_DTYPES = {col: 'category' for col in CATEGORIES}
 
 
 @st.cache_data
 def load_and_preprocess_data(filepath='sleep_health_lifestyle_dataset.csv'):
     """
-    加载并预处理睡眠健康数据集
+    加载并预处理睡眠健康数据集 (带 st.cache_data 缓存, 每次访问返回一份副本;
+    仪表板页面请使用 utils.dataset_store 中进程共享的数据)
     
     Args:
         filepath: CSV文件路径
@@ -20,86 +41,172 @@ def load_and_preprocess_data(filepath='sleep_health_lifestyle_dataset.csv'):
         df: 预处理后的原始数据
         df_encoded: 编码后的数据(用于模型分析)
     """
-    # 读取数据
-    df = pd.read_csv(filepath)
+    return preprocess_data(filepath)
+
+
+def _categorical(column, known, aliases=None, missing=None):
+    """
+    转为分类类型: 已知取值按固定顺序编号, 数据中出现的其他取值按字母序排在后面
+    (编码不随数据内容或行序变化; 已知取值的顺序与 LabelEncoder 的字母序编码一致)
     
-    # 删除Person ID列
-    df = df.drop('Person ID', axis=1)
+    别名合并与缺失值填充在类别层面完成, 只处理少量不同取值, 不逐行转换字符串
+    
+    Args:
+        column: 分类或字符串列
+        known: 已知取值
+        aliases: {别名: 标准取值}
+        missing: 缺失值填充为该取值
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype('category')
+    aliases = aliases or {}
     
-    # 处理缺失值
-    df['Sleep Disorder'] = df['Sleep Disorder'].fillna('No Disorder')
+    names = [aliases.get(value, value) for value in column.cat.categories]
+    categories = list(known) + sorted(set(names) - set(known))
+    # 旧编码 -> 新编码; 旧编码 -1 (缺失) 取查找表的最后一项
+    lookup = pd.Index(categories).get_indexer(names + [missing])
+    codes = lookup[column.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=column.index, name=column.name)
+
+
+def _downcast(column):
+    """整数列压缩到能容纳全部取值的最小宽度; 浮点列保持float64 (float32 会改变小数值)"""
+    if pd.api.types.is_integer_dtype(column):
+        return pd.to_numeric(column, downcast='integer')
+    return column
+
+
+def preprocess_data(filepath='sleep_health_lifestyle_dataset.csv'):
+    """
+    加载并预处理睡眠健康数据集 (不缓存)
+    
+    分类列存为 pandas 分类类型, 整数列压缩到最小宽度, 血压按取值只解析一次;
+    编码数据直接使用分类编码, 与原始数据共享其余各列, 不复制
+    
+    Args:
+        filepath: CSV文件路径 (存在同名且不更旧的 .parquet/.feather 时改读列式文件)
+        
+    Returns:
+        df: 预处理后的原始数据
+        df_encoded: 编码后的数据(用于模型分析)
+    """
+    # 读取数据 (读CSV时分类列直接解析为分类类型)
+    return preprocess_frame(read_dataset(filepath, dtype=CSV_DTYPES))
+
+
+def preprocess_frame(df):
+    """
+    预处理已读入的原始数据 (preprocess_data 的处理部分; 仪表板增量读取新追加的记录时也使用)
     
-    # 拆分血压数据
-    df[['Systolic_BP', 'Diastolic_BP']] = df['Blood Pressure (systolic/diastolic)'].str.split('/', expand=True)
-    df['Systolic_BP'] = df['Systolic_BP'].astype(int)
-    df['Diastolic_BP'] = df['Diastolic_BP'].astype(int)
-    df = df.drop('Blood Pressure (systolic/diastolic)', axis=1)
+    Args:
+        df: 与 sleep_health_lifestyle_dataset.csv 结构相同的原始数据
+        
+    Returns:
+        df: 预处理后的原始数据
+        df_encoded: 编码后的数据(用于模型分析)
+    """
+    # 删除Person ID列
+    df = df.drop('Person ID', axis=1)
     
-    # 创建编码版本的数据副本
-    df_encoded = df.copy()
+    # 拆分血压数据 (每种血压取值只解析一次)
+    systolic, diastolic = parse_blood_pressure_column(df.pop('Blood Pressure (systolic/diastolic)'))
+    df['Systolic_BP'] = systolic
+    df['Diastolic_BP'] = diastolic
     
-    # 对分类变量进行编码
-    categorical_cols = ['Gender', 'Occupation', 'BMI Category', 'Sleep Disorder']
+    # 分类列: 统一 'Normal Weight' 写法, 缺失的睡眠障碍记为 'No Disorder'
+    df['Gender'] = _categorical(df['Gender'], CATEGORIES['Gender'])
+    df['Occupation'] = _categorical(df['Occupation'], CATEGORIES['Occupation'])
+    df['BMI Category'] = _categorical(df['BMI Category'], CATEGORIES['BMI Category'], aliases=BMI_ALIASES)
+    df['Sleep Disorder'] = _categorical(df['Sleep Disorder'], CATEGORIES['Sleep Disorder'], missing='No Disorder')
     
-    for col in categorical_cols:
-        le = LabelEncoder()
-        df_encoded[col] = le.fit_transform(df_encoded[col])
+    # 数值列压缩 (血压解析结果为浮点, 无缺失时转回整数)
+    for col in ['Systolic_BP', 'Diastolic_BP']:
+        if not df[col].isna().any():
+            df[col] = df[col].astype(np.int64)
+    for col in df.columns:
+        if col not in CATEGORIES:
+            df[col] = _downcast(df[col])
     
-    return df, df_encoded
+    return df, encode_frame(df)
 
 
-@st.cache_data
-def get_summary_stats(df):
+def encode_frame(df):
+    """编码版本: 分类列换成分类编码, 其余列与 df 共享数据"""
+    df_encoded = df.copy(deep=False)
+    for col in CATEGORIES:
+        df_encoded[col] = df[col].cat.codes
+    return df_encoded
+
+
+@profiled()
+def get_summary_stats(data):
     """
     计算关键统计指标
     
     Args:
-        df: 数据框
+        data: 数据框, 或人群聚合立方视图 (utils.cohort_cube.CubeView, 由单元汇总得到, 不扫描数据行)
         
     Returns:
         dict: 包含关键指标的字典
     """
+    view = cube_view(data)
+    total = view.count()
+    
     stats = {
-        'total_samples': len(df),
-        'avg_sleep_quality': df['Quality of Sleep (scale: 1-10)'].mean(),
-        'avg_sleep_duration': df['Sleep Duration (hours)'].mean(),
-        'disorder_rate': (df['Sleep Disorder'] != 'No Disorder').sum() / len(df) * 100,
-        'avg_activity': df['Physical Activity Level (minutes/day)'].mean(),
-        'avg_stress': df['Stress Level (scale: 1-10)'].mean(),
-        'avg_heart_rate': df['Heart Rate (bpm)'].mean(),
-        'avg_systolic_bp': df['Systolic_BP'].mean(),
-        'avg_diastolic_bp': df['Diastolic_BP'].mean(),
+        'total_samples': total,
+        'avg_sleep_quality': view.mean('Quality of Sleep (scale: 1-10)'),
+        'avg_sleep_duration': view.mean('Sleep Duration (hours)'),
+        'disorder_rate': (total - view.within(disorder='No Disorder').count()) / total * 100,
+        'avg_activity': view.mean('Physical Activity Level (minutes/day)'),
+        'avg_stress': view.mean('Stress Level (scale: 1-10)'),
+        'avg_heart_rate': view.mean('Heart Rate (bpm)'),
+        'avg_systolic_bp': view.mean('Systolic_BP'),
+        'avg_diastolic_bp': view.mean('Diastolic_BP'),
     }
     
     return stats
 
 
-@st.cache_data
-def filter_data(df, gender=None, occupation=None, age_range=None):
+@profiled()
+def filter_data(df, gender=None, occupation=None, age_range=None, bmi=None, disorder=None, index=None):
     """
-    根据条件筛选数据
+    根据条件筛选数据 (通过筛选索引求交集, 不复制原始数据, 也不再对整个数据框做缓存哈希)
     
     Args:
         df: 原始数据框
-        gender: 性别筛选 (None表示全部)
-        occupation: 职业筛选 (None表示全部)
+        gender: 性别筛选 (None或'全部'表示全部, 也可以是取值列表)
+        occupation: 职业筛选 (同上)
         age_range: 年龄范围元组 (min, max)
+        bmi: BMI类别筛选 (同上)
+        disorder: 睡眠障碍筛选 (同上)
+        index: df 的 FilterIndex (仪表板使用 utils.dataset_store.load_filter_index 共享的索引);
+            为空或与 df 行数不一致时临时建立
         
     Returns:
         filtered_df: 筛选后的数据框
     """
-    filtered_df = df.copy()
+    if index is None or index.n_rows != len(df):
+        index = FilterIndex(df)
     
-    if gender and gender != '全部':
-        filtered_df = filtered_df[filtered_df['Gender'] == gender]
-    
-    if occupation and occupation != '全部':
-        filtered_df = filtered_df[filtered_df['Occupation'] == occupation]
-    
-    if age_range:
-        filtered_df = filtered_df[
-            (filtered_df['Age'] >= age_range[0]) & 
-            (filtered_df['Age'] <= age_range[1])
-        ]
+    rows = filter_rows(index, gender=gender, occupation=occupation, age_range=age_range, bmi=bmi, disorder=disorder)
+    return take_rows(df, rows)
+
+
+@profiled()
+def filter_rows(index, gender=None, occupation=None, age_range=None, bmi=None, disorder=None):
+    """
+    filter_data 的行号版本: 只求满足条件的行号, 不取出数据 (分页浏览、导出等按行号分块读取)
     
-    return filtered_df
+    Args:
+        index: 数据集的 FilterIndex
+        其余参数同 filter_data
+        
+    Returns:
+        np.ndarray: 升序的行号
+    """
+    return index.select({
+        'Gender': gender,
+        'Occupation': occupation,
+        'BMI Category': bmi,
+        'Sleep Disorder': disorder,
+    }, age_range=age_range)
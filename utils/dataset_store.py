@@ -0,0 +1,586 @@
+"""
+进程级共享数据集
+st.cache_data 缓存的是序列化后的结果, 每次访问都要反序列化出一份新的DataFrame;
+这里用 st.cache_resource 在每个服务进程中只加载一次原始数据、编码数据和CSHI数据,
+所有会话与页面共享同一份内存, 取数时交出零拷贝的只读视图;
+按筛选条件渲染的图表 (utils.chart_cache) 与导出文件 (utils.exports) 也缓存在这里, 所有会话共享;
+性能面板 (utils.profiling_panel) 从 cache_stats 读取各缓存的命中次数与内存
+
+数据文件被追加记录时 (ingest_daemon.py), 只读取文件新增的部分并入共享数据, 聚合立方按批追加;
+新记录不满足其筛选条件的缓存项直接改挂到新数据版本, 只有受影响的图表与结果重新计算
+"""
+import atexit
+import io
+import os
+import threading
+import time
+import zlib
+
+import pandas as pd
+import streamlit as st
+
+from utils.chart_cache import ChartCache, ResultCache, figure_png, filter_signature
+from utils.cohort_cube import CohortCube
+from utils.correlation import DEFAULT_TOP_K, correlation_pairs
+from utils.data_grid import SortIndex
+from utils.data_loader import (
+    CATEGORIES, CSV_DTYPES, encode_frame, filter_data, filter_rows, preprocess_data, preprocess_frame
+)
+from utils.exports import EXPORTS, ExportCache
+from utils.filter_index import FilterIndex, take_rows
+from utils.insights import InsightSummary
+from utils.profiling import object_nbytes, profiled, section
+from utils.storage import read_dataset
+
+DATA_FILE = 'sleep_health_lifestyle_dataset.csv'
+CSHI_FILE = 'comprehensive_sleep_health_index.csv'
+
+_NOT_LOADED = object()
+
+# 两次检查数据文件是否被追加之间的最短间隔 (秒)
+REFRESH_INTERVAL = 1.0
+
+# 已读部分的指纹只校验开头与末尾各这么多字节 (文件不超过其两倍时覆盖全部已读内容)
+FINGERPRINT_BYTES = 1 << 20
+
+# CSHI图表缓存键中代替筛选签名的标记: 只随CSHI结果变化失效
+CSHI_SIGNATURE = 'cshi'
+
+# pandas 3 始终启用写时复制; pandas 2 需要手动打开, 否则视图上的原地修改会写回共享数据
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+def _view(df):
+    """共享数据的只读视图: 浅拷贝不复制数据, 写时复制保证对视图的修改不影响共享数据"""
+    return None if df is None else df.copy(deep=False)
+
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+
+def _file_state(path):
+    """(设备号, inode, 修改时间): 三者都不变时认为文件内容没有变化"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+
+def _prefix_fingerprint(path, offset):
+    """
+    文件前 offset 字节的廉价指纹: (设备号, inode, 开头与 offset 之前各至多 FINGERPRINT_BYTES 字节的CRC32);
+    文件被替换或已读部分被原地改写时指纹改变 (大文件中间部分的改写需要手动重新加载)
+
+    Returns:
+        tuple: 指纹; 文件不存在时为 None
+    """
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            head = f.read(min(offset, FINGERPRINT_BYTES))
+            start = max(len(head), offset - FINGERPRINT_BYTES)
+            f.seek(start)
+            tail = f.read(offset - start)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino, zlib.crc32(head), zlib.crc32(tail), len(head) + len(tail)
+
+
+def _read_appended(path, offset, **csv_kwargs):
+    """
+    读取CSV文件在 offset 之后追加的完整行 (末尾尚未写完的行留到下一次)
+
+    Returns:
+        tuple: (新增记录 DataFrame, 已读到的位置); 没有完整的新行时 DataFrame 为 None
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return None, offset
+    return pd.read_csv(io.BytesIO(data[:end]), header=None, names=columns, **csv_kwargs), offset + end
+
+
+class _ReadPosition:
+    """
+    数据文件已读入到 offset 字节: 记下文件状态与已读部分的指纹, 用来发现已读部分被替换或改写
+
+    Args:
+        path: 文件路径
+        offset: 已读入的字节数
+    """
+
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
+        self._mark()
+
+    def _mark(self):
+        self.state = _file_state(self.path)
+        self.fingerprint = _prefix_fingerprint(self.path, self.offset)
+
+    def rewritten(self):
+        """文件被删除、变小、被替换或已读部分被改写 (文件状态未变时不读文件)"""
+        size = _file_size(self.path)
+        if size is None or size < self.offset:
+            return True
+        state = _file_state(self.path)
+        if state == self.state:
+            return False
+        if _prefix_fingerprint(self.path, self.offset) != self.fingerprint:
+            return True
+        self.state = state
+        return False
+
+    def read_appended(self, **csv_kwargs):
+        """读取 offset 之后追加的完整行 (参数同 pandas.read_csv); 没有时返回 None"""
+        if _file_size(self.path) <= self.offset:
+            return None
+        new, self.offset = _read_appended(self.path, self.offset, **csv_kwargs)
+        self._mark()
+        return new
+
+
+def _lazy(compute):
+    """线程安全的惰性求值: 第一次调用时计算, 之后返回同一结果"""
+    lock = threading.Lock()
+    result = []
+
+    def get():
+        with lock:
+            if not result:
+                result.append(compute())
+            return result[0]
+    return get
+
+
+class DatasetStore:
+    """
+    只读数据集仓库, 每个服务进程一份 (通过 get_dataset_store 获取)
+
+    Args:
+        data_file: 原始数据集路径
+        cshi_file: 综合睡眠健康指数结果路径 (首次访问时才加载)
+    """
+
+    def __init__(self, data_file=DATA_FILE, cshi_file=CSHI_FILE):
+        self.data_file = data_file
+        self.cshi_file = cshi_file
+        self._lock = threading.Lock()
+        self._version = 0
+        self._checked = time.monotonic()
+        self.charts = ChartCache()
+        self.exports = ExportCache()
+        self.results = ResultCache()
+        atexit.register(self.exports.close)
+        self._load()
+
+    def _load(self):
+        # 先记下文件大小再读取: 读取期间追加的记录在下一次 refresh 时读入 (最多重复读入, 不会遗漏)
+        size = _file_size(self.data_file)
+        while True:
+            df, df_encoded = preprocess_data(self.data_file)
+            if _file_size(self.data_file) == size:
+                break
+            size = _file_size(self.data_file)
+        self._data_read = _ReadPosition(self.data_file, size)
+        self._version += 1
+        self._install(df, df_encoded, FilterIndex(df), CohortCube(df), SortIndex(df))
+        self._cshi = _NOT_LOADED
+        self._cshi_read = None
+        self.charts.clear()
+        self.exports.clear()
+        self.results.clear()
+
+    def _install(self, df, df_encoded, index, cube, sort_index):
+        # 整体替换引用: 其他会话要么拿到旧的一组, 要么拿到新的一组 (数据版本随数据一起替换)
+        self._frames = (df, df_encoded, index, cube, sort_index, self._version)
+
+    def refresh(self):
+        """
+        检查数据文件是否被追加了记录 (至多每 REFRESH_INTERVAL 秒一次): 只读入新增的行并入共享数据;
+        文件变小、被替换或已读部分被改写 (指纹不符) 时全部重新加载
+        """
+        now = time.monotonic()
+        if now - self._checked < REFRESH_INTERVAL:
+            return
+        with self._lock:
+            if now - self._checked < REFRESH_INTERVAL:
+                return
+            self._checked = now
+
+            if self._data_read.rewritten():
+                self._load()
+                return
+            batch = None
+            raw = self._data_read.read_appended(dtype=CSV_DTYPES)
+            if raw is not None:
+                batch = preprocess_frame(raw)[0]
+            cshi_changed = self._refresh_cshi()
+
+            old_version = self._version
+            if batch is not None and not self._append(batch):
+                self._load()
+            elif batch is not None or cshi_changed:
+                self._invalidate(old_version, batch, cshi_changed)
+
+    def _append(self, batch):
+        """把预处理后的新记录并入共享数据; 出现已有数据中没有的分类取值时返回 False (需要全部重新加载)"""
+        df, _, index, cube, sort_index, _ = self._frames
+        for col in CATEGORIES:
+            categories = df[col].cat.categories
+            if not batch[col].dropna().isin(categories).all():
+                return False
+            batch[col] = batch[col].cat.set_categories(categories)
+
+        # 筛选索引、聚合立方与已算出的排序排列都只处理新行再接到已有结果上;
+        # 编码数据与原始数据共享数值列, 只重取分类编码
+        combined = pd.concat([df, batch], ignore_index=True)
+        self._version += 1
+        self._install(combined, encode_frame(combined), index.extend(batch), cube.append(batch),
+                      sort_index.extend(combined))
+        return True
+
+    def _refresh_cshi(self):
+        """CSHI结果已加载且文件被追加时并入新增的行 (文件被改写时下次访问重新读取); 返回CSHI数据是否变化"""
+        if self._cshi is _NOT_LOADED or self._cshi_read is None:
+            return False
+        if self._cshi_read.rewritten():
+            self._cshi, self._cshi_read = _NOT_LOADED, None
+            return True
+        new = self._cshi_read.read_appended()
+        if new is None:
+            return False
+        self._cshi = pd.concat([self._cshi, new], ignore_index=True)
+        return True
+
+    def _invalidate(self, old_version, batch, cshi_changed):
+        """
+        数据变化后的缓存失效: 新记录不满足筛选条件的缓存项改挂到新数据版本, 其余丢弃
+
+        Args:
+            old_version: 变化前的数据版本
+            batch: 新并入的记录 (预处理后); 没有时为 None
+            cshi_changed: CSHI结果是否变化
+        """
+        if self._version == old_version:
+            # 只有CSHI结果变化: 原始数据不变, 只换数据版本
+            self._version += 1
+            self._frames = self._frames[:-1] + (self._version,)
+        batch_index = FilterIndex(batch) if batch is not None else None
+
+        def affected(signature):
+            if signature == CSHI_SIGNATURE:
+                return cshi_changed
+            return batch_index is not None and len(filter_rows(batch_index, **dict(signature))) > 0
+
+        def update(key):
+            if key[-2] != old_version or affected(key[-1]):
+                return None
+            return key[:-2] + (self._version, key[-1])
+
+        for cache in (self.charts, self.results, self.exports):
+            cache.rekey(update)
+
+    def datasets(self):
+        """
+        Returns:
+            tuple: (预处理后的原始数据, 编码后的数据) 的只读视图
+        """
+        df, df_encoded = self._frames[:2]
+        return _view(df), _view(df_encoded)
+
+    def filter_index(self):
+        """原始数据 (与 df_encoded 行序相同) 的筛选索引"""
+        return self._frames[2]
+
+    def cohort_cube(self):
+        """原始数据的人群聚合立方"""
+        return self._frames[3]
+
+    def sort_index(self):
+        """原始数据的排序索引 (服务端分页排序用)"""
+        return self._frames[4]
+
+    def render_charts(self, chart_ids, filters):
+        """
+        按筛选条件渲染 sleep_health_analysis.CHARTS 中的图表 (缓存命中时直接返回, 未命中时后台渲染);
+        sleep_health_analysis.DATASET_CHARTS 中的图表不随筛选变化, 每个数据版本只渲染一次
+
+        Args:
+            chart_ids: 图表ID列表
+            filters: filter_data 的筛选参数 (gender / occupation / age_range / bmi / disorder)
+
+        Returns:
+            dict: {图表ID: Future}, 结果为PNG字节
+        """
+        import sleep_health_analysis  # 绘图依赖较重, 第一次画图时才导入
+
+        df, _, index, _, _, version = self._frames
+        filtered = [c for c in chart_ids if c not in sleep_health_analysis.DATASET_CHARTS]
+        dataset = [c for c in chart_ids if c in sleep_health_analysis.DATASET_CHARTS]
+        # 同一批未命中的图表共用一份筛选并准备好的数据, 全部命中时不筛选
+        subset = _lazy(lambda: sleep_health_analysis.prepare_data(filter_data(df, index=index, **filters)))
+        sample = _lazy(lambda: sleep_health_analysis.prepare_data(
+            df.sample(sleep_health_analysis.DATASET_CHART_MAX_ROWS, random_state=42)
+            if len(df) > sleep_health_analysis.DATASET_CHART_MAX_ROWS else df
+        ))
+        charts = self._submit_charts(sleep_health_analysis.CHARTS, filtered,
+                                     (version, filter_signature(**filters)), subset)
+        # 空签名即"不筛选": 数据追加后照常失效
+        charts.update(self._submit_charts(sleep_health_analysis.CHARTS, dataset, (version, filter_signature()), sample))
+        return charts
+
+    def render_cshi_charts(self, chart_ids):
+        """
+        渲染 cshi_visualization.CHARTS 中的图表, 每个数据版本只渲染一次
+
+        Returns:
+            dict: {图表ID: Future}, 结果为PNG字节
+        """
+        import cshi_visualization  # 绘图依赖较重, 第一次画图时才导入
+
+        version = self._frames[-1]
+        return self._submit_charts(cshi_visualization.CHARTS, chart_ids, (version, CSHI_SIGNATURE), _lazy(self.cshi))
+
+    def _submit_charts(self, plots, chart_ids, key, data):
+        """按 (图表ID, *key) 取缓存或提交渲染; data 为无参数函数, 只在有图表未命中时调用"""
+        def renderer(chart_id):
+            plot = plots[chart_id]
+            return lambda: figure_png(plot(data()))
+
+        return {chart_id: self.charts.submit((chart_id,) + key, renderer(chart_id))
+                for chart_id in chart_ids}
+
+    def top_correlations(self, filters, method='pearson', k=DEFAULT_TOP_K):
+        """
+        筛选后的编码数据中相关性最强的 k 对变量, 按数据版本与筛选条件缓存
+
+        Args:
+            filters: filter_data 的筛选参数
+            method: 'pearson' 或 'spearman'
+            k: 取前几对
+
+        Returns:
+            DataFrame: 列为 变量1 / 变量2 / 相关系数
+        """
+        _, df_encoded, index, _, _, version = self._frames
+        return self.results.get(
+            ('correlation', method, k, version, filter_signature(**filters)),
+            lambda: correlation_pairs(take_rows(df_encoded, filter_rows(index, **filters)), method, k)
+        )
+
+    def describe(self, filters):
+        """
+        筛选后数值列的描述性统计 (与 DataFrame.describe 相同), 按数据版本与筛选条件缓存
+
+        Args:
+            filters: filter_data 的筛选参数
+
+        Returns:
+            DataFrame: 行为 count/mean/std/min/25%/50%/75%/max, 列为数值列
+        """
+        df, _, index, _, _, version = self._frames
+        return self.results.get(
+            ('describe', version, filter_signature(**filters)),
+            lambda: take_rows(df.select_dtypes(include='number'), filter_rows(index, **filters)).describe()
+        )
+
+    def insights(self, filters):
+        """
+        指标卡片与洞察文字的统计量, 在人群聚合立方上一次算出, 按数据版本与筛选条件缓存
+
+        Args:
+            filters: CohortCube.select 的筛选参数 (gender / occupation / age_range / bmi / disorder)
+
+        Returns:
+            InsightSummary
+        """
+        _, _, _, cube, _, version = self._frames
+        return self.results.get(
+            ('insights', version, filter_signature(**filters)),
+            lambda: InsightSummary(cube.select(**filters))
+        )
+
+    def exported(self, kind, filters):
+        """已生成的导出文件路径 (当前数据版本与筛选条件); 还没有生成时为 None"""
+        return self.exports.get((kind, self._frames[-1], filter_signature(**filters)))
+
+    def export(self, kind, filters):
+        """
+        生成 utils.exports.EXPORTS 中的导出文件, 同一数据版本与筛选条件只生成一次
+
+        Args:
+            kind: 导出类型 ('csv' / 'xlsx' / 'summary')
+            filters: filter_data 的筛选参数
+
+        Returns:
+            str: 导出文件路径
+        """
+        df, _, index, _, _, version = self._frames
+        suffix, write = EXPORTS[kind]
+        return self.exports.export(
+            (kind, version, filter_signature(**filters)),
+            suffix,
+            lambda path: write(df, filter_rows(index, **filters), path)
+        )
+
+    def cshi(self):
+        """
+        Returns:
+            DataFrame: CSHI结果的只读视图; 结果文件不存在时为 None
+        """
+        cshi = self._cshi
+        if cshi is _NOT_LOADED:
+            with self._lock:
+                if self._cshi is _NOT_LOADED:
+                    # 与原始数据相同: 先记下文件大小, 之后追加的行由 refresh 读入
+                    size = _file_size(self.cshi_file)
+                    try:
+                        self._cshi = read_dataset(self.cshi_file)
+                    except FileNotFoundError:
+                        self._cshi = None
+                    self._cshi_read = _ReadPosition(self.cshi_file, size) if size is not None else None
+                cshi = self._cshi
+        return _view(cshi)
+
+    def cache_stats(self):
+        """
+        各缓存的命中/未命中次数 (进程启动以来累计)、条目数与占用内存 (性能面板用, 内存为估计值)
+
+        Returns:
+            dict: {缓存名: {'hits', 'misses', 'entries', 'nbytes'}}; 共享数据集没有命中统计, 记为 None
+        """
+        cshi = self._cshi
+        shared = self._frames[:-1] + ((cshi,) if cshi is not _NOT_LOADED and cshi is not None else ())
+        stats = {'共享数据集': {'hits': None, 'misses': None, 'entries': len(shared), 'nbytes': object_nbytes(shared)}}
+        stats.update(self.charts.stats())
+        stats.update({f'结果 {kind}': item for kind, item in self.results.stats().items()})
+        stats.update(self.exports.stats())
+        return stats
+
+    def reload(self):
+        """重新从磁盘加载所有数据集 (数据文件更新后调用)"""
+        with self._lock:
+            self._load()
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_store():
+    return DatasetStore()
+
+
+def get_dataset_store():
+    """当前服务进程共享的 DatasetStore (顺便检查数据文件是否有新追加的记录)"""
+    store = _shared_store()
+    store.refresh()
+    return store
+
+
+@profiled()
+def load_datasets():
+    """
+    仪表板页面的数据入口
+
+    Returns:
+        tuple: (df, df_encoded), 与 load_and_preprocess_data 的返回值相同
+    """
+    return get_dataset_store().datasets()
+
+
+def load_filter_index():
+    """load_datasets 返回数据的筛选索引, 传给 filter_data 的 index 参数"""
+    return get_dataset_store().filter_index()
+
+
+def load_cohort_cube():
+    """load_datasets 返回数据的人群聚合立方, 用 select() 按筛选条件取视图"""
+    return get_dataset_store().cohort_cube()
+
+
+@profiled()
+def load_describe(**filters):
+    """
+    当前筛选条件下数值列的描述性统计 (进程内缓存, 交互时不再筛选数据)
+
+    Args:
+        **filters: 与 filter_data 相同的筛选条件
+    """
+    return get_dataset_store().describe(filters)
+
+
+@profiled()
+def load_insights(**filters):
+    """
+    当前筛选条件下的指标与洞察统计量 (utils.insights.InsightSummary, 进程内缓存),
+    传给 utils.insights 的洞察函数; 指标卡片数据在其 stats 属性中 (与 get_summary_stats 相同)
+
+    Args:
+        **filters: 与 filter_data 相同的筛选条件; 不传时为全部数据
+    """
+    return get_dataset_store().insights(filters)
+
+
+def load_sort_index():
+    """load_datasets 返回数据的排序索引, 传给 utils.data_grid.sorted_rows"""
+    return get_dataset_store().sort_index()
+
+
+@profiled()
+def load_cshi_data():
+    """CSHI结果 (文件不存在时为 None)"""
+    return get_dataset_store().cshi()
+
+
+@profiled()
+def load_top_correlations(method='pearson', k=DEFAULT_TOP_K, **filters):
+    """
+    相关性最强的 k 对变量 (在筛选后的编码数据上计算, 结果进程内缓存)
+
+    Args:
+        method: 'pearson' 或 'spearman'
+        k: 取前几对
+        **filters: 与 filter_data 相同的筛选条件
+    """
+    return get_dataset_store().top_correlations(filters, method, k)
+
+
+@profiled()
+def load_charts(chart_ids, **filters):
+    """
+    提交当前页面的图表渲染 (先全部提交, 未命中的在后台并行渲染), 用 show_chart 逐个显示
+
+    Args:
+        chart_ids: sleep_health_analysis.CHARTS 中的图表ID
+        **filters: 与 filter_data 相同的筛选条件; 不传时为全部数据
+    """
+    return get_dataset_store().render_charts(chart_ids, filters)
+
+
+@profiled()
+def load_cshi_charts(chart_ids):
+    """提交CSHI页面的图表渲染 (cshi_visualization.CHARTS 中的ID), 用 show_chart 逐个显示"""
+    return get_dataset_store().render_cshi_charts(chart_ids)
+
+
+def show_chart(charts, chart_id):
+    """显示 load_charts 提交的图表; 筛选后的数据不足以绘制该图表时显示提示"""
+    try:
+        # 命中缓存时立即返回; 未命中时等待后台渲染完成
+        with section(f'图表渲染 {chart_id}'):
+            png = charts[chart_id].result()
+    except Exception as e:
+        st.info(f"当前筛选条件下无法绘制该图表 ({e})")
+        return
+    with section('图片输出'):
+        st.image(png, use_container_width=True)
+
+
+def reload_datasets():
+    """重新加载共享数据集, 之后的页面访问都会拿到新数据"""
+    get_dataset_store().reload()
@@ -0,0 +1,35 @@
+"""
+导出按钮
+utils.exports 生成的导出文件在页面上的下载入口, 文件由共享的 DatasetStore 按筛选条件生成并缓存
+"""
+import streamlit as st
+
+from utils.dataset_store import get_dataset_store
+
+
+def export_button(kind, label, file_name, mime, **filters):
+    """
+    按需导出的下载按钮: 先显示"生成"按钮 (文件已生成时为"准备下载"), 只在点击它的这次运行中显示下载按钮
+
+    st.download_button 每次渲染都会把整个文件读入内存并登记到媒体文件管理器, 所以不在每次运行中都渲染,
+    否则页面上任何控件的变化都要读一遍已生成的导出文件
+
+    Args:
+        kind: utils.exports.EXPORTS 中的导出类型
+        label: 下载按钮文字
+        file_name: 下载文件名
+        mime: 文件类型
+        **filters: 与 filter_data 相同的筛选条件
+    """
+    store = get_dataset_store()
+    ready = store.exported(kind, filters) is not None
+    if not st.button(label.replace('下载', '准备下载' if ready else '生成'), key=f'export_{kind}'):
+        return
+    try:
+        with st.spinner("正在生成导出文件..."):
+            path = store.export(kind, filters)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    with open(path, 'rb') as f:
+        st.download_button(label=label, data=f, file_name=file_name, mime=mime, key=f'download_{kind}')
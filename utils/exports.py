@@ -0,0 +1,182 @@
+"""
+按需导出
+导出文件只在用户请求时生成: 按行号分块读取数据, 逐块写入临时文件 (不在内存中拼出整个文件);
+生成的文件按 (导出类型, 数据版本, 筛选签名) 缓存, 文件数超过上限时删除最久未使用的文件
+"""
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from utils.chart_cache import rekey_entries
+
+EXPORT_CHUNK_ROWS = 50_000
+EXCEL_MAX_ROWS = 1_048_575  # Excel 单表行数上限 (不含表头)
+EXCEL_SHEET_NAME = '睡眠健康数据'
+DEFAULT_MAX_FILES = 32
+
+
+def _chunks(df, rows, chunk_rows):
+    """按行号分块取出数据 (每次只复制一块)"""
+    for start in range(0, len(rows), chunk_rows):
+        yield df.iloc[rows[start:start + chunk_rows]]
+
+
+def write_csv(df, rows, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    把选中的行分块写成CSV (带BOM的UTF-8, Excel可直接打开)
+
+    Args:
+        df: 数据框
+        rows: 要导出的行号
+        path: 输出文件路径
+    """
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        if len(rows) == 0:
+            df.iloc[:0].to_csv(f, index=False)
+        for i, chunk in enumerate(_chunks(df, rows, chunk_rows)):
+            chunk.to_csv(f, header=i == 0, index=False)
+
+
+def write_excel(df, rows, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    把选中的行分块写成Excel (openpyxl 只写模式, 行直接流式写入文件, 不在内存中保留整个工作簿)
+
+    Raises:
+        ValueError: 行数超过Excel单表上限
+    """
+    if len(rows) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(rows)} 行超过Excel单表上限 {EXCEL_MAX_ROWS} 行, 请使用CSV导出")
+
+    from openpyxl import Workbook  # 只在导出Excel时导入
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(EXCEL_SHEET_NAME)
+    sheet.append(list(df.columns))
+    for chunk in _chunks(df, rows, chunk_rows):
+        # 缺失值写成空单元格
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(path)
+
+
+def write_summary(df, rows, path):
+    """选中行的数值型变量描述性统计 (CSV)"""
+    df.iloc[rows].describe().round(2).to_csv(path, encoding='utf-8-sig')
+
+
+# 导出类型: (文件后缀, 写入函数 (df, rows, path))
+EXPORTS = {
+    'csv': ('.csv', write_csv),
+    'xlsx': ('.xlsx', write_excel),
+    'summary': ('.csv', write_summary),
+}
+
+
+class ExportCache:
+    """
+    导出文件缓存 (线程安全), 文件放在自己的临时目录中
+
+    Args:
+        max_files: 保留的导出文件数上限
+        directory: 存放目录; 为空时新建临时目录
+    """
+
+    def __init__(self, max_files=DEFAULT_MAX_FILES, directory=None):
+        self.max_files = max_files
+        self.directory = directory or tempfile.mkdtemp(prefix='sleep_health_exports_')
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self._writing = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._files)
+
+    def get(self, key):
+        """已生成的导出文件路径; 没有时为 None"""
+        with self._lock:
+            path = self._files.get(key)
+            if path is not None:
+                self._files.move_to_end(key)
+                self.hits += 1
+            return path
+
+    def export(self, key, suffix, write):
+        """
+        取缓存的导出文件; 没有时生成 (同一个键正在生成时等待同一个结果, 不重复生成)
+
+        Args:
+            key: 可哈希的缓存键, 一般为 (导出类型, 数据版本, 筛选签名)
+            suffix: 文件后缀
+            write: 函数 write(path), 把导出内容写入 path
+
+        Returns:
+            str: 导出文件路径
+        """
+        path = self.get(key)
+        if path is not None:
+            return path
+        with self._lock:
+            writing = self._writing.setdefault(key, threading.Lock())
+        with writing:
+            path = self.get(key)
+            if path is not None:
+                return path
+            with self._lock:
+                self.misses += 1
+            fd, path = tempfile.mkstemp(suffix=suffix, dir=self.directory)
+            os.close(fd)
+            try:
+                write(path)
+            except BaseException:
+                os.remove(path)
+                with self._lock:
+                    self._writing.pop(key, None)
+                raise
+            with self._lock:
+                self._writing.pop(key, None)
+                self._files[key] = path
+                while len(self._files) > self.max_files:
+                    _, evicted = self._files.popitem(last=False)
+                    _remove(evicted)
+        return path
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'导出文件': {'hits', 'misses', 'entries', 'nbytes'}}, nbytes 为磁盘上的文件大小
+        """
+        with self._lock:
+            paths = list(self._files.values())
+            hits, misses = self.hits, self.misses
+        nbytes = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+        return {'导出文件': {'hits': hits, 'misses': misses, 'entries': len(paths), 'nbytes': nbytes}}
+
+    def rekey(self, update):
+        """逐项改写缓存键, 参数同 utils.chart_cache.ChartCache.rekey; 被丢弃的文件随之删除"""
+        with self._lock:
+            self._files = rekey_entries(self._files, update, discard=_remove)
+
+    def clear(self):
+        """删除所有导出文件"""
+        with self._lock:
+            for path in self._files.values():
+                _remove(path)
+            self._files.clear()
+
+    def close(self):
+        """删除导出目录 (进程退出时调用)"""
+        self.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _remove(path):
+    # 正在下载的文件句柄不受影响 (POSIX); 删除失败时留给 close 清理目录
+    try:
+        os.remove(path)
+    except OSError:
+        pass
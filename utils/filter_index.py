@@ -0,0 +1,182 @@
+"""
+筛选索引
+为分类列预先建立倒排索引 (每个取值一张按位压缩的行号位图), 为年龄建立排序后的行号排列;
+筛选时对位图做按位与/或, 年龄范围用二分查找定位, 结果以行号数组返回, 不复制数据;
+数据追加记录时用 extend 只为新行编码与排序, 再接到已有的位图与排列上
+"""
+import numpy as np
+import pandas as pd
+
+INDEXED_COLUMNS = ['Gender', 'Occupation', 'BMI Category', 'Sleep Disorder']
+AGE_COLUMN = 'Age'
+
+# 年龄范围内的行数少于全部行数的这个比例时, 逐个检查范围内的行; 否则先展开位图再按年龄过滤
+AGE_PROBE_RATIO = 0.125
+
+
+def selected_values(value):
+    """筛选值规范化: None / '全部' / 空列表表示不筛选, 返回 None; 否则返回取值列表"""
+    if value is None or (isinstance(value, str) and value == '全部'):
+        return None
+    if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+        return list(value) or None
+    return [value]
+
+
+def merge_order(order, sorted_keys, keys):
+    """
+    把追加的一批行并入稳定排序的行号排列, 结果与在全部行上 np.argsort(kind='stable') 相同
+
+    只对新行排序, 再按二分查找的位置插入; 缺失值 (NaN) 与 argsort 一样排在最后
+
+    Args:
+        order: 已有行的排列
+        sorted_keys: 按 order 排好的已有行的键
+        keys: 新行的键 (行号接在已有行之后)
+
+    Returns:
+        tuple: (全部行的排列, 排好的键)
+    """
+    batch_order = np.argsort(keys, kind='stable')
+    batch_sorted = keys[batch_order]
+    # 键相同时已有行在前, 与稳定排序一致
+    positions = np.searchsorted(sorted_keys, batch_sorted, side='right') + np.arange(len(keys))
+    old = np.ones(len(order) + len(keys), dtype=bool)
+    old[positions] = False
+
+    merged = np.empty(len(old), dtype=order.dtype)
+    merged[positions] = batch_order + len(order)
+    merged[old] = order
+    merged_keys = np.empty(len(old), dtype=np.result_type(sorted_keys, batch_sorted))
+    merged_keys[positions] = batch_sorted
+    merged_keys[old] = sorted_keys
+    return merged, merged_keys
+
+
+def _append_bits(bitmap, n_bits, bits):
+    """在 n_bits 位的压缩位图后接上 bits (布尔数组)"""
+    used = n_bits % 8
+    if used == 0:
+        return np.concatenate([bitmap, np.packbits(bits)])
+    # 最后一个字节未满: 取出已用的位与新位一起重新压缩
+    head = np.unpackbits(bitmap[-1:], count=used).astype(bool)
+    return np.concatenate([bitmap[:-1], np.packbits(np.concatenate([head, bits]))])
+
+
+class FilterIndex:
+    """
+    数据集的筛选索引 (只读, 与建立索引时的行顺序对应)
+
+    Args:
+        df: 数据框
+        columns: 建立位图索引的分类列
+        age_column: 建立排序排列的年龄列
+    """
+
+    def __init__(self, df, columns=INDEXED_COLUMNS, age_column=AGE_COLUMN):
+        self.n_rows = len(df)
+        self._bitmaps = {}
+        for column in columns:
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column])
+            self._bitmaps[column] = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+
+        self.age_column = age_column
+        self._age = df[age_column].to_numpy()
+        self._age_order = np.argsort(self._age, kind='stable')
+        self._sorted_age = self._age[self._age_order]
+
+    def extend(self, batch):
+        """
+        追加一批行 (行号接在已有行之后) 后的索引; 原索引不变 (正在使用它的会话不受影响)
+
+        只对新行做分类编码与排序: 位图在末尾接上新行的位, 年龄排列用 merge_order 归并,
+        结果与在全部行上重新建立相同
+
+        Args:
+            batch: 新行 (与建立索引时的数据结构相同)
+
+        Returns:
+            FilterIndex: 新的索引
+        """
+        index = FilterIndex.__new__(FilterIndex)
+        index.n_rows = self.n_rows + len(batch)
+        index.age_column = self.age_column
+        index._bitmaps = {}
+        for column, bitmaps in self._bitmaps.items():
+            codes, uniques = pd.factorize(batch[column])
+            batch_codes = {value: i for i, value in enumerate(uniques)}
+            extended = {}
+            for value in list(bitmaps) + [v for v in uniques if v not in bitmaps]:
+                bitmap = bitmaps.get(value)
+                if bitmap is None:
+                    bitmap = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+                code = batch_codes.get(value)
+                bits = codes == code if code is not None else np.zeros(len(batch), dtype=bool)
+                extended[value] = _append_bits(bitmap, self.n_rows, bits)
+            index._bitmaps[column] = extended
+
+        age = batch[self.age_column].to_numpy()
+        index._age = np.concatenate([self._age, age])
+        index._age_order, index._sorted_age = merge_order(self._age_order, self._sorted_age, age)
+        return index
+
+    def _bitmap(self, column, values):
+        """若干取值位图的并集; 没有命中任何取值时为全0"""
+        bitmaps = self._bitmaps[column]
+        result = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in bitmaps:
+                result |= bitmaps[value]
+        return result
+
+    def select(self, conditions=None, age_range=None):
+        """
+        按条件筛选, 返回满足条件的行号
+
+        Args:
+            conditions: {列名: 取值或取值列表}; 同一列的多个取值为"或", 不同列之间为"与"
+            age_range: 年龄范围元组 (min, max), 两端都包含
+
+        Returns:
+            np.ndarray: 升序的行号 (位置下标)
+        """
+        mask = None
+        for column, value in (conditions or {}).items():
+            values = selected_values(value)
+            if values is None:
+                continue
+            bitmap = self._bitmap(column, values)
+            mask = bitmap if mask is None else mask & bitmap
+
+        lo, hi = 0, self.n_rows
+        if age_range:
+            lo = np.searchsorted(self._sorted_age, age_range[0], side='left')
+            hi = np.searchsorted(self._sorted_age, age_range[1], side='right')
+
+        if lo == 0 and hi == self.n_rows:
+            # 年龄范围覆盖全部数据
+            if mask is None:
+                return np.arange(self.n_rows)
+            return np.flatnonzero(np.unpackbits(mask, count=self.n_rows))
+
+        if mask is None:
+            return np.sort(self._age_order[lo:hi])
+
+        if hi - lo < self.n_rows * AGE_PROBE_RATIO:
+            # 年龄范围较窄: 只在范围内的行上检查位图中对应的位
+            rows = self._age_order[lo:hi]
+            hit = (mask[rows >> 3] >> (7 - (rows & 7)).astype(np.uint8)) & 1
+            return np.sort(rows[hit.astype(bool)])
+
+        rows = np.flatnonzero(np.unpackbits(mask, count=self.n_rows))
+        age = self._age[rows]
+        return rows[(age >= age_range[0]) & (age <= age_range[1])]
+
+
+def take_rows(df, rows):
+    """按行号取出子集; 选中全部行时直接返回零拷贝视图"""
+    if len(rows) == len(df):
+        return df.copy(deep=False)
+    return df.iloc[rows]
@@ -0,0 +1,137 @@
+"""
+增量评分
+每次写出评分结果时, 同时在旁路文件 (<结果文件名>.row_hashes.csv) 中记录每个 Person ID
+所依赖输入列的内容哈希; 下次以 --incremental 运行时只对新增或哈希变化的行重新评分,
+其余行直接复用上次结果中的分数列
+"""
+import hashlib
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.storage import dataset_columns, read_dataset
+from utils.streaming import CsvChunkWriter
+
+
+def hash_path(output_file):
+    """结果文件对应的行哈希旁路文件路径"""
+    return os.path.splitext(output_file)[0] + '.row_hashes.csv'
+
+
+def rules_fingerprint(*modules):
+    """
+    由评分代码的源码生成64位指纹, 混入每一行的哈希中
+    评分规则一旦修改, 所有行的哈希随之改变, 下一次增量运行自动全量重算
+
+    Args:
+        *modules: 评分结果依赖的模块
+
+    Returns:
+        np.uint64: 指纹
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(inspect.getsource(module).encode('utf-8'))
+    return np.uint64(int.from_bytes(digest.digest()[:8], 'little'))
+
+
+def row_hashes(df, columns, fingerprint):
+    """
+    计算每一行在 columns 上的内容哈希
+
+    Args:
+        df: DataFrame
+        columns: 评分依赖的输入列
+        fingerprint: rules_fingerprint 的返回值
+
+    Returns:
+        np.ndarray: uint64 哈希数组
+    """
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy() ^ fingerprint
+
+
+class RowHashWriter(CsvChunkWriter):
+    """
+    随结果文件逐块写出行哈希旁路文件
+
+    Args:
+        output_file: 结果文件路径
+        columns: 评分依赖的输入列
+        fingerprint: 评分规则指纹
+        key: 主键列
+        append: 接在已有的旁路文件后面写 (结果文件被追加记录时使用)
+    """
+
+    def __init__(self, output_file, columns, fingerprint, key='Person ID', append=False):
+        super().__init__(hash_path(output_file), append=append)
+        self.columns = columns
+        self.fingerprint = fingerprint
+        self.key = key
+
+    def write(self, df):
+        super().write(pd.DataFrame({
+            self.key: df[self.key].to_numpy(),
+            'Row_Hash': row_hashes(df, self.columns, self.fingerprint)
+        }))
+
+
+def _load_previous(df, output_file, key):
+    """读取上次的结果与行哈希; 不存在或与当前输入结构不匹配时返回 (None, None)"""
+    if not (os.path.exists(output_file) and os.path.exists(hash_path(output_file))):
+        return None, None
+
+    # 结果文件 = 输入列 + 分数列; 输入结构变化时不能复用
+    header = dataset_columns(output_file)
+    if header[:len(df.columns)] != list(df.columns):
+        return None, None
+
+    # 输入列以本次数据为准, 只需读取主键与分数列
+    previous = read_dataset(output_file, columns=[key] + header[len(df.columns):],
+                            float_precision='round_trip')
+    hashes = pd.read_csv(hash_path(output_file), dtype={'Row_Hash': 'uint64'})
+
+    # 主键重复或旁路文件与结果不对应时不能复用
+    if (len(previous) == 0 or not df[key].is_unique or not previous[key].is_unique or
+            not np.array_equal(previous[key].to_numpy(), hashes[key].to_numpy())):
+        return None, None
+    return previous, hashes
+
+
+def incremental_score(df, score_func, columns, output_file, fingerprint, key='Person ID'):
+    """
+    增量评分: 只对新增或依赖列发生变化的行调用 score_func, 其余行复用上次结果
+
+    Args:
+        df: 当前输入数据
+        score_func: 评分函数, 接收输入行, 返回 输入列 + 分数列 (行序不变)
+        columns: 评分依赖的输入列
+        output_file: 上次的结果文件 (旁路哈希文件随之定位)
+        fingerprint: 评分规则指纹
+        key: 主键列
+
+    Returns:
+        tuple: (与全量评分相同结构的结果DataFrame, 重新评分的行数)
+    """
+    previous, hashes = _load_previous(df, output_file, key)
+    if previous is None:
+        return score_func(df), len(df)
+
+    # 在上次结果中出现过且哈希相同的行可以复用 (全程以uint64比较)
+    position = pd.Index(hashes[key]).get_indexer(df[key])
+    old_hash = hashes['Row_Hash'].to_numpy()[np.maximum(position, 0)]
+    reuse = (position >= 0) & (old_hash == row_hashes(df, columns, fingerprint))
+
+    # 未变化的行: 当前输入列 + 上次的分数列
+    score_columns = list(previous.columns[1:])
+    kept_scores = previous.set_index(key).loc[df.loc[reuse, key], score_columns]
+    kept = pd.concat([df[reuse].reset_index(drop=True), kept_scores.reset_index(drop=True)], axis=1)
+
+    # 新增或变化的行重新评分, 再按输入顺序拼回
+    parts = [kept] if reuse.any() else []
+    if not reuse.all():
+        parts.append(score_func(df[~reuse]))
+    order = np.argsort(np.concatenate([np.flatnonzero(reuse), np.flatnonzero(~reuse)]), kind='stable')
+    result = pd.concat(parts, ignore_index=True).iloc[order].reset_index(drop=True)
+    return result, int((~reuse).sum())
@@ -1,15 +1,61 @@
 """
 自动洞察生成工具
 基于数据分析结果生成文本解读
+
+所有洞察需要的统计量由 InsightSummary 在人群聚合立方视图上一次算出, 各函数只负责格式化;
+函数接受数据框、聚合立方视图 (utils.cohort_cube.CubeView) 或 InsightSummary,
+仪表板传入按筛选条件缓存的 InsightSummary (utils.dataset_store.load_insights);
+各洞察函数的耗时在启用剖析时记入性能面板 (utils.profiling)
 """
 
-import pandas as pd
-import streamlit as st
+from utils.cohort_cube import cube_view
+from utils.data_loader import get_summary_stats
+from utils.profiling import profiled
+
+QUALITY = 'Quality of Sleep (scale: 1-10)'
+ACTIVITY = 'Physical Activity Level (minutes/day)'
+STRESS = 'Stress Level (scale: 1-10)'
+
+
+class InsightSummary:
+    """
+    指标卡片与全部洞察文字所需的统计量 (只读)
+
+    视图的所有汇总量只求一次 (CubeView 内部缓存), 各项统计都从同一份总量与分组和中读取
+
+    Args:
+        data: 数据框或聚合立方视图
+    """
 
+    def __init__(self, data):
+        view = cube_view(data)
+        self.stats = get_summary_stats(view)
+        self.total = len(view)
+        self.avg_quality = view.mean(QUALITY)
+        self.avg_stress = view.mean(STRESS)
+        self.activity_quality_corr = view.corr(ACTIVITY, QUALITY)
+        self.disorder_counts = view.counts('Sleep Disorder')
+        self.high_stress = view.count('High_Stress')
+        self.high_bp = view.count('High_BP')
+        self.high_hr = view.count('High_HR')
+        obese = view.within(bmi='Obese')
+        self.obese = obese.count()
+        self.obese_with_apnea = obese.within(disorder='Sleep Apnea').count()
+        self.gender_means = view.group_means('Gender', [QUALITY, STRESS])
+        self.occupation_stress = view.group_means('Occupation', [STRESS])[STRESS].sort_values(ascending=False)
 
-def generate_sleep_quality_insight(df):
+
+def summarize(data):
+    """把数据框、聚合立方视图或 InsightSummary 统一为 InsightSummary"""
+    if isinstance(data, InsightSummary):
+        return data
+    return InsightSummary(data)
+
+
+@profiled()
+def generate_sleep_quality_insight(data):
     """生成睡眠质量洞察"""
-    avg_quality = df['Quality of Sleep (scale: 1-10)'].mean()
+    avg_quality = summarize(data).avg_quality
     
     if avg_quality >= 8:
         level = "优秀"
@@ -27,10 +73,12 @@ def generate_sleep_quality_insight(df):
     return f"{icon} 整体睡眠质量为**{level}** (平均分: {avg_quality:.2f}/10)"
 
 
-def generate_disorder_insight(df):
+@profiled()
+def generate_disorder_insight(data):
     """生成睡眠障碍洞察"""
-    disorder_counts = df['Sleep Disorder'].value_counts()
-    total = len(df)
+    summary = summarize(data)
+    disorder_counts = summary.disorder_counts
+    total = summary.total
     
     insights = []
     
@@ -48,10 +96,13 @@ def generate_disorder_insight(df):
     return "\n".join(insights)
 
 
-def generate_lifestyle_insight(df):
+@profiled()
+def generate_lifestyle_insight(data):
     """生成生活方式洞察"""
+    summary = summarize(data)
+    
     # 运动与睡眠质量的相关性
-    correlation = df['Physical Activity Level (minutes/day)'].corr(df['Quality of Sleep (scale: 1-10)'])
+    correlation = summary.activity_quality_corr
     
     if correlation > 0.3:
         activity_insight = f"🏃 运动与睡眠质量呈**正相关** (相关系数: {correlation:.2f})，增加运动有助于改善睡眠"
@@ -61,19 +112,22 @@ def generate_lifestyle_insight(df):
         activity_insight = f"运动与睡眠质量相关性较弱 (相关系数: {correlation:.2f})"
     
     # 压力分析
-    avg_stress = df['Stress Level (scale: 1-10)'].mean()
-    high_stress_rate = (df['Stress Level (scale: 1-10)'] >= 7).sum() / len(df) * 100
+    avg_stress = summary.avg_stress
+    high_stress_rate = summary.high_stress / summary.total * 100
     
     stress_insight = f"😰 平均压力水平为 **{avg_stress:.2f}/10**，{high_stress_rate:.1f}% 的人群处于高压力状态"
     
     return f"{activity_insight}\n\n{stress_insight}"
 
 
-def generate_risk_insight(df):
+@profiled()
+def generate_risk_insight(data):
     """生成健康风险洞察"""
+    summary = summarize(data)
+    
     # BMI风险
-    obese_count = (df['BMI Category'] == 'Obese').sum()
-    obese_with_apnea = df[(df['BMI Category'] == 'Obese') & (df['Sleep Disorder'] == 'Sleep Apnea')].shape[0]
+    obese_count = summary.obese
+    obese_with_apnea = summary.obese_with_apnea
     
     if obese_count > 0:
         apnea_in_obese_rate = obese_with_apnea / obese_count * 100
@@ -82,18 +136,20 @@ def generate_risk_insight(df):
         bmi_insight = "数据中无肥胖人群"
     
     # 高血压风险
-    high_bp_count = (df['Systolic_BP'] >= 140).sum()
-    high_bp_rate = high_bp_count / len(df) * 100
+    high_bp_count = summary.high_bp
+    high_bp_rate = high_bp_count / summary.total * 100
     
     bp_insight = f"💔 **{high_bp_rate:.1f}%** 的人群收缩压≥140mmHg (高血压风险)"
     
     return f"{bmi_insight}\n\n{bp_insight}"
 
 
-def generate_gender_insight(df):
+@profiled()
+def generate_gender_insight(data):
     """生成性别差异洞察"""
-    gender_quality = df.groupby('Gender')['Quality of Sleep (scale: 1-10)'].mean()
-    gender_stress = df.groupby('Gender')['Stress Level (scale: 1-10)'].mean()
+    gender_means = summarize(data).gender_means
+    gender_quality = gender_means[QUALITY]
+    gender_stress = gender_means[STRESS]
     
     insights = []
     
@@ -105,9 +161,10 @@ def generate_gender_insight(df):
     return "\n\n".join(insights)
 
 
-def get_top_occupation_by_stress(df, top_n=3):
+@profiled()
+def get_top_occupation_by_stress(data, top_n=3):
     """获取压力最大的职业"""
-    occupation_stress = df.groupby('Occupation')['Stress Level (scale: 1-10)'].mean().sort_values(ascending=False)
+    occupation_stress = summarize(data).occupation_stress
     
     top_occupations = []
     for i, (occupation, stress) in enumerate(occupation_stress.head(top_n).items(), 1):
@@ -0,0 +1,75 @@
+"""
+多进程分区评分
+评分脚本的 --workers 模式使用: 把数据切成分区交给进程池评分, 结果严格按输入顺序返回,
+因此写出的文件与串行运行逐字节一致
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def split_frame(df, n_parts):
+    """
+    按行把DataFrame切成至多 n_parts 个连续分区 (保留原索引)
+
+    Args:
+        df: DataFrame
+        n_parts: 分区数
+
+    Returns:
+        list: DataFrame分区
+    """
+    bounds = np.linspace(0, len(df), max(1, min(n_parts, len(df))) + 1).astype(int)
+    return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def map_partitions(func, partitions, workers=1, prefetch=2):
+    """
+    对每个分区执行 func, 按输入顺序逐个返回结果
+
+    分区可以是分块读取CSV的迭代器: 同时在途的分区至多 workers * prefetch 个,
+    不会一次把整个文件读入内存
+
+    Args:
+        func: 模块级函数 (需可被pickle), 接收一个DataFrame分区
+        partitions: 分区的可迭代对象
+        workers: 进程数, <=1 时在当前进程串行执行
+        prefetch: 每个进程预先提交的分区数
+
+    Returns:
+        生成器, 依次产出 func(分区)
+    """
+    if workers <= 1:
+        yield from map(func, partitions)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for partition in partitions:
+            pending.append(pool.submit(func, partition))
+            if len(pending) >= workers * prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def map_chunks(func, chunks, workers=1, split=False):
+    """
+    评分脚本的统一入口: 对每个数据块评分并按顺序返回
+
+    Args:
+        func: 分区评分函数
+        chunks: 数据块 (utils.storage.read_chunks 的返回值)
+        workers: 进程数
+        split: 数据是整表读入的 (只有一块) 时为True, 此时把整表切成 workers 个分区并行,
+               结果再拼回一个整表, 与串行处理整表的输出一致
+
+    Returns:
+        评分结果DataFrame的可迭代对象
+    """
+    if split and workers > 1:
+        (df,) = chunks
+        return [pd.concat(map_partitions(func, split_frame(df, workers), workers), ignore_index=True)]
+    return map_partitions(func, chunks, workers)
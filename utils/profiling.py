@@ -0,0 +1,183 @@
+"""
+运行耗时剖析
+仪表板每次重新运行 (rerun) 时记录各区段耗时: 页面开始时 start 一个 Profiler (放在当前线程上,
+每个会话的脚本在自己的线程中运行), 被 profiled / section 包住的函数把耗时记到其中;
+没有启用剖析时 section 只查一次线程局部变量, 不计时.
+每次运行结束时可输出一行JSON日志 (logger: sleep_health.profile), 便于汇总多个会话的耗时分布
+
+启用方式: 环境变量 SAH_PROFILE=1 (所有会话显示性能面板并输出日志) 或 SAH_PROFILE=log (只输出日志);
+单个会话可在页面地址后加 ?profile=1 (utils.profiling_panel.start_profiling)
+"""
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+PROFILE_ENV = 'SAH_PROFILE'
+LOGGER_NAME = 'sleep_health.profile'
+
+logger = logging.getLogger(LOGGER_NAME)
+_local = threading.local()
+
+
+def profile_mode(query_value=None):
+    """
+    剖析模式
+
+    Args:
+        query_value: 页面地址中 profile 参数的取值
+
+    Returns:
+        str: 'panel' (显示面板并输出日志) / 'log' (只输出日志) / None (不剖析)
+    """
+    if query_value not in (None, '', '0'):
+        return 'panel'
+    value = os.environ.get(PROFILE_ENV, '').strip().lower()
+    if value in ('', '0', 'false', 'off'):
+        return None
+    return 'log' if value == 'log' else 'panel'
+
+
+class Profiler:
+    """
+    一次运行的区段耗时
+
+    Args:
+        page: 页面名称
+        session: 会话ID (写入日志, 可为空)
+        panel: 运行结束时是否显示性能面板
+    """
+
+    def __init__(self, page, session=None, panel=False):
+        self.page = page
+        self.session = session
+        self.panel = panel
+        self.started = time.perf_counter()
+        self.sections = []
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.sections.append((name, seconds))
+
+    def elapsed(self):
+        """运行开始至今的秒数"""
+        return time.perf_counter() - self.started
+
+    def totals(self):
+        """
+        Returns:
+            list: [(区段名, 次数, 总秒数), ...] 按第一次出现的先后排列
+        """
+        totals = {}
+        with self._lock:
+            for name, seconds in self.sections:
+                count, total = totals.get(name, (0, 0.0))
+                totals[name] = (count + 1, total + seconds)
+        return [(name, count, total) for name, (count, total) in totals.items()]
+
+    def log(self):
+        """把本次运行的耗时写成一行JSON日志 (毫秒)"""
+        record = {
+            'event': 'rerun',
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'page': self.page,
+            'session': self.session,
+            'total_ms': round(self.elapsed() * 1000, 3),
+            'sections': {name: {'count': count, 'ms': round(total * 1000, 3)}
+                         for name, count, total in self.totals()},
+        }
+        _ensure_handler()
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def _ensure_handler():
+    # 没有配置日志时输出到标准错误 (每行一条JSON, 不加前缀, 便于日志系统直接解析)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def start(page, session=None, panel=False):
+    """在当前线程开始剖析一次运行 (参数同 Profiler), 返回 Profiler"""
+    _local.profiler = Profiler(page, session, panel)
+    return _local.profiler
+
+
+def stop():
+    """结束当前线程的剖析, 返回 Profiler (没有时为 None)"""
+    profiler = current()
+    _local.profiler = None
+    return profiler
+
+
+def current():
+    """当前线程正在进行的剖析; 没有时为 None"""
+    return getattr(_local, 'profiler', None)
+
+
+@contextmanager
+def section(name):
+    """把 with 块的耗时记为一个区段 (当前线程没有剖析时不计时)"""
+    profiler = current()
+    if profiler is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add(name, time.perf_counter() - start_time)
+
+
+def profiled(name=None):
+    """装饰器: 把函数的每次调用记为一个区段 (区段名默认为函数名)"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is None:
+                return func(*args, **kwargs)
+            with section(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def object_nbytes(obj, _seen=None):
+    """
+    对象占用内存的估计 (字节): 数据框与数组按数据缓冲区计算, 容器与普通对象递归计算其内容,
+    同一个对象只计一次
+
+    只在显示性能面板时调用; 数据框按 deep=True 统计字符串列, 大数据集上较慢
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(object_nbytes(k, seen) + object_nbytes(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(object_nbytes(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += object_nbytes(vars(obj), seen)
+    return size
@@ -0,0 +1,63 @@
+"""
+性能面板
+页面首尾调用 start_profiling / show_profiling: 按环境变量或页面参数 ?profile=1 启用剖析 (utils.profiling),
+运行结束时输出耗时日志, 面板模式下在侧边栏显示区段耗时与共享缓存统计
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from utils import profiling
+from utils.dataset_store import get_dataset_store
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def start_profiling(page):
+    """
+    在页面开头 (st.set_page_config 之后) 调用: 环境变量 SAH_PROFILE 或页面参数 ?profile=1 启用时
+    开始记录本次运行的区段耗时, 由页面末尾的 show_profiling 输出
+
+    Args:
+        page: 页面脚本路径 (传 __file__)
+    """
+    profiling.stop()
+    mode = profiling.profile_mode(st.query_params.get('profile'))
+    if mode is not None:
+        name = os.path.splitext(os.path.basename(page))[0]
+        profiling.start(name, _session_id(), panel=mode == 'panel')
+
+
+def show_profiling():
+    """在页面末尾调用: 输出本次运行的耗时日志 (一行JSON), 面板模式下在侧边栏显示区段耗时与缓存统计"""
+    profiler = profiling.stop()
+    if profiler is None:
+        return
+    profiler.log()
+    if not profiler.panel:
+        return
+
+    elapsed = profiler.elapsed()
+    sections = pd.DataFrame(
+        [(name, count, total * 1000, total / elapsed * 100) for name, count, total in profiler.totals()],
+        columns=['区段', '次数', '耗时(ms)', '占比(%)']
+    )
+    caches = pd.DataFrame(
+        [(name, item['hits'], item['misses'], item['entries'], item['nbytes'] / 1024 ** 2)
+         for name, item in get_dataset_store().cache_stats().items()],
+        columns=['缓存', '命中', '未命中', '条目', '内存(MB)']
+    )
+    with st.sidebar.expander("⏱️ 性能面板", expanded=True):
+        st.markdown(f"**本次运行**: {elapsed * 1000:.1f} ms")
+        st.dataframe(sections.round(2), hide_index=True, use_container_width=True)
+        st.caption("区段可以嵌套 (如 filter_data 包含 filter_rows), 占比之和可能超过100%")
+        st.dataframe(caches.round(2), hide_index=True, use_container_width=True)
+        st.caption("命中/未命中为服务进程启动以来的累计次数; 内存为估计值, 导出文件为磁盘占用")
@@ -0,0 +1,212 @@
+"""
+流式统计量
+分块处理大文件或持续追加的数据时逐块累积计数、均值、标准差、分位数、类别分布与分组均值,
+每个对象只保存汇总状态, 内存占用与总行数无关; 同类对象可用 merge 合并
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _lerp(a, b, t):
+    """与 numpy 线性插值分位数相同的插值公式"""
+    diff = b - a
+    if t >= 0.5:
+        return b - diff * (1 - t)
+    return a + diff * t
+
+
+class RunningStats:
+    """
+    单个数值列的流式统计: 计数/均值/标准差/最值/分位数
+
+    均值与方差按并行 (Chan) 公式逐块合并; 分位数由取值直方图精确计算 ——
+    评分结果都已四舍五入到1位小数, 不同取值至多约一千个, 直方图大小与行数无关
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.center = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.histogram = {}
+
+    def update(self, values):
+        """
+        累积一块数据 (缺失值跳过)
+
+        Args:
+            values: 数值数组或Series
+
+        Returns:
+            RunningStats: self
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        # 单块内的计算方式与 pandas 的 mean/std 相同, 只有一块时结果逐值一致
+        total = values.sum()
+        center = total / len(values)
+        m2 = ((center - values) ** 2).sum()
+        distinct, counts = np.unique(values, return_counts=True)
+        self._combine(len(values), total, center, m2, values.min(), values.max(),
+                      zip(distinct.tolist(), counts.tolist()))
+        return self
+
+    def merge(self, other):
+        """合并另一个 RunningStats (例如另一进程处理的分区)"""
+        self._combine(other.count, other.total, other.center, other.m2,
+                      other.min, other.max, other.histogram.items())
+        return self
+
+    def _combine(self, count, total, center, m2, low, high, histogram):
+        if count == 0:
+            return
+        if self.count == 0:
+            self.count, self.total, self.center, self.m2 = count, total, center, m2
+            self.min, self.max = low, high
+        else:
+            merged = self.count + count
+            delta = center - self.center
+            self.m2 = self.m2 + m2 + delta * delta * self.count * count / merged
+            self.center = self.center + delta * count / merged
+            self.count = merged
+            self.total = self.total + total
+            self.min = min(self.min, low)
+            self.max = max(self.max, high)
+        for value, n in histogram:
+            self.histogram[value] = self.histogram.get(value, 0) + n
+
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def std(self, ddof=1):
+        if self.count <= ddof:
+            return np.nan
+        return math.sqrt(self.m2 / (self.count - ddof))
+
+    def quantile(self, q):
+        """
+        分位数 (线性插值, 与 pandas/numpy 默认方法一致)
+
+        Args:
+            q: 0-1 之间的分位点
+
+        Returns:
+            float: 分位数
+        """
+        if self.count == 0:
+            return np.nan
+        values = np.array(sorted(self.histogram))
+        ends = np.cumsum([self.histogram[v] for v in values])
+
+        position = self.count * q + (1 - q) - 1
+        lower = math.floor(position)
+        upper = min(lower + 1, self.count - 1)
+        # 第 k 个有序值 (从0计) 是累计计数首次超过 k 的取值
+        a, b = values[np.searchsorted(ends, [lower, upper], side='right')]
+        return _lerp(a, b, position - lower)
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def describe(self):
+        """与 Series.describe() 相同结构的汇总"""
+        return pd.Series({
+            'count': float(self.count),
+            'mean': self.mean(),
+            'std': self.std(),
+            'min': self.min,
+            '25%': self.quantile(0.25),
+            '50%': self.quantile(0.5),
+            '75%': self.quantile(0.75),
+            'max': self.max
+        })
+
+
+class RunningCounts:
+    """
+    类别计数 (如等级分布), 结果与 value_counts() 相同
+
+    Args:
+        name: 列名, 作为结果的索引名
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.counts = {}
+
+    def update(self, values):
+        for key, n in pd.Series(values).value_counts().items():
+            self.counts[key] = self.counts.get(key, 0) + int(n)
+        return self
+
+    def merge(self, other):
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        return self
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def get(self, key, default=0):
+        return self.counts.get(key, default)
+
+    def value_counts(self):
+        """按计数降序排列 (计数相同时保持首次出现顺序)"""
+        counts = pd.Series(self.counts, dtype='int64', name='count')
+        counts.index.name = self.name
+        return counts.sort_values(ascending=False, kind='stable')
+
+
+class RunningGroupMeans:
+    """分组均值 (如各职业平均分), 逐块累积每组的和与计数"""
+
+    def __init__(self):
+        self.sums = {}
+        self.counts = {}
+
+    def update(self, keys, values):
+        """
+        Args:
+            keys: 分组键
+            values: 数值 (与keys等长, 缺失值跳过)
+        """
+        grouped = pd.Series(np.asarray(values, dtype=float)).groupby(np.asarray(keys))
+        for key, total in grouped.sum().items():
+            self.sums[key] = self.sums.get(key, 0.0) + total
+        for key, n in grouped.count().items():
+            self.counts[key] = self.counts.get(key, 0) + int(n)
+        return self
+
+    def merge(self, other):
+        for key, total in other.sums.items():
+            self.sums[key] = self.sums.get(key, 0.0) + total
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        return self
+
+    def means(self):
+        """返回各组均值Series (按组键排序, 与 groupby().mean() 一致)"""
+        return pd.Series({
+            key: (self.sums[key] / n if n else np.nan)
+            for key, n in sorted(self.counts.items())
+        }, dtype=float)
+
+
+def describe_frame(stats):
+    """
+    将多个 RunningStats 汇总为与 DataFrame.describe() 相同结构的表
+
+    Args:
+        stats: {列名: RunningStats}
+
+    Returns:
+        DataFrame: 行为 count/mean/std/min/25%/50%/75%/max
+    """
+    return pd.DataFrame({column: s.describe() for column, s in stats.items()})
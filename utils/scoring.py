@@ -0,0 +1,227 @@
+"""
+向量化评分工具模块
+供各评分计算器的整列(批量)计算路径共用
+"""
+
+import numpy as np
+import pandas as pd
+
+# Dekker拆分常数 (2**27 + 1)
+_SPLITTER = 134217729.0
+
+
+def _split(values):
+    """将float64拆成高低两部分, 使两部分相乘时不产生舍入误差"""
+    t = values * _SPLITTER
+    hi = t - (t - values)
+    return hi, values - hi
+
+
+def round_half(values, ndigits=1):
+    """
+    按 Python 内置 round() 的规则对数组逐元素取整
+
+    np.round 先乘以 10**ndigits 再取整, 乘法的舍入误差会让 x.x5 附近的值
+    与 round() 相差一个末位. 这里对临界值用无误差乘法 (Dekker two-product)
+    得到精确的放大值, 再按"四舍六入五成双"取整, 结果与逐行调用 round() 完全一致
+
+    Args:
+        values: 数值数组
+        ndigits: 保留的小数位数
+
+    Returns:
+        np.ndarray: 取整后的float64数组
+    """
+    values = np.asarray(values, dtype=float)
+    scale = 10.0 ** ndigits
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        product = values * scale
+        result = np.rint(product) / scale
+
+        # 只有放大后小数部分接近0.5的临界值才需要精确判断舍入方向
+        near_tie = np.abs(product - np.floor(product) - 0.5) < 1e-6
+        if near_tie.any():
+            result[near_tie] = _round_exact(values[near_tie], scale)
+
+    # 非有限值及超出精度范围的大数, round() 原样返回
+    passthrough = ~np.isfinite(product) | (np.abs(product) >= 2.0 ** 52)
+    if passthrough.any():
+        result[passthrough] = values[passthrough]
+    return result
+
+
+def _round_exact(values, scale):
+    """对临界值做精确舍入: 无误差乘法得到精确放大值, 恰为.5时取偶数"""
+    # 精确乘积 = product + error
+    product = values * scale
+    v_hi, v_lo = _split(values)
+    s_hi, s_lo = _split(np.float64(scale))
+    error = ((v_hi * s_hi - product) + v_hi * s_lo + v_lo * s_hi) + v_lo * s_lo
+
+    lower = np.floor(product)
+    # 精确放大值与 lower+0.5 之差的符号决定舍入方向
+    diff = (product - (lower + 0.5)) + error
+    rounded = np.where(diff > 0, lower + 1,
+                       np.where(diff < 0, lower, lower + (np.mod(lower, 2) == 1)))
+    result = rounded / scale
+    # 与 round() 一致: 负数舍入为0时保留负号
+    return np.where(result == 0, np.copysign(0.0, values), result)
+
+
+def parse_blood_pressure(bp_str):
+    """解析血压字符串 '124/70' -> (124, 70), 无法解析时返回 (None, None)"""
+    try:
+        sys, dia = map(int, bp_str.split('/'))
+        return sys, dia
+    except (AttributeError, TypeError, ValueError):
+        return None, None
+
+
+def parse_blood_pressure_column(bp_col):
+    """
+    批量解析血压列 -> (收缩压数组, 舒张压数组)
+
+    血压取值的种类远少于行数: 先对整列做类别编码, 每种取值只解析一次再按编码取回.
+    无法解析的值为NaN (与 parse_blood_pressure 返回 None 对应)
+
+    Args:
+        bp_col: 血压字符串列 (Series)
+
+    Returns:
+        tuple: (收缩压, 舒张压) 两个float64数组
+    """
+    codes, uniques = pd.factorize(bp_col)
+    parsed = [parse_blood_pressure(bp_str) for bp_str in uniques]
+    parsed.append((None, None))  # 编码-1即缺失值
+    table = np.array(parsed, dtype=float)
+    return table[codes, 0], table[codes, 1]
+
+
+class Linear:
+    """
+    分段规则中的线性段: base + (x - origin) / span * gain
+
+    floor / ceiling 为可选的下限 / 上限 (对应原代码中的 max(...) / min(...))
+    """
+
+    def __init__(self, base, origin, span, gain, floor=None, ceiling=None):
+        self.base = base
+        self.origin = origin
+        self.span = span
+        self.gain = gain
+        self.floor = -np.inf if floor is None else floor
+        self.ceiling = np.inf if ceiling is None else ceiling
+
+
+class StepRule:
+    """
+    单变量分段评分规则, 编译为断点数组 (连续输入二分查找) 与查找表 (整数输入直接索引)
+
+    breaks 按升序列出分段点: (5, '>=') 表示 x >= 5 时进入下一段, (9, '>') 表示 x > 9 时进入下一段;
+    values 比 breaks 多一项, 依次为各段的得分 (常数或 Linear).
+    同一分段点可以先后写 '>=' 和 '>' 表示只含单点的段, 例如压力恰为8分.
+
+    Args:
+        breaks: [(分段点, '>=' 或 '>'), ...]
+        values: 各段得分
+        missing: 输入为缺失值时的得分
+        domain: (最小值, 最大值) 整数取值范围; 给出时预先生成查找表, 整数输入直接按下标取分
+    """
+
+    def __init__(self, breaks, values, missing=np.nan, domain=None):
+        if len(values) != len(breaks) + 1:
+            raise ValueError("values 应比 breaks 多一项")
+        edges = [edge for edge, _ in breaks]
+        if edges != sorted(edges):
+            raise ValueError("breaks 必须按升序排列")
+
+        self.breaks = list(breaks)
+        self.values = list(values)
+        self.missing = missing
+
+        self._ge_edges = np.array([edge for edge, op in breaks if op == '>='], dtype=float)
+        self._gt_edges = np.array([edge for edge, op in breaks if op == '>'], dtype=float)
+        if len(self._ge_edges) + len(self._gt_edges) != len(breaks):
+            raise ValueError("分段点的比较符只能是 '>=' 或 '>'")
+
+        # 各段参数表: 常数段 gain=0, 由 is_linear 区分
+        segments = [v if isinstance(v, Linear) else Linear(v, 0, 1, 0) for v in values]
+        self._is_linear = np.array([isinstance(v, Linear) for v in values])
+        self._base = np.array([s.base for s in segments], dtype=float)
+        self._origin = np.array([s.origin for s in segments], dtype=float)
+        self._span = np.array([s.span for s in segments], dtype=float)
+        self._gain = np.array([s.gain for s in segments], dtype=float)
+        self._floor = np.array([s.floor for s in segments], dtype=float)
+        self._ceiling = np.array([s.ceiling for s in segments], dtype=float)
+
+        self._lookup = None
+        self._domain = domain
+        if domain is not None:
+            self._lookup = self._evaluate(np.arange(domain[0], domain[1] + 1, dtype=float))
+
+    def __call__(self, values):
+        """对数组逐元素评分, 返回float64数组"""
+        values = np.asarray(values)
+        if self._lookup is not None and values.dtype.kind in 'iu' and values.size:
+            low, high = self._domain
+            if values.min() >= low and values.max() <= high:
+                return self._lookup[values - low]
+        return self._evaluate(values.astype(float, copy=False))
+
+    def score(self, value):
+        """单个值评分"""
+        return float(self(np.array([value]))[0])
+
+    def segment_index(self, values):
+        """每个值所在分段的下标 (缺失值归入最后一段)"""
+        return (np.searchsorted(self._ge_edges, values, side='right') +
+                np.searchsorted(self._gt_edges, values, side='left'))
+
+    def _evaluate(self, values):
+        idx = self.segment_index(values)
+        result = self._base[idx]
+        if self._is_linear.any():
+            linear = self._is_linear[idx]
+            x = values[linear]
+            seg = idx[linear]
+            with np.errstate(invalid='ignore'):
+                y = self._base[seg] + (x - self._origin[seg]) / self._span[seg] * self._gain[seg]
+                y = np.fmin(np.fmax(y, self._floor[seg]), self._ceiling[seg])
+            result[linear] = y
+        result[np.isnan(values)] = self.missing
+        return result
+
+
+class CategoryRule:
+    """
+    分类变量评分规则, 批量评分时每个类别只求值一次, 再按类别编码取回 (一次gather)
+
+    Args:
+        mapping: {类别: 得分} 精确匹配
+        default: 未匹配类别与缺失值的得分
+        contains: [(子串, 得分), ...] 精确匹配失败后按顺序做子串匹配
+    """
+
+    def __init__(self, mapping=None, default=np.nan, contains=None):
+        self.mapping = dict(mapping or {})
+        self.default = default
+        self.contains = list(contains or [])
+
+    def score(self, value):
+        """单个值评分"""
+        if pd.isna(value):
+            return self.default
+        if value in self.mapping:
+            return self.mapping[value]
+        if isinstance(value, str):
+            for pattern, points in self.contains:
+                if pattern in value:
+                    return points
+        return self.default
+
+    def __call__(self, values):
+        """对整列评分, 返回float64数组"""
+        codes, categories = pd.factorize(values)
+        table = np.array([self.score(c) for c in categories] + [self.default], dtype=float)
+        return table[codes]
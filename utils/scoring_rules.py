@@ -0,0 +1,163 @@
+"""
+评分规则表
+健康分数、心血管分数与综合睡眠健康指数中的单变量分段/分类评分规则统一在此定义,
+各计算器的逐行方法和批量 score_frame 都通过这些规则求值, 修改规则只需改这一处
+"""
+
+from utils.scoring import CategoryRule, Linear, StepRule
+
+# ==================== 健康分数 (HealthScoreCalculator) ====================
+
+# 活动步数: <3000步 20-39分, 3000-4999步 40-59分, 5000-6999步 60-79分, 7000-9999步 80-99分, >=10000步 100分
+HEALTH_STEPS = StepRule(
+    breaks=[(3000, '>='), (5000, '>='), (7000, '>='), (10000, '>=')],
+    values=[Linear(20, 0, 3000, 19, floor=20),
+            Linear(40, 3000, 2000, 19),
+            Linear(60, 5000, 2000, 19),
+            Linear(80, 7000, 3000, 19),
+            100.0],
+    missing=20.0
+)
+
+# 活动时间: <15分钟 40分, 15-29分钟 60-79分, 30-59分钟 80-99分, 60-90分钟 100分,
+# >90分钟 每超1分钟扣0.2分 (最低70分)
+HEALTH_ACTIVITY = StepRule(
+    breaks=[(15, '>='), (30, '>='), (60, '>='), (90, '>')],
+    values=[40.0,
+            Linear(60, 15, 15, 19),
+            Linear(80, 30, 30, 19),
+            100.0,
+            Linear(100, 90, 1, -0.2, floor=70)],
+    missing=70.0
+)
+
+# 体力劳动者活动时间: >90分钟不扣分
+HEALTH_ACTIVITY_MANUAL_LABOR = StepRule(
+    breaks=HEALTH_ACTIVITY.breaks,
+    values=HEALTH_ACTIVITY.values[:-1] + [100.0],
+    missing=100.0
+)
+
+HEALTH_BMI = CategoryRule(
+    mapping={'Normal': 100.0, 'Overweight': 70.0, 'Underweight': 70.0, 'Obese': 40.0},
+    default=50.0
+)
+
+# 压力水平: 3-5 适度(100), 6-7 中等(70), 1-2 过低(60), 8 -> 40, 9 -> 35, 其余 30
+HEALTH_STRESS = StepRule(
+    breaks=[(1, '>='), (2, '>'), (3, '>='), (5, '>'), (6, '>='), (7, '>'),
+            (8, '>='), (8, '>'), (9, '>='), (9, '>')],
+    values=[30.0, 60.0, 30.0, 100.0, 30.0, 70.0, 30.0, 40.0, 30.0, 35.0, 30.0],
+    missing=30.0,
+    domain=(0, 10)
+)
+
+# 睡眠时长: <5h 30, 5-6h 60, 6-7h 80, 7-9h 100, 9-10h 85, >10h 50
+HEALTH_SLEEP_DURATION = StepRule(
+    breaks=[(5, '>='), (6, '>='), (7, '>='), (9, '>'), (10, '>')],
+    values=[30.0, 60.0, 80.0, 100.0, 85.0, 50.0],
+    missing=50.0
+)
+
+# 睡眠质量: 1-3分 20-45分, 4-5分 50-65分, 6-7分 70-85分, 8-10分 100分
+HEALTH_SLEEP_QUALITY = StepRule(
+    breaks=[(4, '>='), (6, '>='), (8, '>='), (10, '>')],
+    values=[Linear(20, 1, 2, 25),
+            Linear(50, 4, 2, 15),
+            Linear(70, 6, 2, 15),
+            100.0,
+            Linear(20, 1, 2, 25)]
+)
+
+# ==================== 心血管分数 (CardioScoreCalculator) ====================
+
+# 生活方式匹配度 - 运动充足度
+CARDIO_STEPS = StepRule(
+    breaks=[(5000, '>='), (7000, '>='), (10000, '>=')],
+    values=[40, 60, 85, 100],
+    missing=40
+)
+
+CARDIO_ACTIVITY = StepRule(
+    breaks=[(15, '>='), (30, '>='), (60, '>='), (90, '>')],
+    values=[40, 70, 90, 100, 70],
+    missing=40
+)
+
+# 生活方式匹配度 - 睡眠质量
+CARDIO_SLEEP_DURATION = StepRule(
+    breaks=[(6, '>='), (7, '>='), (9, '>'), (10, '>')],
+    values=[50, 80, 100, 80, 50],
+    missing=50
+)
+
+CARDIO_SLEEP_QUALITY = StepRule(
+    breaks=[(4, '>='), (6, '>='), (8, '>=')],
+    values=[40, 60, 80, 100],
+    missing=40
+)
+
+# 生活方式匹配度 - 压力管理: <=2 低压力(90), 3-5 100, 6-7 70, 其余 40
+CARDIO_STRESS = StepRule(
+    breaks=[(2, '>'), (3, '>='), (5, '>'), (6, '>='), (7, '>')],
+    values=[90, 40, 100, 40, 70, 40],
+    missing=40,
+    domain=(0, 10)
+)
+
+# 生活方式匹配度 - BMI健康度 (消瘦虽然不是最优, 但比肥胖好)
+CARDIO_BMI = CategoryRule(
+    mapping={'Normal': 100, 'Normal Weight': 100, 'Overweight': 70, 'Underweight': 70},
+    default=40
+)
+
+# 相关性评分 - 运动保护效应
+CARDIO_MOTION_EFFECT = StepRule(
+    breaks=[(5000, '>='), (7000, '>=')],
+    values=[40, 70, 100],
+    missing=40
+)
+
+# 相关性评分 - 睡眠质量影响
+CARDIO_SLEEP_EFFECT = StepRule(
+    breaks=[(5, '>='), (7, '>=')],
+    values=[40, 70, 100],
+    missing=40
+)
+
+# 相关性评分 - 压力管理效应
+CARDIO_STRESS_EFFECT = StepRule(
+    breaks=[(5, '>'), (7, '>')],
+    values=[100, 70, 40],
+    missing=40,
+    domain=(0, 10)
+)
+
+# 相关性评分 - 睡眠障碍风险调整: 失眠 60 (风险增加), 呼吸暂停 50 (风险较高), 无障碍 100
+CARDIO_DISORDER = CategoryRule(
+    contains=[('Insomnia', 60), ('Apnea', 50)],
+    default=100
+)
+
+# ==================== 综合睡眠健康指数 (SleepIndexCalculator) ====================
+
+# 睡眠核心维度 - 时长: 7-9h 100, 6-7h 或 9-10h 85, 5-6h 60, 其余 40
+CSHI_SLEEP_DURATION = StepRule(
+    breaks=[(5, '>='), (6, '>='), (7, '>='), (9, '>'), (10, '>')],
+    values=[40, 60, 85, 100, 85, 40],
+    missing=40
+)
+
+# 运动促眠维度 - 步数: 按7000步折算, 封顶100
+CSHI_STEPS = StepRule(
+    breaks=[(10000, '>=')],
+    values=[Linear(0, 0, 7000, 100, ceiling=100), 100],
+    missing=100
+)
+
+# 运动促眠维度 - 活动时间: 30-90分钟 100, 其余按30分钟=80分折算, 封顶100
+CSHI_ACTIVITY = StepRule(
+    breaks=[(30, '>='), (90, '>')],
+    values=[Linear(0, 0, 30, 80, ceiling=100), 100, Linear(0, 0, 30, 80, ceiling=100)],
+    missing=100
+)
@@ -0,0 +1,259 @@
+"""
+数据集存储层
+各阶段之间传递的数据集 (cleaned / with_scores / cardio_health_score_results 等) 始终写出CSV
+便于人工查看; 设置环境变量 SAH_STORAGE_FORMAT=parquet 或 feather 时, 同时在CSV旁写出同名
+列式文件 (需要 pyarrow)。读取时优先使用不比CSV旧的列式文件: 保留列类型, 不再重新解析文本,
+并且可以只读取需要的列
+
+用法:
+    SAH_STORAGE_FORMAT=parquet python health_score_calculator.py
+    python -m utils.storage --format parquet sleep_health_lifestyle_dataset_cleaned.csv   # 转换已有CSV
+"""
+import argparse
+import importlib.util
+import os
+
+import pandas as pd
+
+from utils.streaming import CsvChunkWriter
+
+COLUMNAR_EXTENSIONS = {'parquet': '.parquet', 'feather': '.feather'}
+STORAGE_FORMAT = os.environ.get('SAH_STORAGE_FORMAT', 'csv').lower()
+
+# pyarrow 是可选依赖, 未安装时只使用CSV; 导入较慢, 只在真正读写列式文件时才导入
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+def _pyarrow():
+    """按需导入 pyarrow, 返回 (pyarrow, pyarrow.parquet)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+def columnar_path(csv_path, fmt):
+    """CSV文件对应的列式文件路径"""
+    return os.path.splitext(csv_path)[0] + COLUMNAR_EXTENSIONS[fmt]
+
+
+def _fresh_columnar(csv_path):
+    """
+    查找可用的列式文件: 存在且不比CSV旧 (CSV被单独修改过时以CSV为准)
+
+    Returns:
+        tuple: (路径, 格式); 没有可用的列式文件时为 (None, None)
+    """
+    if not HAS_PYARROW:
+        return None, None
+    csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else None
+    preferred = [STORAGE_FORMAT] if STORAGE_FORMAT in COLUMNAR_EXTENSIONS else []
+    for fmt in preferred + [f for f in COLUMNAR_EXTENSIONS if f not in preferred]:
+        path = columnar_path(csv_path, fmt)
+        if os.path.exists(path) and (csv_mtime is None or os.path.getmtime(path) >= csv_mtime):
+            return path, fmt
+    return None, None
+
+
+def read_dataset(csv_path, columns=None, **csv_kwargs):
+    """
+    读取数据集
+
+    Args:
+        csv_path: CSV路径 (有可用的同名列式文件时改读列式文件)
+        columns: 只读取这些列 (按给定顺序返回); 为空时读取全部列
+        **csv_kwargs: 读CSV时传给 pd.read_csv 的其他参数
+
+    Returns:
+        DataFrame
+    """
+    path, fmt = _fresh_columnar(csv_path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    if fmt == 'feather':
+        return pd.read_feather(path, columns=columns)
+
+    df = pd.read_csv(csv_path, usecols=columns, **csv_kwargs)
+    return df[columns] if columns is not None else df
+
+
+def dataset_columns(csv_path):
+    """数据集的列名 (只读表头/schema)"""
+    path, fmt = _fresh_columnar(csv_path)
+    if fmt is not None:
+        pa, pq = _pyarrow()
+    if fmt == 'parquet':
+        return list(pq.read_schema(path).names)
+    if fmt == 'feather':
+        with pa.memory_map(path) as source:
+            return list(pa.ipc.open_file(source).schema.names)
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+
+def _record_batches(path, fmt, columns):
+    pa, pq = _pyarrow()
+    if fmt == 'parquet':
+        yield from pq.ParquetFile(path).iter_batches(columns=columns)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            yield batch.select(columns) if columns is not None else batch
+
+
+def _iter_columnar(path, fmt, chunksize, columns):
+    """按恰好 chunksize 行一块读取列式文件 (与CSV分块边界一致, 便于多个文件同步读取)"""
+    pa, _ = _pyarrow()
+    pending, rows = [], 0
+    for batch in _record_batches(path, fmt, columns):
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows < chunksize:
+            continue
+        table = pa.Table.from_batches(pending)
+        start = 0
+        while rows - start >= chunksize:
+            yield table.slice(start, chunksize).to_pandas()
+            start += chunksize
+        rest = table.slice(start)
+        pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def read_chunks(csv_path, chunksize=None, columns=None, **csv_kwargs):
+    """
+    按块读取数据集
+
+    Args:
+        csv_path: CSV路径 (有可用的同名列式文件时改读列式文件)
+        chunksize: 每块行数; 为空时一次读入全部数据
+        columns: 只读取这些列
+        **csv_kwargs: 读CSV时传给 pd.read_csv 的其他参数
+
+    Returns:
+        可迭代的DataFrame块 (不分块时为只含一个DataFrame的列表)
+    """
+    if not chunksize:
+        return [read_dataset(csv_path, columns, **csv_kwargs)]
+
+    path, fmt = _fresh_columnar(csv_path)
+    if fmt is not None:
+        return _iter_columnar(path, fmt, chunksize, columns)
+    reader = pd.read_csv(csv_path, usecols=columns, chunksize=chunksize, **csv_kwargs)
+    if columns is None:
+        return reader
+    return (chunk[columns] for chunk in reader)
+
+
+class DatasetWriter:
+    """
+    逐块写出数据集: 始终追加写CSV, 配置了列式格式时同时写同名 .parquet / .feather
+
+    列式文件的列类型以第一块为准, 之后的块转换到同一schema; 无法转换时
+    (例如后面的块出现了整数列中的小数) 放弃列式文件, 只保留CSV
+
+    Args:
+        csv_path: CSV输出路径
+        fmt: 'csv' / 'parquet' / 'feather', 默认取环境变量 SAH_STORAGE_FORMAT
+    """
+
+    def __init__(self, csv_path, fmt=None):
+        self.fmt = (fmt or STORAGE_FORMAT).lower()
+        if self.fmt != 'csv' and self.fmt not in COLUMNAR_EXTENSIONS:
+            raise ValueError(f"不支持的存储格式: {self.fmt}")
+        if self.fmt != 'csv' and not HAS_PYARROW:
+            raise ImportError(f"{self.fmt} 格式需要安装 pyarrow")
+
+        self.csv = CsvChunkWriter(csv_path)
+        self.path = columnar_path(csv_path, self.fmt) if self.fmt != 'csv' else None
+        self._writer = None
+        self._schema = None
+
+    @property
+    def rows(self):
+        return self.csv.rows
+
+    def write(self, df):
+        self.csv.write(df)
+        if self.path is not None:
+            self._write_columnar(df)
+
+    def _write_columnar(self, df):
+        pa, pq = _pyarrow()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            if self.fmt == 'parquet':
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, self._schema)
+        try:
+            table = table.cast(self._schema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+            print(f"Warning: {self.path} 列类型与前面的块不一致 ({e}), 只保留CSV")
+            self._writer.close()
+            os.remove(self.path)
+            self._writer, self.path = None, None
+            return
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def write_dataset(df, csv_path, fmt=None):
+    """一次性写出整个数据集 (CSV + 可选的列式文件)"""
+    writer = DatasetWriter(csv_path, fmt)
+    writer.write(df)
+    writer.close()
+
+
+def append_dataset(df, csv_path):
+    """
+    在CSV数据集末尾追加记录 (列按已有表头对齐; 文件不存在时连同表头新建)
+
+    整块文本一次写入, 读取方最多看到一行不完整的记录 (见 utils.dataset_store 的增量读取);
+    已有的同名列式文件此后比CSV旧, 读取时自动改用CSV, 需要时用本模块的命令行重新转换
+
+    Returns:
+        int: 追加的行数
+    """
+    if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
+        write_dataset(df, csv_path, fmt='csv')
+        return len(df)
+
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    missing = set(header) - set(df.columns)
+    if missing:
+        raise ValueError(f"{csv_path} 追加的数据缺少列: {sorted(missing)}")
+    text = df[header].to_csv(index=False, header=False)
+    with open(csv_path, 'rb+') as f:
+        # 原文件最后一行没有换行符时先补上
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            text = '\n' + text
+        f.write(text.encode('utf-8'))
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='将已有的CSV数据集转换为列式格式')
+    parser.add_argument('paths', nargs='+', help='CSV文件')
+    parser.add_argument('--format', choices=sorted(COLUMNAR_EXTENSIONS), default='parquet')
+    args = parser.parse_args()
+
+    for csv_path in args.paths:
+        df = pd.read_csv(csv_path)
+        path = columnar_path(csv_path, args.format)
+        if args.format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_feather(path)
+        print(f"✓ {csv_path} -> {path} ({len(df)} 行)")
+
+
+if __name__ == '__main__':
+    main()
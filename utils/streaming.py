@@ -0,0 +1,26 @@
+"""
+分块写出CSV
+评分脚本的 --chunksize 模式使用: 逐块追加写出结果, 内存占用与文件大小无关
+(分块读取见 utils.storage.read_chunks)
+"""
+import os
+
+
+class CsvChunkWriter:
+    """
+    逐块追加写出CSV, 只在第一块写表头; 结果与一次性 to_csv(index=False) 相同
+
+    Args:
+        path: 输出文件路径 (已存在时覆盖)
+        append: 为 True 且文件已存在时接在原文件后面写, 不再写表头
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.rows = 0
+        self._append = append and os.path.exists(path)
+
+    def write(self, df):
+        first = self.rows == 0 and not self._append
+        df.to_csv(self.path, mode='w' if first else 'a', header=first, index=False)
+        self.rows += len(df)
@@ -2,22 +2,25 @@
 筛查器验证脚本
 验证 SleepDisorderScreener 在数据集上的表现
 """
-import pandas as pd
-from sleep_disorder_screener import batch_screen
-from sklearn.metrics import classification_report, confusion_matrix
+from sleep_disorder_screener import SleepDisorderScreener, decode_screen_results
+
+from utils.storage import read_dataset
 
 def validate():
+    from sklearn.metrics import classification_report, confusion_matrix  # 较慢, 只在验证时导入
+
     print("正在加载数据...")
     try:
-        df = pd.read_csv('sleep_health_lifestyle_dataset_cleaned.csv')
+        df = read_dataset('sleep_health_lifestyle_dataset_cleaned.csv')
     except:
-        df = pd.read_csv('sleep_health_lifestyle_dataset.csv')
+        df = read_dataset('sleep_health_lifestyle_dataset.csv')
         
     # 填充NaN
     df['Sleep Disorder'] = df['Sleep Disorder'].fillna('None')
     
     print("正在批量运行筛查...")
-    results = batch_screen(df)
+    # 向量化筛查: 风险因素以位掩码保存, 只在导出高风险名单时解码为文字
+    results = SleepDisorderScreener().screen_frame(df)
     
     # 定义简单的二分类验证
     # 1. 验证呼吸暂停 (Apnea) 捕捉率
@@ -57,6 +60,8 @@ def validate():
         (results['Insomnia_Level'] == '高风险 (High Risk)')
     ]
     
+    high_risk = decode_screen_results(high_risk, df)
+    
     print(f"\n共发现 {len(high_risk)} 名高风险个体")
     high_risk.to_csv('high_risk_individuals.csv', index=False)
     print("高风险名单已保存至 'high_risk_individuals.csv'")